@@ -59,7 +59,13 @@ class Color(tuple, Enum):
     CYAN = (0, 255, 255)
 
 
-class Snake_Part(str, Enum):
-    TAIL = 'tail'
-    BODY = 'body'
-    HEAD = 'head'
+class Game_Event(str, Enum):
+    HEAD_ADDED = 'head added'
+    TAIL_REMOVED = 'tail removed'
+    APPLE_EATEN = 'apple eaten'
+    APPLE_SPAWNED = 'apple spawned'
+    SNAKE_DIED = 'snake died'
+    SNAKE_ENTERED = 'snake entered'  # a part of a snake came into view
+    SNAKE_LEFT = 'snake left'
+    APPLE_ENTERED = 'apple entered'
+    APPLE_LEFT = 'apple left'
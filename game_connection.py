@@ -0,0 +1,175 @@
+import asyncio
+from collections import deque
+
+from game_packet_API import Game_Packet
+from game_packet_protocol import encode_packet, Frame_Decoder
+
+
+class Connection:
+    """
+    A connection with a client over asyncio streams
+    Frames are queued and written by the connection's own writer task,
+    so whoever sends never waits for a slow client
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self.address = writer.get_extra_info('peername')
+
+        self._decoder = Frame_Decoder()
+        self._packets = deque()
+        self._send_queue = asyncio.Queue()
+        self._closing = False
+        self.bytes_sent = 0
+        self.bytes_recieved = 0
+        self.packets_sent = 0
+        self.packets_recieved = 0
+        self.max_queued = None  # frames, None for no limit
+        self.overflowed = False  # set when queued frames were dropped
+        self.frames_dropped = 0
+        self._writer_task = asyncio.create_task(self._write_frames())
+
+    def send(self, packet: Game_Packet) -> None:
+        """
+        Queues a packet to be sent
+        ...
+        :param packet: the packet to send
+        """
+
+        self.send_frame(encode_packet(packet))
+
+    def send_frame(self, frame: bytes) -> None:
+        """
+        Queues an already encoded frame to be sent
+        A client that lets max_queued frames pile up has them all dropped,
+        the one sending is told by overflowed and has to start the client
+        over
+        ...
+        :param frame: the frame to send
+        """
+
+        if self._closing:
+            return
+        if self.max_queued is not None and \
+           self._send_queue.qsize() >= self.max_queued:
+            while not self._send_queue.empty():
+                self._send_queue.get_nowait()
+                self.frames_dropped += 1
+            self.overflowed = True
+        self._send_queue.put_nowait(frame)
+        self.packets_sent += 1
+
+    @property
+    def queued_frames(self) -> int:
+        """
+        :return: how many frames are waiting to be written
+        """
+
+        return self._send_queue.qsize()
+
+    async def recieve_packet(self) -> Game_Packet:
+        """
+        Waits for the next packet from the client
+        ...
+        :return: the packet recieved
+        """
+
+        while not self._packets:
+            data = await self._reader.read(65536)
+            if not data:
+                raise ConnectionResetError('Client closed the connection')
+            self.bytes_recieved += len(data)
+            self._packets.extend(self._decoder.feed(data))
+        self.packets_recieved += 1
+        return self._packets.popleft()
+
+    async def recieve_data(self) -> bytes:
+        """
+        Waits for data from the client without splitting it into packets,
+        used when the data is relayed somewhere else
+        Anything already read and not handed out as a packet comes first,
+        after this the connection can't be read as packets anymore
+        ...
+        :return: the data recieved
+        """
+
+        if self._decoder is not None:
+            data = b''.join(encode_packet(packet) for packet in self._packets)
+            data += self._decoder.take_buffer()
+            self._packets.clear()
+            self._decoder = None
+            if data:
+                return data
+
+        data = await self._reader.read(65536)
+        if not data:
+            raise ConnectionResetError('Client closed the connection')
+        self.bytes_recieved += len(data)
+        return data
+
+    async def _write_frames(self) -> None:
+        """
+        Writes queued frames until the connection is closed, everything
+        queued at once is written together before waiting for the socket
+        The socket is closed once the last frame was written
+        """
+
+        try:
+            while True:
+                frame = await self._send_queue.get()
+                frames = [frame]
+                while not self._send_queue.empty():
+                    frames.append(self._send_queue.get_nowait())
+
+                done = None in frames
+                data = b''.join(
+                    frame for frame in frames if frame is not None
+                )
+                self._writer.write(data)
+                self.bytes_sent += len(data)
+                await self._writer.drain()
+                if done:
+                    if self._writer.can_write_eof():
+                        self._writer.write_eof()
+                    break
+        except OSError:
+            # the reading side notices the disconnection
+            pass
+        finally:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """
+        Closes the connection once everything already queued was sent
+        """
+
+        if not self._closing:
+            self._closing = True
+            self._send_queue.put_nowait(None)
+
+    async def wait_closed(self) -> None:
+        """
+        Waits until everything queued was sent, or the connection was
+        aborted
+        """
+
+        # the writer task is cancelled when aborted, that isn't an error here
+        await asyncio.wait({self._writer_task})
+
+    def abort(self) -> None:
+        """
+        Closes the connection right away
+        """
+
+        self._closing = True
+        self._writer_task.cancel()
+        self._writer.close()
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import secrets
+
+from game_packet_protocol import encode_datagram, decode_datagram, \
+    DATAGRAM_TOKEN_SIZE
+from snake_config import Snake_Config as Config
+
+
+class Datagram_Channel:
+    """
+    The UDP side of a player's connection, for the game traffic that
+    is better late than never in order
+    Every datagram is numbered, the other side drops any that arrive after
+    a newer one, so a lost datagram never holds back the ones after it
+    Nothing can be sent until the client's first datagram shows where it
+    is, the TCP connection is used until then
+    """
+
+    def __init__(self, endpoint, token: bytes) -> None:
+        self.token = token
+        self.address = None  # where the client's last datagram came from
+        self.on_packet = None  # called with every packet recieved
+        self.recieved_seq = 0
+        self.bytes_sent = 0
+        self._endpoint = endpoint
+        self._sent_seq = 0
+
+    def send_frames(self, frames: list[bytes]) -> bool:
+        """
+        Sends frames together in a single datagram
+        ...
+        :param frames: the encoded frames to send
+        :return: whether they were sent, they aren't when the client's\
+         address isn't known yet or they don't fit in a datagram
+        """
+
+        if self.address is None:
+            return False
+        datagram = encode_datagram(self.token, self._sent_seq + 1, frames)
+        if len(datagram) > Config.MAX_DATAGRAM_SIZE:
+            return False
+        self._sent_seq += 1
+        self._endpoint.send(datagram, self.address)
+        self.bytes_sent += len(datagram)
+        return True
+
+    def close(self) -> None:
+        """
+        Stops recieving datagrams for the channel
+        """
+
+        self._endpoint.close_channel(self)
+
+
+class Datagram_Endpoint(asyncio.DatagramProtocol):
+    """
+    The UDP socket all the channels of a process share, datagrams are
+    handed to the channel whose token they carry
+    """
+
+    def __init__(self) -> None:
+        self._logger = logging.getLogger()
+        self._transport = None
+        self._channels = {}  # token: channel
+        self.port = None
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self._transport = transport
+        self.port = transport.get_extra_info('sockname')[1]
+
+    def open_channel(self) -> Datagram_Channel:
+        """
+        :return: a new channel, the token is the only proof a datagram is\
+         from the player, so it is long and can't be guessed
+        """
+
+        token = secrets.token_bytes(DATAGRAM_TOKEN_SIZE)
+        while token in self._channels:
+            token = secrets.token_bytes(DATAGRAM_TOKEN_SIZE)
+        channel = self._channels[token] = Datagram_Channel(self, token)
+        return channel
+
+    def close_channel(self, channel: Datagram_Channel) -> None:
+        self._channels.pop(channel.token, None)
+
+    def send(self, datagram: bytes, address: tuple) -> None:
+        if self._transport:
+            self._transport.sendto(datagram, address)
+
+    def datagram_received(self, data: bytes, address: tuple) -> None:
+        """
+        Hands the packets of a datagram to its channel, datagrams of no
+        channel and ones older than the channel's newest are dropped
+        ...
+        :param data: the datagram
+        :param address: where it came from
+        """
+
+        try:
+            token, seq, packets = decode_datagram(data)
+        except ValueError:
+            self._logger.debug(f'Dropped a broken datagram from {address}')
+            return
+        channel = self._channels.get(token)
+        if channel is None or seq <= channel.recieved_seq:
+            return
+        channel.recieved_seq = seq
+        # the client can move, like a phone changing networks
+        channel.address = address
+        if channel.on_packet:
+            for packet in packets:
+                channel.on_packet(packet)
+
+    def error_received(self, error: OSError) -> None:
+        # like a client that went away, their channel just goes quiet
+        self._logger.debug(f'Datagram error: {error}')
+
+
+async def open_datagram_endpoint(port: int) -> Datagram_Endpoint:
+    """
+    :param port: the port to recieve datagrams on, 0 for any free port
+    :return: the endpoint, its port is the one it got
+    """
+
+    _, endpoint = await asyncio.get_running_loop().create_datagram_endpoint(
+        Datagram_Endpoint, local_addr=('0.0.0.0', port)
+    )
+    return endpoint
@@ -0,0 +1,72 @@
+from collections import deque
+
+from enums import Direction, Player_Command
+from snake_config import Snake_Config as Config
+from snake_engine import COMMAND_DIRECTIONS, OPPOSITE_DIRECTIONS
+
+
+class Input_Queue:
+    """
+    The direction inputs of a single player waiting for the next ticks
+    Inputs are numbered by the client, anything older than the last one
+    queued is ignored, and a player that sends too many inputs in a tick
+    or fills the queue has the extra ones dropped
+    """
+
+    def __init__(
+        self,
+        max_size: int = Config.INPUT_QUEUE_SIZE,
+        max_per_tick: int = Config.MAX_INPUTS_PER_TICK
+    ) -> None:
+        self._commands = deque()
+        self._max_size = max_size
+        self._max_per_tick = max_per_tick
+        self._recieved_this_tick = 0
+
+        self.last_seq = 0  # the newest input queued, confirmed to the client
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def push(self, seq: int, command: Player_Command) -> bool:
+        """
+        Adds an input the player sent
+        ...
+        :param seq: the sequence number the client gave the input
+        :param command: the input
+        :return: whether the input was queued
+        """
+
+        if seq <= self.last_seq:  # already handled
+            return False
+
+        self._recieved_this_tick += 1
+        if self._recieved_this_tick > self._max_per_tick or \
+           len(self._commands) >= self._max_size:
+            # not confirmed, so the client can send it again
+            self.dropped += 1
+            return False
+        self.last_seq = seq
+        self._commands.append(command)
+        return True
+
+    def next_direction(self, direction: Direction) -> Direction:
+        """
+        Takes the next turn of the snake, called once every tick
+        Inputs that wouldn't turn the snake are dropped on the way, any
+        inputs after the turn are kept for the next ticks, so quick turns
+        aren't lost
+        ...
+        :param direction: the direction the snake is moving in
+        :return: the direction to turn to, None to keep going
+        """
+
+        self._recieved_this_tick = 0
+        while self._commands:
+            new_direction = COMMAND_DIRECTIONS.get(self._commands.popleft())
+            if new_direction not in (
+                None, direction, OPPOSITE_DIRECTIONS[direction]
+            ):
+                return new_direction
+        return None
@@ -0,0 +1,124 @@
+from enums import Game_Event
+from game_snapshots import Snapshot_History
+from snake_config import Snake_Config as Config
+from snake_engine import Snake_Engine
+
+
+class Player_View:
+    """
+    The part of the board a player is sent, a square around the head of
+    their snake
+    Snakes are sent whole once any part of them comes into view, so the
+    client can keep moving them with the usual changes, apples are sent
+    one by one
+    Things are let go only once they are a margin past the edge of the
+    view, so something moving along the edge isn't sent over and over
+    """
+
+    def __init__(self, player_ID: int, radius: int) -> None:
+        self._player_ID = player_ID
+        self._radius = radius
+        self._center = None
+        self.snakes = set()  # the IDs of the snakes the player has
+        self.apples = set()
+        self.keyframe_tick = None  # the tick of the last whole board
+        self.history = Snapshot_History(Config.SNAPSHOT_HISTORY_TICKS)
+
+    def _area(self, engine: Snake_Engine, margin: int = 0) -> tuple:
+        """
+        :param engine: the game
+        :param margin: how far to grow the area past the view
+        :return: the (left, top, right, bottom) of the area, it stays\
+         where the player's snake died
+        """
+
+        snake = engine.snakes.get(self._player_ID)
+        if snake:
+            self._center = snake.cells[0]
+        elif self._center is None:
+            self._center = (engine.width // 2, engine.height // 2)
+        x, y = self._center
+        radius = self._radius + margin
+        return (x - radius, y - radius, x + radius, y + radius)
+
+    def _in_view(
+        self, engine: Snake_Engine, margin: int = 0
+    ) -> tuple[set, set]:
+        """
+        :param engine: the game
+        :param margin: how far to look past the view
+        :return: the IDs of the snakes and the apples in the area
+        """
+
+        area = self._area(engine, margin)
+        snakes = {
+            engine.snake_at(cell)
+            for cell in engine.part_buckets.cells_in(*area)
+        }
+        snakes.discard(None)
+        return snakes, set(engine.apple_buckets.cells_in(*area))
+
+    def keyframe(self, engine: Snake_Engine) -> dict:
+        """
+        Starts the player over with everything in view
+        ...
+        :param engine: the game
+        :return: the board as the player sees it, like\
+         Snake_Engine.snapshot
+        """
+
+        self.snakes, self.apples = self._in_view(engine)
+        self.keyframe_tick = engine.tick
+        return {
+            'tick': engine.tick,
+            'game state': engine.state,
+            'snakes': [
+                {
+                    'ID': ID,
+                    'cells': [list(cell) for cell in engine.snakes[ID].cells]
+                }
+                for ID in sorted(self.snakes)
+            ],
+            'apples': [list(apple) for apple in self.apples]
+        }
+
+    def update(self, engine: Snake_Engine, ticks: list) -> None:
+        """
+        Records what the player is sent of the ticks since the last update,
+        the changes of snakes the player has and what came into view or
+        left it
+        ...
+        :param engine: the game, after the ticks
+        :param ticks: a list of (tick, events) of the new ticks
+        """
+
+        for tick, events in ticks:
+            seen = []
+            for event, ID, cell in events:
+                if event in (Game_Event.HEAD_ADDED, Game_Event.TAIL_REMOVED):
+                    if ID in self.snakes:
+                        seen.append((event, ID, cell))
+                elif event == Game_Event.SNAKE_DIED and ID in self.snakes:
+                    seen.append((event, ID, cell))
+                    self.snakes.discard(ID)
+            self.history.record(tick, seen)
+
+        snakes, apples = self._in_view(engine)
+        kept_snakes, kept_apples = self._in_view(engine, Config.VIEW_MARGIN)
+        changes = []
+        for ID in sorted(self.snakes - kept_snakes):
+            changes.append((Game_Event.SNAKE_LEFT, ID, None))
+        for ID in sorted(snakes - self.snakes):
+            changes.extend(
+                (Game_Event.SNAKE_ENTERED, ID, cell)
+                for cell in engine.snakes[ID].cells
+            )
+        # eaten apples are gone from both
+        for apple in self.apples - kept_apples:
+            changes.append((Game_Event.APPLE_LEFT, None, apple))
+        for apple in apples - self.apples:
+            changes.append((Game_Event.APPLE_ENTERED, None, apple))
+        self.history.record(engine.tick, changes)
+
+        self.snakes = (self.snakes & kept_snakes) | snakes
+        self.apples = (self.apples & kept_apples) | apples
@@ -0,0 +1,188 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+from snake_config import Snake_Config as Config
+
+
+LOG_FORMAT = '[%(asctime)s.%(msecs)03d] [%(levelname)s] [%(module)s] [%(funcName)s]: %(message)s'  # noqa
+DATE_FORMAT = '%d-%m-%Y %H:%M:%S'
+
+# fields added to every record logged in the current task, like the room
+_log_context = contextvars.ContextVar('log_context', default={})
+
+
+def set_log_context(**fields) -> None:
+    """
+    Adds fields to everything logged from now on in the current task and
+    the tasks it starts, asyncio copies the context to new tasks so every
+    room and player handler keeps its own
+    ...
+    :param fields: the fields to add, like room=3
+    """
+
+    _log_context.set({**_log_context.get(), **fields})
+
+
+class Context_Filter(logging.Filter):
+    """
+    Puts the fields of the log context on records, runs where the record
+    is logged so the context is the caller's
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _log_context.get()
+        return True
+
+
+class Rate_Limit_Filter(logging.Filter):
+    """
+    Drops records from a line of code that logs more than a rate, so a
+    log in a hot path can't flood the log
+    Errors are never dropped, the next record that gets through tells how
+    many were dropped before it
+    """
+
+    def __init__(self, per_second: float) -> None:
+        super().__init__()
+        self._per_second = per_second
+        self._sites = {}  # (path, line): [tokens, last time, dropped]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        now = record.created
+        site = self._sites.get((record.pathname, record.lineno))
+        if site is None:
+            site = self._sites[(record.pathname, record.lineno)] = [
+                self._per_second, now, 0
+            ]
+        site[0] = min(
+            self._per_second, site[0] + (now - site[1]) * self._per_second
+        )
+        site[1] = now
+        if site[0] < 1:
+            site[2] += 1
+            return False
+
+        site[0] -= 1
+        if site[2]:
+            record.suppressed = site[2]
+            site[2] = 0
+        return True
+
+
+class JSON_Formatter(logging.Formatter):
+    """
+    Formats every record as a single line of json, with the fields of the
+    log context next to the message
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            'time': time.strftime(
+                '%Y-%m-%dT%H:%M:%S', time.localtime(record.created)
+            ) + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'module': record.module,
+            'function': record.funcName,
+            'message': record.getMessage()
+        }
+        event.update(getattr(record, 'context', {}))
+        if getattr(record, 'suppressed', None):
+            event['suppressed'] = record.suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event['exception'] = record.exc_text
+        return json.dumps(event, default=str)
+
+
+class Game_Queue_Handler(logging.handlers.QueueHandler):
+    """
+    Puts records on a queue for the listener's thread to write, so the
+    game never waits for the disk or the terminal
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Makes the record safe to hand to another thread, the message is
+        formatted now while its arguments are still what they were
+        ...
+        :param record: the record logged
+        :return: the record to put on the queue
+        """
+
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level: int,
+    filename: str = Config.LOG_FILE,
+    console: bool = True
+) -> logging.handlers.QueueListener:
+    """
+    Sends everything logged through a queue to a background thread, which
+    writes json lines to a rotating log file and text to the terminal
+    ...
+    :param level: the lowest level logged
+    :param filename: the log file, older logs are kept next to it
+    :param console: whether to also write the logs to the terminal
+    :return: the listener writing the logs, stopped when the program exits
+    """
+
+    log_file = logging.handlers.RotatingFileHandler(
+        filename,
+        maxBytes=Config.LOG_FILE_SIZE,
+        backupCount=Config.LOG_FILE_BACKUPS,
+        encoding='utf-8',
+        delay=True
+    )
+    log_file.setFormatter(JSON_Formatter())
+    handlers = [log_file]
+    if console:
+        terminal = logging.StreamHandler()
+        terminal.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+        handlers.append(terminal)
+
+    records = queue.SimpleQueue()  # never full, putting never waits
+    queue_handler = Game_Queue_Handler(records)
+    queue_handler.addFilter(Context_Filter())
+    queue_handler.addFilter(Rate_Limit_Filter(Config.LOG_RATE_LIMIT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(records, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def worker_log_file(worker_ID: int) -> str:
+    """
+    :param worker_ID: the ID of a worker process
+    :return: the log file of the worker, processes don't share a file\
+     since they would rotate it under each other
+    """
+
+    name, extension = os.path.splitext(Config.LOG_FILE)
+    return f'{name}.worker_{worker_ID}{extension}'
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import time
+
+from tick_scheduler import Duration_Histogram
+
+
+METRIC_PREFIX = 'snake_'
+
+METRIC_HELP = {
+    'tick_phase_seconds': 'Time spent in every phase of a game tick',
+    'ticks_total': 'Game ticks run',
+    'tick_overruns_total': 'Ticks that ran late and had to catch up',
+    'ticks_skipped_total': 'Ticks skipped for being too far behind',
+    'rooms': 'Rooms with a game running',
+    'client_bytes_sent_total': 'Bytes sent to a client',
+    'client_bytes_recieved_total': 'Bytes recieved from a client',
+    'client_packets_sent_total': 'Packets sent to a client',
+    'client_packets_recieved_total': 'Packets recieved from a client',
+    'client_send_queue_frames': 'Frames waiting to be sent to a client',
+    'client_input_queue_inputs': 'Inputs of a client waiting for a tick',
+    'client_datagram_bytes_sent_total': 'Bytes sent to a client over UDP',
+    'room_spectators': 'Spectators watching a room',
+    'spectator_frames_dropped_total': 'Frames dropped for spectators watching a room'  # noqa
+}
+
+
+class Metrics:
+    """
+    Keeps the server's measurements and shows them in the Prometheus text
+    format
+    Timings and counters are recorded as they happen, everything that
+    can be read off the rooms when asked (bytes, queue depths) is taken
+    from collectors only when the metrics are scraped
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._histograms = {}  # (name, labels): Duration_Histogram
+        self._counters = {}  # (name, labels): value
+        self._collectors = set()
+
+    def clock(self) -> float:
+        """
+        :return: the time to pass to phase, in seconds
+        """
+
+        return time.perf_counter()
+
+    def phase(self, name: str, start: float) -> float:
+        """
+        Records how long a phase of a tick took
+        ...
+        :param name: the name of the phase
+        :param start: when the phase started, as given by clock
+        :return: the time now, the start of the next phase
+        """
+
+        now = time.perf_counter()
+        self.observe(name, now - start)
+        return now
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Records a phase of a tick that was already timed, like one made of
+        many pieces timed apart
+        ...
+        :param name: the name of the phase
+        :param seconds: how long the phase took
+        """
+
+        key = ('tick_phase_seconds', (('phase', name),))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Duration_Histogram()
+        histogram.add(seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Adds to a counter
+        ...
+        :param name: the name of the counter
+        :param amount: how much to add
+        """
+
+        key = (name, ())
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def add_collector(self, collector) -> None:
+        """
+        Adds a function that is called when the metrics are scraped
+        ...
+        :param collector: a function that returns a list of\
+         (name, labels dict, value)
+        """
+
+        self._collectors.add(collector)
+
+    def remove_collector(self, collector) -> None:
+        self._collectors.discard(collector)
+
+    def _collect(self) -> dict:
+        """
+        :return: the current value of every metric that isn't a histogram,\
+         as (name, labels): value
+        """
+
+        values = dict(self._counters)
+        values[('rooms', ())] = len(self._collectors)
+        for collector in list(self._collectors):
+            for name, labels, value in collector():
+                key = (name, tuple(sorted(labels.items())))
+                values[key] = values.get(key, 0) + value
+        return values
+
+    def exposition(self) -> str:
+        """
+        :return: all the metrics in the Prometheus text format
+        """
+
+        lines = []
+        described = set()
+
+        def describe(name: str, kind: str) -> None:
+            if name not in described:
+                described.add(name)
+                lines.append(
+                    f'# HELP {METRIC_PREFIX}{name} {METRIC_HELP.get(name, "")}'
+                )
+                lines.append(f'# TYPE {METRIC_PREFIX}{name} {kind}')
+
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            describe(name, 'histogram')
+            seen = 0
+            bounds = [bound / 1000 for bound in histogram.BUCKETS_MS]
+            for bound, count in zip(bounds + ['+Inf'], histogram.counts):
+                seen += count
+                bucket_labels = labels + (('le', str(bound)),)
+                lines.append(
+                    f'{METRIC_PREFIX}{name}_bucket'
+                    f'{format_labels(bucket_labels)} {seen}'
+                )
+            lines.append(
+                f'{METRIC_PREFIX}{name}_sum{format_labels(labels)} '
+                f'{histogram.sum / 1000}'
+            )
+            lines.append(
+                f'{METRIC_PREFIX}{name}_count{format_labels(labels)} '
+                f'{histogram.total}'
+            )
+
+        for (name, labels), value in sorted(self._collect().items()):
+            describe(name, 'counter' if name.endswith('_total') else 'gauge')
+            lines.append(
+                f'{METRIC_PREFIX}{name}{format_labels(labels)} {value}'
+            )
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> str:
+        """
+        :return: a single line about how the server is doing, for the logs
+        """
+
+        values = self._collect()
+        phases = ', '.join(
+            f'{labels[0][1]} {histogram.sum / max(histogram.total, 1):.2f}'
+            for (name, labels), histogram in sorted(self._histograms.items())
+        )
+        total = self._histograms.get(
+            ('tick_phase_seconds', (('phase', 'total'),)),
+            Duration_Histogram()
+        )
+        sent = sum(
+            value for (name, _), value in values.items()
+            if name == 'client_bytes_sent_total'
+        )
+        return (
+            f'{values.get(("rooms", ()), 0)} rooms, '
+            f'{values.get(("ticks_total", ()), 0)} ticks '
+            f'(p99 {total.percentile(99)}ms), '
+            f'{values.get(("tick_overruns_total", ()), 0)} overruns, '
+            f'{values.get(("ticks_skipped_total", ()), 0)} skipped, '
+            f'{sent / 1024:.0f} KiB sent to current players, '
+            f'mean ms per phase: {phases}'
+        )
+
+
+class Null_Metrics:
+    """
+    Stands in for Metrics when they are off, every call does nothing
+    """
+
+    enabled = False
+
+    def clock(self) -> float:
+        return 0
+
+    def phase(self, name: str, start: float) -> float:
+        return 0
+
+    def observe(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def add_collector(self, collector) -> None:
+        pass
+
+    def remove_collector(self, collector) -> None:
+        pass
+
+
+NULL_METRICS = Null_Metrics()
+
+
+def format_labels(labels: tuple) -> str:
+    """
+    :param labels: a tuple of (label, value)
+    :return: the labels as written in the Prometheus text format
+    """
+
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{label}="{escape_label_value(value)}"' for label, value in labels
+    ) + '}'
+
+
+def escape_label_value(value) -> str:
+    """
+    :param value: the value of a label
+    :return: the value with backslashes, quotes and newlines escaped, as\
+     the Prometheus text format wants them
+    """
+
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n'
+    )
+
+
+async def serve_metrics(metrics: Metrics, port: int) -> None:
+    """
+    Serves the metrics over HTTP on the local machine
+    ...
+    :param metrics: the metrics to serve
+    :param port: the port to listen on
+    """
+
+    async def handle_scrape(
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            await reader.readuntil(b'\r\n\r\n')
+            body = metrics.exposition().encode()
+            writer.write(
+                b'HTTP/1.0 200 OK\r\n'
+                b'Content-Type: text/plain; version=0.0.4\r\n'
+                + f'Content-Length: {len(body)}\r\n\r\n'.encode()
+                + body
+            )
+            await writer.drain()
+        except (OSError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_scrape, '127.0.0.1', port)
+    logging.getLogger().info(f'Metrics are served on port {port}')
+    async with server:
+        await server.serve_forever()
+
+
+async def log_metrics(metrics: Metrics, interval: float) -> None:
+    """
+    Logs a summary of the metrics every interval
+    ...
+    :param metrics: the metrics to log
+    :param interval: seconds between summaries
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+        logging.getLogger().info(f'Metrics: {metrics.summary()}')
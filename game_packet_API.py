@@ -10,6 +10,9 @@ class Game_Packet_Type(str, Enum):
     START_GAME = 'start game'
     PLAYER_READY = 'player ready'
     PLAYER_INFO = 'player info'
+    GAME_DELTA = 'game changes'
+    SNAPSHOT_ACK = 'snapshot ack'
+    PLAYER_STATUS = 'player status'
 
     STANDARD_DATA = 'standard data'
 
@@ -0,0 +1,338 @@
+import json
+import struct
+
+from enums import Player_Command, Game_State, Player_State, Game_Event
+from game_packet_API import Game_Packet, Game_Packet_Type
+
+
+# every frame starts with the length of its payload and the packet type
+FRAME_HEADER = struct.Struct('!IB')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# a datagram starts with the token of the player it is about and its
+# sequence number, whole frames follow
+DATAGRAM_TOKEN_SIZE = 16
+DATAGRAM_HEADER = struct.Struct(f'!{DATAGRAM_TOKEN_SIZE}sI')
+
+PACKET_TYPE_CODES = {
+    Game_Packet_Type.GAME_STATUS_REQUEST: 1,
+    Game_Packet_Type.PLAYER_INPUTS: 2,
+    Game_Packet_Type.GAME_STATUS: 3,
+    Game_Packet_Type.DONE_SENDING: 4,
+    Game_Packet_Type.START_GAME: 5,
+    Game_Packet_Type.PLAYER_READY: 6,
+    Game_Packet_Type.PLAYER_INFO: 7,
+    Game_Packet_Type.STANDARD_DATA: 8,
+    Game_Packet_Type.GAME_DELTA: 9,
+    Game_Packet_Type.SNAPSHOT_ACK: 10,
+    Game_Packet_Type.PLAYER_STATUS: 11
+}
+PACKET_TYPES = {code: type for type, code in PACKET_TYPE_CODES.items()}
+
+# enum values are sent as their index + 1, 0 stands for None
+_COMMANDS = [None] + list(Player_Command)
+_GAME_STATES = [None] + list(Game_State)
+_PLAYER_STATES = [None] + list(Player_State)
+_EVENTS = [None] + list(Game_Event)
+_EVENTS_WITH_CELLS = {
+    Game_Event.HEAD_ADDED, Game_Event.APPLE_EATEN, Game_Event.APPLE_SPAWNED,
+    Game_Event.SNAKE_ENTERED, Game_Event.APPLE_ENTERED, Game_Event.APPLE_LEFT
+}
+_EVENTS_WITHOUT_SNAKES = {
+    Game_Event.APPLE_EATEN, Game_Event.APPLE_SPAWNED,
+    Game_Event.APPLE_ENTERED, Game_Event.APPLE_LEFT
+}
+
+_INPUTS = struct.Struct('!IBB')
+_SNAPSHOT_HEADER = struct.Struct('!IBHH')
+_SNAKE_HEADER = struct.Struct('!BI')
+_DELTA_HEADER = struct.Struct('!IIBH')
+_TICK_HEADER = struct.Struct('!IH')
+_EVENT = struct.Struct('!BBHH')
+_ACK = struct.Struct('!I')
+_PLAYER_STATUS = struct.Struct('!IBI')
+
+
+def _encode_cells(cells) -> bytes:
+    """
+    :param cells: a list of (x, y) cells
+    :return: the cells packed as pairs of unsigned shorts
+    """
+
+    flat = [value for cell in cells for value in cell]
+    return struct.pack(f'!{len(flat)}H', *flat)
+
+
+def _decode_cells(
+    payload: bytes, offset: int, count: int
+) -> tuple[list[tuple[int, int]], int]:
+    """
+    :param payload: the payload to read from
+    :param offset: where the cells start
+    :param count: how many cells to read
+    :return: the cells and the offset right after them
+    """
+
+    flat = struct.unpack_from(f'!{count * 2}H', payload, offset)
+    cells = list(zip(flat[::2], flat[1::2]))
+    return cells, offset + count * 4
+
+
+def _encode_inputs(data: dict) -> bytes:
+    return _INPUTS.pack(
+        data.get('seq', 0),
+        _COMMANDS.index(data.get('change dir')),
+        _COMMANDS.index(data.get('status'))
+    )
+
+
+def _decode_inputs(payload: bytes) -> dict:
+    seq, change_dir, status = _INPUTS.unpack_from(payload)
+    return {
+        'seq': seq,
+        'change dir': _COMMANDS[change_dir],
+        'status': _COMMANDS[status]
+    }
+
+
+def _encode_snapshot(data: dict) -> bytes:
+    parts = [_SNAPSHOT_HEADER.pack(
+        data['tick'],
+        _GAME_STATES.index(data['game state']),
+        len(data['snakes']),
+        len(data['apples'])
+    )]
+    for snake in data['snakes']:
+        parts.append(_SNAKE_HEADER.pack(snake['ID'], len(snake['cells'])))
+        parts.append(_encode_cells(snake['cells']))
+    parts.append(_encode_cells(data['apples']))
+    return b''.join(parts)
+
+
+def _decode_snapshot(payload: bytes) -> dict:
+    tick, game_state, snake_count, apple_count = \
+        _SNAPSHOT_HEADER.unpack_from(payload)
+    offset = _SNAPSHOT_HEADER.size
+
+    snakes = []
+    for _ in range(snake_count):
+        ID, length = _SNAKE_HEADER.unpack_from(payload, offset)
+        cells, offset = _decode_cells(
+            payload, offset + _SNAKE_HEADER.size, length
+        )
+        snakes.append({'ID': ID, 'cells': cells})
+    apples, offset = _decode_cells(payload, offset, apple_count)
+
+    return {
+        'tick': tick,
+        'game state': _GAME_STATES[game_state],
+        'snakes': snakes,
+        'apples': apples
+    }
+
+
+def _encode_delta(data: dict) -> bytes:
+    parts = [_DELTA_HEADER.pack(
+        data['base tick'],
+        data['tick'],
+        _GAME_STATES.index(data['game state']),
+        len(data['ticks'])
+    )]
+    for tick, events in data['ticks']:
+        parts.append(_TICK_HEADER.pack(tick, len(events)))
+        for event, ID, cell in events:
+            x, y = cell if cell else (0, 0)
+            parts.append(_EVENT.pack(
+                _EVENTS.index(event), 0 if ID is None else ID, x, y
+            ))
+    return b''.join(parts)
+
+
+def _decode_delta(payload: bytes) -> dict:
+    base_tick, tick, game_state, tick_count = \
+        _DELTA_HEADER.unpack_from(payload)
+    offset = _DELTA_HEADER.size
+
+    ticks = []
+    for _ in range(tick_count):
+        event_tick, event_count = _TICK_HEADER.unpack_from(payload, offset)
+        offset += _TICK_HEADER.size
+        events = []
+        for _ in range(event_count):
+            event, ID, x, y = _EVENT.unpack_from(payload, offset)
+            offset += _EVENT.size
+            event = _EVENTS[event]
+            if event in _EVENTS_WITH_CELLS:
+                cell = (x, y)
+            else:
+                cell = None
+            if event in _EVENTS_WITHOUT_SNAKES:
+                ID = None
+            events.append((event, ID, cell))
+        ticks.append((event_tick, events))
+
+    return {
+        'base tick': base_tick,
+        'tick': tick,
+        'game state': _GAME_STATES[game_state],
+        'ticks': ticks
+    }
+
+
+def _encode_ack(data: dict) -> bytes:
+    return _ACK.pack(data['tick'])
+
+
+def _decode_ack(payload: bytes) -> dict:
+    return {'tick': _ACK.unpack_from(payload)[0]}
+
+
+def _encode_player_status(data: dict) -> bytes:
+    return _PLAYER_STATUS.pack(
+        data['tick'], _PLAYER_STATES.index(data['player state']),
+        data['input seq']
+    )
+
+
+def _decode_player_status(payload: bytes) -> dict:
+    tick, player_state, input_seq = _PLAYER_STATUS.unpack_from(payload)
+    return {
+        'tick': tick,
+        'player state': _PLAYER_STATES[player_state],
+        'input seq': input_seq
+    }
+
+
+# packets that have a binary encoding, everything else is sent as json
+_ENCODERS = {
+    Game_Packet_Type.PLAYER_INPUTS: _encode_inputs,
+    Game_Packet_Type.GAME_STATUS: _encode_snapshot,
+    Game_Packet_Type.GAME_DELTA: _encode_delta,
+    Game_Packet_Type.SNAPSHOT_ACK: _encode_ack,
+    Game_Packet_Type.PLAYER_STATUS: _encode_player_status
+}
+_DECODERS = {
+    Game_Packet_Type.PLAYER_INPUTS: _decode_inputs,
+    Game_Packet_Type.GAME_STATUS: _decode_snapshot,
+    Game_Packet_Type.GAME_DELTA: _decode_delta,
+    Game_Packet_Type.SNAPSHOT_ACK: _decode_ack,
+    Game_Packet_Type.PLAYER_STATUS: _decode_player_status
+}
+
+
+def encode_packet(packet: Game_Packet) -> bytes:
+    """
+    Turns a packet into a frame ready to be sent
+    ...
+    :param packet: the packet to encode
+    :return: the frame
+    """
+
+    if packet.data is None:
+        payload = b''
+    elif packet.type in _ENCODERS:
+        payload = _ENCODERS[packet.type](packet.data)
+    else:
+        payload = json.dumps(packet.data).encode()
+
+    return FRAME_HEADER.pack(
+        len(payload), PACKET_TYPE_CODES[packet.type]
+    ) + payload
+
+
+def decode_payload(type_code: int, payload: bytes) -> Game_Packet:
+    """
+    :param type_code: the packet type code from the frame header
+    :param payload: the payload of the frame
+    :return: the packet, ValueError is raised for anything that isn't a\
+     valid packet
+    """
+
+    try:
+        packet_type = PACKET_TYPES[type_code]
+        if not payload:
+            data = None
+        elif packet_type in _DECODERS:
+            data = _DECODERS[packet_type](payload)
+        else:
+            data = json.loads(payload)
+    except (struct.error, KeyError, IndexError) as error:
+        raise ValueError(f'Broken frame of type {type_code}') from error
+    return Game_Packet(type=packet_type, data=data)
+
+
+class Frame_Decoder:
+    """
+    Turns a stream of bytes into packets
+    Data can be fed in any sized pieces, a frame split between reads
+    is kept until the rest of it arrives
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[Game_Packet]:
+        """
+        Adds data read from the socket
+        ...
+        :param data: the data that was read
+        :return: all the packets that were completed by the data
+        """
+
+        self._buffer += data
+        packets = []
+        offset = 0
+        while len(self._buffer) - offset >= FRAME_HEADER.size:
+            length, type_code = FRAME_HEADER.unpack_from(self._buffer, offset)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f'Frame of {length} bytes is too big')
+            end = offset + FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            packets.append(decode_payload(
+                type_code,
+                bytes(self._buffer[offset + FRAME_HEADER.size:end])
+            ))
+            offset = end
+        del self._buffer[:offset]
+        return packets
+
+    def take_buffer(self) -> bytes:
+        """
+        Empties the decoder
+        ...
+        :return: the bytes of the frame that didn't fully arrive yet
+        """
+
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def encode_datagram(token: bytes, seq: int, frames: list[bytes]) -> bytes:
+    """
+    :param token: the token of the player's datagram channel
+    :param seq: the sequence number of the datagram
+    :param frames: encoded frames to put in the datagram
+    :return: the datagram ready to be sent
+    """
+
+    return DATAGRAM_HEADER.pack(token, seq) + b''.join(frames)
+
+
+def decode_datagram(
+    datagram: bytes
+) -> tuple[bytes, int, list[Game_Packet]]:
+    """
+    :param datagram: a datagram that was recieved
+    :return: the token, sequence number and packets of the datagram,\
+     ValueError is raised for anything that isn't a whole datagram
+    """
+
+    if len(datagram) < DATAGRAM_HEADER.size:
+        raise ValueError('Datagram is too short')
+    token, seq = DATAGRAM_HEADER.unpack_from(datagram)
+    decoder = Frame_Decoder()
+    packets = decoder.feed(datagram[DATAGRAM_HEADER.size:])
+    if decoder.take_buffer():
+        raise ValueError('Datagram ends in the middle of a frame')
+    return token, seq, packets
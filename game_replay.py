@@ -0,0 +1,230 @@
+import struct
+from dataclasses import dataclass, field
+
+from enums import Direction, Game_State
+from snake_engine import Snake_Engine
+
+
+# a replay is the game's settings and starting board followed by the
+# inputs of every tick, the game is played again from them
+REPLAY_MAGIC = b'SNKR'
+REPLAY_VERSION = 1
+
+_HEADER = struct.Struct('!4sBHHIfB')
+_ID = struct.Struct('!B')
+_SNAKE_HEADER = struct.Struct('!BBH')
+_CELL = struct.Struct('!HH')
+_COUNT = struct.Struct('!I')
+_TICK_HEADER = struct.Struct('!IB')
+_INPUT = struct.Struct('!BB')
+
+# inputs are a turn to a direction (its index + 1) or leaving the game
+_DIRECTIONS = [None] + list(Direction)
+LEAVE = len(_DIRECTIONS)
+
+
+@dataclass
+class Replay:
+    width: int
+    height: int
+    seed: int
+    tick_rate: float
+    player_IDs: list[int]
+    moving_IDs: set[int]  # None when every snake moves
+    layout: dict  # snake ID: (direction, cells) at the start of the game
+    end_tick: int = 0
+    inputs: dict = field(default_factory=dict)  # tick: [(ID, input)]
+
+
+class Replay_Recorder:
+    """
+    Records a game as it is played so it can be played again later
+    Only the inputs are kept, the engine is deterministic for a seed
+    """
+
+    def __init__(
+        self,
+        engine: Snake_Engine,
+        tick_rate: float,
+        moving_IDs: set[int] = None
+    ) -> None:
+        self._engine = engine
+        self.replay = Replay(
+            width=engine.width,
+            height=engine.height,
+            seed=engine.seed,
+            tick_rate=tick_rate,
+            player_IDs=list(engine.snakes),
+            moving_IDs=moving_IDs,
+            layout={
+                ID: (snake.direction, list(snake.cells))
+                for ID, snake in engine.snakes.items()
+            }
+        )
+
+    def turn(self, snake_ID: int, direction: Direction) -> None:
+        """
+        Records a snake being turned before the next step
+        ...
+        :param snake_ID: the ID of the snake
+        :param direction: the direction it was turned to
+        """
+
+        self._add_input(snake_ID, _DIRECTIONS.index(direction))
+
+    def leave(self, player_ID: int) -> None:
+        """
+        Records a player leaving the game before the next step
+        ...
+        :param player_ID: the ID of the player
+        """
+
+        self._add_input(player_ID, LEAVE)
+
+    def _add_input(self, ID: int, input: int) -> None:
+        self.replay.inputs.setdefault(self._engine.tick + 1, []).append(
+            (ID, input)
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Writes the replay to a file
+        ...
+        :param path: the path of the file
+        """
+
+        self.replay.end_tick = self._engine.tick
+        with open(path, 'wb') as file:
+            file.write(encode_replay(self.replay))
+
+
+def encode_replay(replay: Replay) -> bytes:
+    """
+    :param replay: the replay to encode
+    :return: the replay as written to a file
+    """
+
+    moving_IDs = sorted(replay.moving_IDs) if replay.moving_IDs else []
+    parts = [_HEADER.pack(
+        REPLAY_MAGIC, REPLAY_VERSION,
+        replay.width, replay.height, replay.seed, replay.tick_rate,
+        len(replay.player_IDs)
+    )]
+    parts.extend(_ID.pack(ID) for ID in replay.player_IDs)
+    parts.append(_ID.pack(len(moving_IDs)))
+    parts.extend(_ID.pack(ID) for ID in moving_IDs)
+
+    for ID in replay.player_IDs:
+        direction, cells = replay.layout[ID]
+        parts.append(_SNAKE_HEADER.pack(
+            ID, _DIRECTIONS.index(direction), len(cells)
+        ))
+        parts.extend(_CELL.pack(*cell) for cell in cells)
+
+    parts.append(_COUNT.pack(replay.end_tick))
+    parts.append(_COUNT.pack(len(replay.inputs)))
+    for tick, inputs in sorted(replay.inputs.items()):
+        parts.append(_TICK_HEADER.pack(tick, len(inputs)))
+        parts.extend(_INPUT.pack(ID, input) for ID, input in inputs)
+    return b''.join(parts)
+
+
+def decode_replay(data: bytes) -> Replay:
+    """
+    :param data: the replay as written to a file
+    :return: the replay
+    """
+
+    magic, version, width, height, seed, tick_rate, player_count = \
+        _HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError('Not a replay of this version of the game')
+    offset = _HEADER.size
+
+    def read(layout: struct.Struct) -> tuple:
+        nonlocal offset
+        values = layout.unpack_from(data, offset)
+        offset += layout.size
+        return values
+
+    player_IDs = [read(_ID)[0] for _ in range(player_count)]
+    moving_IDs = {read(_ID)[0] for _ in range(read(_ID)[0])}
+
+    layout = {}
+    for _ in range(player_count):
+        ID, direction, length = read(_SNAKE_HEADER)
+        layout[ID] = (
+            _DIRECTIONS[direction], [read(_CELL) for _ in range(length)]
+        )
+
+    end_tick, = read(_COUNT)
+    inputs = {}
+    for _ in range(read(_COUNT)[0]):
+        tick, count = read(_TICK_HEADER)
+        inputs[tick] = [read(_INPUT) for _ in range(count)]
+
+    return Replay(
+        width=width,
+        height=height,
+        seed=seed,
+        tick_rate=tick_rate,
+        player_IDs=player_IDs,
+        moving_IDs=moving_IDs or None,
+        layout=layout,
+        end_tick=end_tick,
+        inputs=inputs
+    )
+
+
+def load_replay(path: str) -> Replay:
+    """
+    :param path: the path of a replay file
+    :return: the replay
+    """
+
+    with open(path, 'rb') as file:
+        return decode_replay(file.read())
+
+
+class Replay_Game:
+    """
+    Plays a recorded game again, a tick at a time
+    """
+
+    def __init__(self, replay: Replay) -> None:
+        self.replay = replay
+        self.engine = Snake_Engine(
+            replay.width, replay.height, replay.player_IDs, replay.seed
+        )
+        layout = {
+            ID: (snake.direction, list(snake.cells))
+            for ID, snake in self.engine.snakes.items()
+        }
+        if layout != replay.layout:
+            raise ValueError('The replay was recorded with different rules')
+
+    @property
+    def is_done(self) -> bool:
+        """
+        :return: whether the whole recording was played
+        """
+
+        return self.engine.tick >= self.replay.end_tick or \
+            self.engine.state != Game_State.ONGOING
+
+    def play_tick(self) -> bool:
+        """
+        Applies the inputs of the next tick and steps the game
+        ...
+        :return: whether the game stepped, False once the recording ended
+        """
+
+        for ID, input in self.replay.inputs.get(self.engine.tick + 1, []):
+            if input == LEAVE:
+                self.engine.remove_player(ID)
+            else:
+                self.engine.set_direction(ID, _DIRECTIONS[input])
+        if self.is_done:
+            return False
+        self.engine.step(self.replay.moving_IDs)
+        return True
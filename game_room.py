@@ -0,0 +1,717 @@
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import os
+import random
+import time
+
+from enums import Player_Command, Game_State
+from game_packet_API import Game_Packet, Game_Packet_Type
+from game_connection import Connection
+from snake_config import Snake_Config as Config
+from snake_engine import Snake_Engine
+from game_snapshots import Snapshot_History, Frame_Cache
+from game_inputs import Input_Queue
+from tick_scheduler import Tick_Scheduler
+from game_replay import Replay_Recorder
+from game_metrics import NULL_METRICS
+from game_logging import set_log_context
+from game_interest import Player_View
+from game_packet_protocol import encode_packet
+from game_datagrams import Datagram_Endpoint, Datagram_Channel
+
+
+@dataclass
+class Player:
+    username: str
+    ID: int
+    connection: Connection
+    ready: bool = False
+    keyframe_tick: int = None  # the tick of the last whole board sent
+    acked_tick: int = None  # the last tick the player confirmed
+    inputs: Input_Queue = field(default_factory=Input_Queue)
+    view: Player_View = None  # None when the player sees the whole board
+    channel: Datagram_Channel = None  # None when the player only uses TCP
+
+
+@dataclass
+class Spectator:
+    username: str
+    connection: Connection
+    sent_tick: int = None  # the tick of the last board sent
+
+
+def room_seed(seed: int, room_ID: int) -> int:
+    """
+    :param seed: the seed the server was given, None for a random one
+    :param room_ID: the ID of the room
+    :return: the seed of the room's game, every room gets its own, kept\
+     to 32 bits so it fits in a replay
+    """
+
+    if seed is None:
+        return None
+    return (seed + room_ID) & 0xFFFFFFFF
+
+
+def watched_room(rooms: dict, room_ID: int = None):
+    """
+    :param rooms: the open rooms by their IDs
+    :param room_ID: the room a spectator asked for, None for any
+    :return: the room to watch, the newest one with a game unless one was\
+     asked for, None if there is no such room
+    """
+
+    if room_ID is not None:
+        return rooms.get(room_ID)
+    return max(
+        rooms.values(), key=lambda room: (room.is_full, room.ID), default=None
+    )
+
+
+class Game_Room:
+    """
+    A single match, from players joining until someone wins
+    Many rooms can run at the same time on the same event loop
+    """
+
+    def __init__(
+        self,
+        room_ID: int,
+        player_count: int,
+        board_width: int, board_height: int,
+        debug: bool = False,
+        tick_rate: float = Config.TICK_RATE,
+        seed: int = None,
+        replay_directory: str = None,
+        metrics=NULL_METRICS,
+        view_radius: int = None,
+        datagrams: Datagram_Endpoint = None
+    ) -> None:
+        self._logger = logging.getLogger()
+
+        self.ID = room_ID
+        self._num_of_players = player_count
+        self._board_width = board_width
+        self._board_height = board_height
+        self._game_debug = debug
+        self._tick_rate = tick_rate
+        self._seed = seed
+        self._replay_directory = replay_directory
+        self._metrics = metrics
+        self._view_radius = view_radius
+        self._datagrams = datagrams
+        if debug:
+            self._moving_IDs = {1}
+        else:
+            self._moving_IDs = None
+
+        self._players = {}
+        self._spectators = {}  # connection: spectator
+        self._started = False
+        self._engine = None
+        self._recorder = None
+        self._handler_tasks = set()
+        self._history = Snapshot_History(Config.SNAPSHOT_HISTORY_TICKS)
+        self._broadcast_tick = None  # the tick of the last broadcast
+        self._frames = Frame_Cache()
+        self.stop_handling_clients = False
+
+        self._all_joined = asyncio.Event()
+        self._everyone_ready = asyncio.Event()
+
+    @property
+    def is_full(self) -> bool:
+        """
+        :return: whether no more players can join the room
+        """
+
+        return self._all_joined.is_set()
+
+    @property
+    def player_count(self) -> int:
+        """
+        :return: how many players are in the room
+        """
+
+        return len(self._players)
+
+    async def handle_player(
+        self,
+        username: str,
+        connection: Connection,
+        udp: bool = False
+    ) -> None:
+        """
+        Handles a player, from joining the room until they leave
+        Puts the inputs they send in their input queue, game state is
+        pushed to the player by the game loop
+        The player is added before anything is awaited, so a room that
+        isn't full when this is called always has room for them
+        ...
+        :param username: the player's username
+        :param connection: the connection with the player
+        :param udp: whether the player asked for the game traffic to go\
+         over UDP, it does only if the room has a datagram endpoint
+        """
+
+        self._handler_tasks.add(asyncio.current_task())
+        player = Player(
+            username=username,
+            ID=min(set(range(self._num_of_players)) - set(self._players)),
+            connection=connection
+        )
+        if self._view_radius is not None:
+            player.view = Player_View(player.ID, self._view_radius)
+        udp_info = {}
+        if udp and self._datagrams:
+            player.channel = self._datagrams.open_channel()
+            player.channel.on_packet = \
+                lambda packet: self._handle_datagram_packet(player, packet)
+            udp_info = {
+                'udp port': self._datagrams.port,
+                'udp token': player.channel.token.hex()
+            }
+        self._players[player.ID] = player
+        set_log_context(room=self.ID, player=player.ID, username=username)
+        self._logger.debug(f'Player {username} joined room {self.ID}')
+
+        try:
+            connection.send(
+                Game_Packet(
+                    type=Game_Packet_Type.PLAYER_INFO,
+                    data={
+                        'player ID': player.ID,
+                        'player color': Config.SNAKE_COLORS[player.ID],
+                        'board size': [self._board_width, self._board_height],
+                        'tick rate': self._tick_rate,
+                        'view radius': self._view_radius,
+                        **udp_info
+                    }
+                )
+            )
+            if len(self._players) == self._num_of_players:
+                if self._seed is None:
+                    # a replay needs the seed the game was played with
+                    self._seed = random.getrandbits(32)
+                self._engine = Snake_Engine(
+                    self._board_width, self._board_height,
+                    list(self._players), self._seed,
+                    None if self._view_radius is None
+                    else Config.VIEW_BUCKET_SIZE
+                )
+                self._engine.metrics = self._metrics
+                if self._replay_directory:
+                    self._recorder = Replay_Recorder(
+                        self._engine, self._tick_rate, self._moving_IDs
+                    )
+                self._all_joined.set()
+
+            while True:
+                packet = await connection.recieve_packet()
+                self._handle_packet(player, packet)
+                if packet.type == Game_Packet_Type.PLAYER_INPUTS and \
+                   packet.data['status'] == Player_Command.QUIT:
+                    self._logger.debug(
+                        f'Player {player.username} has disconnected'
+                    )
+                    self._remove_player(player)
+                    return
+
+        except (OSError, ValueError, TypeError, KeyError):
+            if self.stop_handling_clients:
+                # the game is done and the player left
+                return
+            self._logger.debug(
+                f'Player {player.username} has disconnected unexpectedly'
+            )
+            self._remove_player(player)
+        finally:
+            connection.abort()
+            if player.channel:
+                player.channel.close()
+            self._handler_tasks.discard(asyncio.current_task())
+
+    async def handle_spectator(
+        self,
+        username: str,
+        connection: Connection
+    ) -> None:
+        """
+        Handles a spectator, from joining the room until they leave
+        Spectators can join at any time, they are sent the boards all the
+        players that see the whole board get and nothing they send matters
+        but leaving
+        ...
+        :param username: the spectator's username
+        :param connection: the connection with the spectator
+        """
+
+        set_log_context(room=self.ID, username=username)
+        if self.stop_handling_clients:
+            connection.abort()
+            return
+        self._spectators[connection] = Spectator(
+            username=username, connection=connection
+        )
+        self._logger.debug(f'{username} is watching room {self.ID}')
+
+        try:
+            connection.send(
+                Game_Packet(
+                    type=Game_Packet_Type.PLAYER_INFO,
+                    data={
+                        'player ID': None,
+                        'player color': Config.BGCOLOR,
+                        'board size': [self._board_width, self._board_height],
+                        'tick rate': self._tick_rate
+                    }
+                )
+            )
+            if self._started:
+                connection.send(Game_Packet(type=Game_Packet_Type.START_GAME))
+
+            while True:
+                packet = await connection.recieve_packet()
+                if packet.type == Game_Packet_Type.PLAYER_INPUTS and \
+                   packet.data['status'] == Player_Command.QUIT:
+                    return
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        finally:
+            self._logger.debug(f'{username} stopped watching room {self.ID}')
+            self._spectators.pop(connection, None)
+            connection.abort()
+
+    def _handle_packet(self, player: Player, packet: Game_Packet) -> None:
+        """
+        Handles a packet a player sent
+        ...
+        :param player: the player who sent the packet
+        :param packet: the packet
+        """
+
+        if packet.type == Game_Packet_Type.PLAYER_READY:
+            self._logger.debug(f'Player {player.ID} is ready')
+            player.ready = True
+            self._check_everyone_ready()
+        elif packet.type == Game_Packet_Type.SNAPSHOT_ACK:
+            if player.acked_tick is None or \
+               packet.data['tick'] > player.acked_tick:
+                player.acked_tick = packet.data['tick']
+        elif packet.type == Game_Packet_Type.PLAYER_INPUTS:
+            if packet.data['change dir'] is not None:
+                player.inputs.push(
+                    packet.data['seq'], packet.data['change dir']
+                )
+
+    def _handle_datagram_packet(
+        self, player: Player, packet: Game_Packet
+    ) -> None:
+        """
+        Handles a packet a player sent over UDP, only inputs and snapshot
+        confirmations can come that way, anything that has to arrive goes
+        over the connection
+        ...
+        :param player: the player who sent the packet
+        :param packet: the packet
+        """
+
+        if packet.type in (
+            Game_Packet_Type.PLAYER_INPUTS, Game_Packet_Type.SNAPSHOT_ACK
+        ):
+            try:
+                self._handle_packet(player, packet)
+            except (TypeError, KeyError):
+                pass
+
+    def _remove_player(self, player: Player) -> None:
+        """
+        Removes a player that left from the game
+        ...
+        :param player: the player that left
+        """
+
+        self._players.pop(player.ID, None)
+        if self._engine:
+            self._engine.remove_player(player.ID)
+            if self._recorder:
+                self._recorder.leave(player.ID)
+        # don't wait forever for someone that left
+        self._check_everyone_ready()
+
+    def _check_everyone_ready(self) -> None:
+        """
+        Lets the game start once all players joined and are ready
+        """
+
+        if self._all_joined.is_set() and \
+           all(player.ready for player in self._players.values()):
+            self._everyone_ready.set()
+
+    async def run_game(self) -> None:
+        """
+        The mainloop of the room, returns when the game is done
+        """
+
+        set_log_context(room=self.ID)
+        await self._all_joined.wait()
+        set_log_context(seed=self._seed)
+        self._logger.debug(f'Room {self.ID} is full')
+
+        # waiting for all players to be ready:
+        await self._everyone_ready.wait()
+        self._logger.debug(f'Everyone in room {self.ID} is ready')
+
+        #  telling the players and spectators that the game started
+        self._started = True
+        connections = [player.connection for player in self._players.values()]
+        connections.extend(self._spectators)
+        for connection in connections:
+            connection.send(
+                Game_Packet(
+                    type=Game_Packet_Type.START_GAME
+                )
+            )
+        self._logger.debug('Sent start game packets')
+        self._broadcast_game_state()
+
+        scheduler = Tick_Scheduler(self._tick_rate)
+        metrics = self._metrics
+        metrics.add_collector(self._collect_metrics)
+        try:
+            while True:
+                if len(self._players) == 0:  # all players quit\game is done
+                    break
+                skipped = scheduler.skipped
+                ticks = await scheduler.next_ticks()
+                tick_start = start = metrics.clock()
+
+                for _ in range(ticks):
+                    self._apply_inputs()
+                    start = metrics.phase('inputs', start)
+                    self._engine.step(self._moving_IDs)
+                    start = metrics.clock()
+                    self._history.record(
+                        self._engine.tick, self._engine.pop_events()
+                    )
+                    start = metrics.phase('history', start)
+                self._broadcast_game_state()
+                metrics.phase('total', tick_start)
+                metrics.count('ticks_total', ticks)
+                metrics.count('tick_overruns_total', ticks - 1)
+                metrics.count(
+                    'ticks_skipped_total', scheduler.skipped - skipped
+                )
+
+                if self._engine.state == Game_State.DONE:
+                    # every player already got the last game update
+                    await self._close_players()
+        finally:
+            metrics.remove_collector(self._collect_metrics)
+
+        self._logger.debug(f'Game in room {self.ID} done')
+        self._logger.info(
+            f'Room {self.ID} tick times: {scheduler.durations.summary()}, '
+            f'{scheduler.skipped} ticks skipped'
+        )
+        if self._recorder:
+            await asyncio.to_thread(self._save_replay)
+
+    def _save_replay(self) -> None:
+        """
+        Writes the recording of the game to the replay directory
+        """
+
+        os.makedirs(self._replay_directory, exist_ok=True)
+        path = os.path.join(
+            self._replay_directory,
+            f'room_{self.ID}_{time.strftime("%Y%m%d_%H%M%S")}.replay'
+        )
+        try:
+            self._recorder.save(path)
+            self._logger.info(f'Saved the replay of room {self.ID} to {path}')
+        except OSError:
+            self._logger.exception(
+                f'Could not save the replay of room {self.ID}'
+            )
+
+    def _apply_inputs(self) -> None:
+        """
+        Turns every snake by the next input its player queued
+        """
+
+        for player in self._players.values():
+            snake = self._engine.snakes.get(player.ID)
+            if snake:
+                direction = player.inputs.next_direction(snake.direction)
+                if direction:
+                    self._engine.set_direction(player.ID, direction)
+                    if self._recorder:
+                        self._recorder.turn(player.ID, direction)
+
+    def _broadcast_game_state(self) -> None:
+        """
+        Sends the current state of the game to every player
+        Players get only the changes since the last board they have, the
+        whole board is sent when the history doesn't go back that far
+        Players with a view are sent only what is in it, from their own
+        history of what they were sent
+        Every player gets a small status of their own right before the
+        board, so players that see the whole board share its bytes
+        Spectators share them too
+        Players on UDP get the status and the changes in one datagram,
+        whole boards go over the connection, so the player surely gets
+        them and the changes can go on from them right away, and so do
+        changes too big for a datagram
+        The last board is a whole board, a player leaving can end the game
+        without the tick moving on, so the change would land in a tick the
+        players already have
+        """
+
+        metrics = self._metrics
+        encoding = sending = 0
+        tick = self._engine.tick
+        done = self._engine.state == Game_State.DONE
+        new_ticks = []
+        if self._broadcast_tick is not None:
+            new_ticks = self._history.delta(self._broadcast_tick, tick)
+        self._broadcast_tick = tick
+        self._frames.start(tick)
+        for player in list(self._players.values()):
+            history = self._history
+            if player.view:
+                history = player.view.history
+                if player.view.keyframe_tick is not None:
+                    player.view.update(self._engine, new_ticks)
+
+            base_tick = self._base_tick(player)
+            if base_tick is None or done:
+                ticks = None
+            else:
+                ticks = history.delta(base_tick, tick)
+
+            start = metrics.clock()
+            status = encode_packet(Game_Packet(
+                type=Game_Packet_Type.PLAYER_STATUS,
+                data={
+                    'tick': tick,
+                    'player state': self._engine.player_state(player.ID),
+                    'input seq': player.inputs.last_seq
+                }
+            ))
+            if ticks is None:
+                frame = self._keyframe_frame(player)
+            else:
+                frame = self._delta_frame(base_tick, ticks, player)
+            encoded = metrics.clock()
+            if ticks is None or not (
+                player.channel and player.channel.send_frames([status, frame])
+            ):
+                player.connection.send_frame(status)
+                player.connection.send_frame(frame)
+                if ticks is None:
+                    player.keyframe_tick = tick
+            encoding += encoded - start
+            sending += metrics.clock() - encoded
+
+        if self._spectators:
+            start = metrics.clock()
+            self._send_to_spectators()
+            sending += metrics.clock() - start
+
+        metrics.observe('serialization', encoding)
+        metrics.observe('send', sending)
+
+    def _send_to_spectators(self) -> None:
+        """
+        Sends the current board to every spectator, the changes since the
+        last board they were sent
+        A spectator that fell so far behind that their connection dropped
+        frames, or past the history, is sent the whole board again, so a
+        slow spectator only ever costs the room queuing a frame
+        """
+
+        tick = self._engine.tick
+        status = self._frames.get(
+            'spectator status',
+            lambda: encode_packet(Game_Packet(
+                type=Game_Packet_Type.PLAYER_STATUS,
+                data={'tick': tick, 'player state': None, 'input seq': 0}
+            ))
+        )
+        for spectator in self._spectators.values():
+            connection = spectator.connection
+            if connection.overflowed:
+                connection.overflowed = False
+                spectator.sent_tick = None
+
+            ticks = None
+            if spectator.sent_tick is not None and \
+               self._engine.state != Game_State.DONE:
+                ticks = self._history.delta(spectator.sent_tick, tick)
+            if ticks is None:
+                frame = self._keyframe_frame()
+            else:
+                frame = self._delta_frame(spectator.sent_tick, ticks)
+            connection.send_frame(status)
+            connection.send_frame(frame)
+            spectator.sent_tick = tick
+
+    def _keyframe_frame(self, player: Player = None) -> bytes:
+        """
+        :param player: the player to send the board to, None for a\
+         spectator
+        :return: the encoded whole board, encoded once a broadcast for all\
+         the players that see the whole board
+        """
+
+        if player and player.view:
+            return encode_packet(Game_Packet(
+                type=Game_Packet_Type.GAME_STATUS,
+                data=player.view.keyframe(self._engine)
+            ))
+        return self._frames.get(
+            None,
+            lambda: encode_packet(Game_Packet(
+                type=Game_Packet_Type.GAME_STATUS,
+                data=self._engine.snapshot()
+            ))
+        )
+
+    def _delta_frame(
+        self, base_tick: int, ticks: list, player: Player = None
+    ) -> bytes:
+        """
+        :param base_tick: the tick the changes start from
+        :param ticks: the changes, as given by Snapshot_History.delta
+        :param player: the player to send the changes to, None for a\
+         spectator
+        :return: the encoded changes, encoded once a broadcast for every\
+         base tick the players that see the whole board have
+        """
+
+        packet = Game_Packet(
+            type=Game_Packet_Type.GAME_DELTA,
+            data={
+                'base tick': base_tick,
+                'tick': self._engine.tick,
+                'game state': self._engine.state,
+                'ticks': ticks
+            }
+        )
+        if player and player.view:
+            return encode_packet(packet)
+        return self._frames.get(base_tick, lambda: encode_packet(packet))
+
+    def _collect_metrics(self) -> list[tuple[str, dict, int]]:
+        """
+        Reads the traffic and queues of every player for the metrics
+        ...
+        :return: a list of (name, labels, value)
+        """
+
+        values = []
+        for player in self._players.values():
+            labels = {'room': self.ID, 'player': player.ID}
+            connection = player.connection
+            values.extend([
+                ('client_bytes_sent_total', labels, connection.bytes_sent),
+                (
+                    'client_bytes_recieved_total', labels,
+                    connection.bytes_recieved
+                ),
+                ('client_packets_sent_total', labels, connection.packets_sent),
+                (
+                    'client_packets_recieved_total', labels,
+                    connection.packets_recieved
+                ),
+                (
+                    'client_send_queue_frames', labels,
+                    connection.queued_frames
+                ),
+                ('client_input_queue_inputs', labels, len(player.inputs))
+            ])
+            if player.channel:
+                values.append((
+                    'client_datagram_bytes_sent_total', labels,
+                    player.channel.bytes_sent
+                ))
+        values.append(
+            ('room_spectators', {'room': self.ID}, len(self._spectators))
+        )
+        dropped = sum(
+            connection.frames_dropped for connection in self._spectators
+        )
+        values.append(
+            ('spectator_frames_dropped_total', {'room': self.ID}, dropped)
+        )
+        return values
+
+    def _base_tick(self, player: Player) -> int:
+        """
+        The newest board the player surely has, either one they confirmed
+        or the last whole board sent, whole boards always go over the
+        connection, which keeps order, changes sent over UDP can be lost
+        ...
+        :param player: the player to check
+        :return: the tick of that board, None if nothing was sent yet
+        """
+
+        ticks = [
+            tick for tick in (player.acked_tick, player.keyframe_tick)
+            if tick is not None
+        ]
+        return max(ticks, default=None)
+
+    async def _close_players(self) -> None:
+        """
+        Closes the connections with all players once the game is done
+        Waits until the last game update was sent to everyone, and gives
+        the players some time to leave before cutting them off
+        """
+
+        self.stop_handling_clients = True
+        players = list(self._players.values())
+        self._players.clear()
+        for player in players:
+            player.connection.close()
+        await asyncio.gather(
+            *(player.connection.wait_closed() for player in players),
+            self._close_spectators()
+        )
+
+        tasks = {task for task in self._handler_tasks if not task.done()}
+        if tasks:
+            await asyncio.wait(tasks, timeout=Config.CLOSE_TIMEOUT)
+        for player in players:
+            player.connection.abort()
+            self._logger.debug(f'Closed connection with {player.username}')
+            if player.inputs.dropped:
+                self._logger.debug(
+                    f'Dropped {player.inputs.dropped} inputs '
+                    f'of {player.username}'
+                )
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def _close_spectators(self) -> None:
+        """
+        Closes the connections with all spectators once the game is done,
+        a spectator too slow to get the last board in time is cut off
+        """
+
+        connections = list(self._spectators)
+        for connection in connections:
+            connection.close()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *(connection.wait_closed() for connection in connections)
+                ),
+                Config.CLOSE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            pass
+        for connection in connections:
+            connection.abort()
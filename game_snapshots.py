@@ -0,0 +1,163 @@
+from collections import deque
+
+from enums import Game_Event, Game_State
+
+
+class Snapshot_History:
+    """
+    Keeps the board changes of the last ticks so every player can be sent
+    only what changed since the last snapshot they confirmed
+    """
+
+    def __init__(self, max_ticks: int) -> None:
+        self._ticks = deque(maxlen=max_ticks)  # (tick, events)
+
+    def record(self, tick: int, events: list) -> None:
+        """
+        Saves the changes made in a tick
+        Changes made while the tick didn't advance are added to the last tick
+        ...
+        :param tick: the tick the changes were made in
+        :param events: the changes, as given by Snake_Engine.pop_events
+        """
+
+        if self._ticks and self._ticks[-1][0] == tick:
+            self._ticks[-1][1].extend(events)
+        else:
+            self._ticks.append((tick, list(events)))
+
+    def delta(self, base_tick: int, tick: int) -> list:
+        """
+        :param base_tick: the tick the player already has
+        :param tick: the tick to bring the player to
+        :return: a list of (tick, events) for every tick after base_tick,\
+         None if the history doesn't reach back to base_tick
+        """
+
+        if not self._ticks or self._ticks[0][0] > base_tick + 1:
+            return None
+        return [
+            (event_tick, events)
+            for event_tick, events in self._ticks
+            if base_tick < event_tick <= tick
+        ]
+
+
+class Frame_Cache:
+    """
+    The encoded boards of a broadcast, so a board sent to many connections
+    is encoded once and the same bytes are queued to all of them
+    The cache starts over with every broadcast, the board can change
+    without the tick advancing, like when a player leaves
+    """
+
+    def __init__(self) -> None:
+        self.tick = None
+        self._frames = {}
+
+    def start(self, tick: int) -> None:
+        """
+        Drops the frames of the last broadcast
+        ...
+        :param tick: the tick of the new broadcast
+        """
+
+        self.tick = tick
+        self._frames.clear()
+
+    def get(self, key, encode) -> bytes:
+        """
+        :param key: what tells the frames of the broadcast apart, like the\
+         base tick of a delta
+        :param encode: makes the frame when it isn't cached, called with\
+         no arguments
+        :return: the frame
+        """
+
+        frame = self._frames.get(key)
+        if frame is None:
+            frame = self._frames[key] = encode()
+        return frame
+
+
+class Client_Board:
+    """
+    The board as the client knows it, built from a keyframe and kept up
+    to date by applying deltas
+    """
+
+    def __init__(self) -> None:
+        self.tick = None
+        self.game_state = Game_State.HASNT_STARTED
+        self.player_state = None
+        self.input_seq = 0  # the newest input the server queued
+        self.status_tick = None  # the tick of the last player status
+        self.snakes = {}  # ID: deque of cells, head first
+        self.apples = set()
+
+    def load_keyframe(self, data: dict) -> None:
+        """
+        Replaces the whole board
+        ...
+        :param data: the GAME_STATUS packet data
+        """
+
+        self.tick = data['tick']
+        self.game_state = data['game state']
+        self.snakes = {
+            snake['ID']: deque(tuple(cell) for cell in snake['cells'])
+            for snake in data['snakes']
+        }
+        self.apples = {tuple(apple) for apple in data['apples']}
+
+    def apply_delta(self, data: dict) -> bool:
+        """
+        Applies the changes of every tick the board doesn't have yet
+        ...
+        :param data: the GAME_DELTA packet data
+        :return: whether the delta could be applied, it can't if it starts\
+         after the board's tick
+        """
+
+        if self.tick is None or data['base tick'] > self.tick:
+            return False
+
+        for tick, events in data['ticks']:
+            if tick <= self.tick:
+                continue
+            for event, ID, cell in events:
+                match event:
+                    case Game_Event.HEAD_ADDED:
+                        self.snakes[ID].appendleft(cell)
+                    case Game_Event.TAIL_REMOVED:
+                        self.snakes[ID].pop()
+                    case Game_Event.APPLE_EATEN | Game_Event.APPLE_LEFT:
+                        self.apples.discard(cell)
+                    case Game_Event.APPLE_SPAWNED | Game_Event.APPLE_ENTERED:
+                        self.apples.add(cell)
+                    case Game_Event.SNAKE_DIED | Game_Event.SNAKE_LEFT:
+                        self.snakes.pop(ID, None)
+                    case Game_Event.SNAKE_ENTERED:
+                        # parts come head first
+                        self.snakes.setdefault(ID, deque()).append(cell)
+            self.tick = tick
+
+        self.tick = max(self.tick, data['tick'])
+        self.game_state = data['game state']
+        return True
+
+    def set_player_status(self, data: dict) -> None:
+        """
+        Updates what the server told only this player, sent right before
+        every board
+        A status older than the last one is ignored, with UDP the one sent
+        with a board over TCP can arrive after newer ones
+        ...
+        :param data: the PLAYER_STATUS packet data
+        """
+
+        if self.status_tick is not None and data['tick'] < self.status_tick:
+            return
+        self.status_tick = data['tick']
+        self.player_state = data['player state']
+        self.input_seq = data['input seq']
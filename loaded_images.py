@@ -1,4 +1,5 @@
 from traceback import print_tb
+from collections import OrderedDict
 import pygame
 import os
 
@@ -11,14 +12,18 @@ class Loaded_Images:
     Class used for already loaded images as to not load them in run time
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        tile_width: int = Config.TILE_WIDTH,
+        tile_height: int = Config.TILE_HEIGHT
+    ) -> None:
         # snake parts
         temp = pygame.image.load(os.path.join(
             Config.SNAKE_PARTS_DIRECTORY, 'head.png'
         ))
         self._snake_head = temp.copy()
         self._snake_head = pygame.transform.scale(
-            self._snake_head, (Config.TILE_WIDTH, Config.TILE_HEIGHT)
+            self._snake_head, (tile_width, tile_height)
         )
 
         temp = pygame.image.load(os.path.join(
@@ -26,7 +31,7 @@ class Loaded_Images:
         ))
         self._snake_body = temp.copy()
         self._snake_body = pygame.transform.scale(
-            self._snake_body, (Config.TILE_WIDTH, Config.TILE_HEIGHT)
+            self._snake_body, (tile_width, tile_height)
         )
 
         temp = pygame.image.load(os.path.join(
@@ -34,13 +39,13 @@ class Loaded_Images:
         ))
         self._snake_tail = temp.copy()
         self._snake_tail = pygame.transform.scale(
-            self._snake_tail, (Config.TILE_WIDTH, Config.TILE_HEIGHT)
+            self._snake_tail, (tile_width, tile_height)
         )
 
         # apple
         self._apple = pygame.image.load(Config.APPLE_IMAGE_PATH).copy()
         self._apple = pygame.transform.scale(
-            self._apple, (Config.TILE_WIDTH, Config.TILE_HEIGHT)
+            self._apple, (tile_width, tile_height)
         )
 
         self._all = {
@@ -49,12 +54,54 @@ class Loaded_Images:
             Game_Object.SNAKE_TAIL: self._snake_tail,
             Game_Object.APPLE: self._apple
         }
+        self._cache = OrderedDict()  # (object, color, direction): image
 
     def get_image(
         self,
         object: Game_Object,
         color: Color,
         direction: Direction
+    ) -> pygame.Surface:
+        """
+        Returns the image of an object, tinted and rotated
+        Images are made once and kept, the least recently used are dropped
+        when there are more than Config.IMAGE_CACHE_SIZE
+        ...
+        :param object: the object
+        :param color: the color of the object, None for the default color
+        :param direction: the direction the object faces
+        :return: the image, shared so it must not be drawn on
+        """
+
+        key = (object, tuple(color) if color else None, direction)
+        image = self._cache.get(key)
+        if image is None:
+            image = self._make_image(*key)
+            self._cache[key] = image
+            if len(self._cache) > Config.IMAGE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return image
+
+    def prebake(self, colors: list[Color]) -> None:
+        """
+        Makes the images of every snake part in every direction for the
+        given colors, so nothing is made while the game is drawn
+        ...
+        :param colors: the colors of the snakes
+        """
+
+        for object in self._all:
+            for color in (colors if object != Game_Object.APPLE else [None]):
+                for direction in list(Direction) + [None]:
+                    self.get_image(object, color, direction)
+
+    def _make_image(
+        self,
+        object: Game_Object,
+        color: Color,
+        direction: Direction
     ) -> pygame.Surface:
         image = self._all[object].copy()
         if color:
@@ -63,20 +110,14 @@ class Loaded_Images:
             del var
         match direction:
             case Direction.UP:
-                return pygame.transform.rotate(
-                    image, 0
-                )
+                image = pygame.transform.rotate(image, 0)
             case Direction.DOWN:
-                return pygame.transform.rotate(
-                    image, 180
-                )
+                image = pygame.transform.rotate(image, 180)
             case Direction.RIGHT:
-                return pygame.transform.rotate(
-                    image, 270
-                )
+                image = pygame.transform.rotate(image, 270)
             case Direction.LEFT:
-                return pygame.transform.rotate(
-                    image, 90
-                )
-            case _:
-                return image
+                image = pygame.transform.rotate(image, 90)
+        if pygame.display.get_surface():
+            # blits faster when it matches the screen's pixel format
+            image = image.convert_alpha()
+        return image
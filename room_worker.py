@@ -0,0 +1,634 @@
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import struct
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+
+from game_connection import Connection
+from game_packet_API import Game_Packet
+from game_packet_protocol import encode_packet, Frame_Decoder
+from game_logging import setup_logging, set_log_context, worker_log_file
+from game_metrics import Metrics, NULL_METRICS, serve_metrics, log_metrics
+from game_room import Game_Room, room_seed, watched_room
+from game_datagrams import open_datagram_endpoint
+from snake_config import Snake_Config as Config
+
+
+# every message between the front process and a worker starts with the
+# payload length, the connection (or room) it is about and its kind
+LINK_HEADER = struct.Struct('!IIB')
+# the payload of a RESYNC, how many frames were dropped
+RESYNC_PAYLOAD = struct.Struct('!I')
+
+
+class Link_Message(int, Enum):
+    HELLO = 1  # worker -> front, the ID is the worker's ID
+    OPEN = 2  # front -> worker, a player or spectator joined a room
+    DATA = 3  # either way, data of a player's connection
+    CLOSE = 4  # either way, a player's connection was closed
+    ROOM_DONE = 5  # worker -> front, the ID is the room's ID
+    LOAD = 6  # worker -> front, a load report
+    RESYNC = 7  # front -> worker, frames of a spectator had to be dropped
+
+
+def link_message(
+    ID: int, kind: Link_Message, payload: bytes = b''
+) -> bytes:
+    """
+    :param ID: the connection, room or worker the message is about
+    :param kind: the kind of the message
+    :param payload: the payload of the message
+    :return: the message ready to be sent on the link
+    """
+
+    return LINK_HEADER.pack(len(payload), ID, kind.value) + payload
+
+
+async def read_link_message(
+    reader: asyncio.StreamReader
+) -> tuple[int, Link_Message, bytes]:
+    """
+    :param reader: the link to read from
+    :return: the ID, kind and payload of the next message
+    """
+
+    length, ID, kind = LINK_HEADER.unpack(
+        await reader.readexactly(LINK_HEADER.size)
+    )
+    return ID, Link_Message(kind), await reader.readexactly(length)
+
+
+class Relayed_Connection:
+    """
+    A player connection that is held by the front process
+    Works like a Connection for the room, but frames go over the link
+    between the worker and the front process
+    """
+
+    def __init__(
+        self,
+        connection_ID: int,
+        link: asyncio.StreamWriter,
+        address: str
+    ) -> None:
+        self.address = address
+        self._ID = connection_ID
+        self._link = link
+
+        self._decoder = Frame_Decoder()
+        self._packets = deque()
+        self._data = asyncio.Queue()
+        self._closing = False
+        self.bytes_sent = 0
+        self.bytes_recieved = 0
+        self.packets_sent = 0
+        self.packets_recieved = 0
+        self.queued_frames = 0  # the front process queues the frames
+        self.overflowed = False  # set when the front process dropped frames
+        self.frames_dropped = 0  # as reported by the front process
+
+    def send(self, packet: Game_Packet) -> None:
+        self.send_frame(encode_packet(packet))
+
+    def send_frame(self, frame: bytes) -> None:
+        if not self._closing:
+            self._link.write(link_message(self._ID, Link_Message.DATA, frame))
+            self.bytes_sent += len(frame)
+            self.packets_sent += 1
+
+    def feed(self, data: bytes) -> None:
+        """
+        Adds data relayed from the player
+        ...
+        :param data: the data, None when the player disconnected
+        """
+
+        self._data.put_nowait(data)
+
+    async def recieve_packet(self) -> Game_Packet:
+        while not self._packets:
+            data = await self._data.get()
+            if data is None:
+                raise ConnectionResetError('Client closed the connection')
+            self.bytes_recieved += len(data)
+            self._packets.extend(self._decoder.feed(data))
+        self.packets_recieved += 1
+        return self._packets.popleft()
+
+    def close(self) -> None:
+        if not self._closing:
+            self._closing = True
+            self._link.write(link_message(self._ID, Link_Message.CLOSE))
+
+    async def wait_closed(self) -> None:
+        await self._link.drain()
+
+    def abort(self) -> None:
+        self.close()
+
+
+class Room_Worker:
+    """
+    Runs rooms in a worker process, players are relayed to it by the
+    front process over a local connection
+    """
+
+    def __init__(self, worker_ID: int, link_port: int, settings: dict) -> None:
+        self._logger = logging.getLogger()
+
+        self.ID = worker_ID
+        self._link_port = link_port
+        self._settings = settings
+
+        self._rooms = {}
+        self._newest_room_ID = -1  # room IDs are given out in order
+        self._connections = {}
+        self._datagrams = None
+        self._tasks = set()
+        if settings['metrics_port'] is None:
+            self._metrics = NULL_METRICS
+        else:
+            self._metrics = Metrics()
+
+    async def run(self) -> None:
+        """
+        Runs until the front process goes away
+        """
+
+        set_log_context(worker=self.ID)
+        reader, self._link = await asyncio.open_connection(
+            '127.0.0.1', self._link_port
+        )
+        self._link.write(link_message(self.ID, Link_Message.HELLO))
+        if self._settings['udp']:
+            # players are told the port when they join
+            self._datagrams = await open_datagram_endpoint(0)
+        self._logger.debug(f'Worker {self.ID} is up')
+
+        report_task = self._start_task(self._report_load())
+        if self._metrics.enabled:
+            # the front process serves on metrics_port, workers after it
+            self._start_task(serve_metrics(
+                self._metrics, self._settings['metrics_port'] + 1 + self.ID
+            ))
+            self._start_task(
+                log_metrics(self._metrics, Config.METRICS_LOG_INTERVAL)
+            )
+        try:
+            while True:
+                ID, kind, payload = await read_link_message(reader)
+                match kind:
+                    case Link_Message.OPEN:
+                        self._open_connection(ID, json.loads(payload))
+                    case Link_Message.DATA:
+                        if ID in self._connections:
+                            self._connections[ID].feed(payload)
+                    case Link_Message.CLOSE:
+                        if ID in self._connections:
+                            self._connections[ID].feed(None)
+                    case Link_Message.RESYNC:
+                        if ID in self._connections:
+                            connection = self._connections[ID]
+                            connection.overflowed = True
+                            connection.frames_dropped += \
+                                RESYNC_PAYLOAD.unpack(payload)[0]
+        except (asyncio.IncompleteReadError, OSError):
+            self._logger.debug(f'Worker {self.ID} lost the front process')
+        finally:
+            report_task.cancel()
+
+    def _open_connection(self, connection_ID: int, info: dict) -> None:
+        """
+        Puts a player or spectator relayed by the front process in their
+        room
+        ...
+        :param connection_ID: the ID of the connection
+        :param info: the room and username of the client, and whether they\
+         are spectating
+        """
+
+        room = self._rooms.get(info['room'])
+        if room is None and info.get('spectate') and \
+           info['room'] <= self._newest_room_ID:
+            # the game ended before the spectator got here
+            self._link.write(link_message(connection_ID, Link_Message.CLOSE))
+            return
+        if room is None:
+            room = Game_Room(
+                info['room'],
+                self._settings['player_count'],
+                self._settings['board_width'], self._settings['board_height'],
+                self._settings['debug'], self._settings['tick_rate'],
+                room_seed(self._settings['seed'], info['room']),
+                self._settings['replay_directory'], self._metrics,
+                self._settings['view_radius'], self._datagrams
+            )
+            self._rooms[room.ID] = room
+            self._newest_room_ID = max(self._newest_room_ID, room.ID)
+            self._start_task(self._run_room(room))
+
+        connection = Relayed_Connection(
+            connection_ID, self._link, info['address']
+        )
+        self._connections[connection_ID] = connection
+        self._start_task(self._handle_client(room, connection_ID, info))
+
+    def _start_task(self, coroutine) -> asyncio.Task:
+        """
+        Runs a coroutine in the background, the event loop keeps only weak
+        references to tasks, so they are kept here until they are done
+        ...
+        :param coroutine: the coroutine to run
+        :return: the task running it
+        """
+
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _handle_client(
+        self,
+        room: Game_Room,
+        connection_ID: int,
+        info: dict
+    ) -> None:
+        connection = self._connections[connection_ID]
+        try:
+            if info.get('spectate'):
+                await room.handle_spectator(info['username'], connection)
+            else:
+                await room.handle_player(
+                    info['username'], connection, info.get('udp', False)
+                )
+        finally:
+            self._connections.pop(connection_ID, None)
+
+    async def _run_room(self, room: Game_Room) -> None:
+        try:
+            await room.run_game()
+        except Exception:
+            self._logger.exception(f'Room {room.ID} crashed')
+        finally:
+            self._rooms.pop(room.ID)
+            self._link.write(link_message(room.ID, Link_Message.ROOM_DONE))
+
+    async def _report_load(self) -> None:
+        """
+        Tells the front process how busy the worker is
+        The loop lag is how late the report woke up, a stalled room
+        shows up there
+        """
+
+        interval = Config.LOAD_REPORT_INTERVAL
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = time.perf_counter() - start - interval
+            report = json.dumps({
+                'rooms': len(self._rooms),
+                'players': sum(
+                    room.player_count for room in self._rooms.values()
+                ),
+                'loop lag ms': round(lag * 1000, 1)
+            }).encode()
+            self._link.write(
+                link_message(self.ID, Link_Message.LOAD, report)
+            )
+
+
+def run_worker(worker_ID: int, link_port: int, settings: dict) -> None:
+    """
+    The entry point of a worker process
+    ...
+    :param worker_ID: the ID of the worker
+    :param link_port: the port the front process listens on for workers
+    :param settings: the settings of the rooms
+    """
+
+    setup_logging(
+        settings['log_level'], worker_log_file(worker_ID), console=False
+    )
+    asyncio.run(Room_Worker(worker_ID, link_port, settings).run())
+
+
+@dataclass
+class Worker_Handle:
+    ID: int
+    process: multiprocessing.Process
+    link: asyncio.StreamWriter = None
+    rooms: set = field(default_factory=set)
+    clients: dict = field(default_factory=dict)  # connection ID: Connection
+    load: dict = field(default_factory=dict)  # the last load report
+
+
+@dataclass
+class Remote_Room:
+    ID: int
+    worker: Worker_Handle
+    player_count: int
+    players: int = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self.players == self.player_count
+
+
+class Worker_Pool:
+    """
+    The front process side of the workers, starts them, gives every new
+    room to the least busy worker and relays the players' data
+    """
+
+    def __init__(self, worker_count: int, settings: dict) -> None:
+        self._logger = logging.getLogger()
+
+        self._worker_count = worker_count
+        self._settings = settings
+
+        self._workers = {}
+        self._rooms = {}  # room ID: Remote_Room
+        self._spots = {}  # connection ID: the room a player takes a spot in
+        self._waiting_room = None
+        self._next_room_ID = 0
+        self._connection_IDs = itertools.count()
+        self._worker_connected = asyncio.Event()
+        self._tasks = set()
+
+    async def start(self) -> None:
+        """
+        Starts the worker processes
+        """
+
+        self._link_server = await asyncio.start_server(
+            self._handle_worker, '127.0.0.1', 0
+        )
+        link_port = self._link_server.sockets[0].getsockname()[1]
+
+        context = multiprocessing.get_context('spawn')
+        for ID in range(self._worker_count):
+            process = context.Process(
+                target=run_worker,
+                args=(ID, link_port, self._settings),
+                daemon=True
+            )
+            process.start()
+            self._workers[ID] = Worker_Handle(ID=ID, process=process)
+        self._start_task(self._log_load())
+
+    def _start_task(self, coroutine) -> asyncio.Task:
+        """
+        Runs a coroutine in the background, the event loop keeps only weak
+        references to tasks, so they are kept here until they are done
+        ...
+        :param coroutine: the coroutine to run
+        :return: the task running it
+        """
+
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _handle_worker(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Relays everything a worker sends until it goes away
+        ...
+        :param reader: the link's reader
+        :param writer: the link's writer
+        """
+
+        try:
+            ID, kind, payload = await read_link_message(reader)
+            worker = self._workers[ID]
+        except (asyncio.IncompleteReadError, OSError, KeyError):
+            writer.close()
+            return
+        worker.link = writer
+        self._worker_connected.set()
+        self._logger.debug(f'Worker {worker.ID} connected')
+
+        try:
+            while True:
+                ID, kind, payload = await read_link_message(reader)
+                match kind:
+                    case Link_Message.DATA:
+                        client = worker.clients.get(ID)
+                        if client:
+                            dropped = client.frames_dropped
+                            client.send_frame(payload)
+                            if client.overflowed:
+                                client.overflowed = False
+                                writer.write(link_message(
+                                    ID, Link_Message.RESYNC,
+                                    RESYNC_PAYLOAD.pack(
+                                        client.frames_dropped - dropped
+                                    )
+                                ))
+                    case Link_Message.CLOSE:
+                        self._free_spot(ID)
+                        if ID in worker.clients:
+                            self._start_task(
+                                self._close_client(worker.clients[ID])
+                            )
+                    case Link_Message.ROOM_DONE:
+                        worker.rooms.discard(ID)
+                        self._rooms.pop(ID, None)
+                    case Link_Message.LOAD:
+                        worker.load = json.loads(payload)
+        except (asyncio.IncompleteReadError, OSError):
+            self._logger.error(f'Worker {worker.ID} went down')
+        finally:
+            worker.link = None
+            for ID in worker.rooms:
+                self._rooms.pop(ID, None)
+            worker.rooms.clear()
+            for client in worker.clients.values():
+                client.abort()
+            if self._waiting_room and self._waiting_room.worker is worker:
+                self._waiting_room = None
+
+    async def _close_client(self, connection: Connection) -> None:
+        """
+        Closes a player's connection once the room is done with them,
+        after everything queued for them was sent
+        ...
+        :param connection: the connection to close
+        """
+
+        connection.close()
+        await connection.wait_closed()
+
+    async def handle_player(
+        self,
+        username: str,
+        connection: Connection,
+        udp: bool = False
+    ) -> None:
+        """
+        Puts a player in a room on one of the workers and relays their
+        data until they leave
+        A player on UDP sends their datagrams straight to the worker
+        ...
+        :param username: the player's username
+        :param connection: the connection with the player
+        :param udp: whether the player asked for the game over UDP
+        """
+
+        await self._worker_connected.wait()
+        if not any(worker.link for worker in self._workers.values()):
+            self._logger.error(f'No workers left for {username}')
+            connection.abort()
+            return
+
+        room = self._get_waiting_room()
+        room.players += 1
+        connection_ID = next(self._connection_IDs)
+        self._spots[connection_ID] = room
+        try:
+            await self._relay(
+                connection_ID, room, username, connection, udp=udp
+            )
+        finally:
+            self._free_spot(connection_ID)
+
+    def _free_spot(self, connection_ID: int) -> None:
+        """
+        Gives back the spot of a player that left a room before it filled
+        up, as soon as either the player or the worker closed the
+        connection
+        ...
+        :param connection_ID: the ID of the player's connection
+        """
+
+        room = self._spots.pop(connection_ID, None)
+        if room and not room.is_full:
+            room.players -= 1
+
+    async def handle_spectator(
+        self,
+        username: str,
+        connection: Connection,
+        room_ID: int = None
+    ) -> None:
+        """
+        Lets a spectator watch a room on one of the workers and relays
+        their data until they leave
+        ...
+        :param username: the spectator's username
+        :param connection: the connection with the spectator
+        :param room_ID: the room to watch, None for the newest game
+        """
+
+        await self._worker_connected.wait()
+        room = watched_room(self._rooms, room_ID)
+        if room is None and room_ID is None and \
+           any(worker.link for worker in self._workers.values()):
+            room = self._get_waiting_room()
+        if room is None or not room.worker.link:
+            self._logger.debug(f'No room for {username} to watch')
+            connection.abort()
+            return
+        await self._relay(
+            next(self._connection_IDs), room, username, connection,
+            spectate=True
+        )
+
+    async def _relay(
+        self,
+        connection_ID: int,
+        room: Remote_Room,
+        username: str,
+        connection: Connection,
+        spectate: bool = False,
+        udp: bool = False
+    ) -> None:
+        """
+        Relays a client's data to the worker of their room until they
+        leave
+        ...
+        :param connection_ID: the ID the worker knows the connection by
+        :param room: the room of the client
+        :param username: the client's username
+        :param connection: the connection with the client
+        :param spectate: whether the client only watches the game
+        :param udp: whether the client asked for the game over UDP
+        """
+
+        worker = room.worker
+        worker.clients[connection_ID] = connection
+        info = json.dumps({
+            'room': room.ID,
+            'username': username,
+            'address': str(connection.address),
+            'spectate': spectate,
+            'udp': udp
+        }).encode()
+        worker.link.write(
+            link_message(connection_ID, Link_Message.OPEN, info)
+        )
+
+        try:
+            while worker.link:
+                data = await connection.recieve_data()
+                if worker.link:
+                    worker.link.write(
+                        link_message(connection_ID, Link_Message.DATA, data)
+                    )
+        except OSError:
+            pass
+        finally:
+            worker.clients.pop(connection_ID, None)
+            if worker.link:
+                worker.link.write(
+                    link_message(connection_ID, Link_Message.CLOSE)
+                )
+            connection.abort()
+
+    def _get_waiting_room(self) -> Remote_Room:
+        """
+        :return: the room new players join, a new room is opened on the\
+         least busy worker when the last one filled up
+        """
+
+        if self._waiting_room is None or self._waiting_room.is_full:
+            workers = [
+                worker for worker in self._workers.values() if worker.link
+            ]
+            worker = min(
+                workers,
+                key=lambda worker: (len(worker.rooms), len(worker.clients))
+            )
+            room = Remote_Room(
+                self._next_room_ID, worker, self._settings['player_count']
+            )
+            self._next_room_ID += 1
+            worker.rooms.add(room.ID)
+            self._rooms[room.ID] = room
+            self._waiting_room = room
+            self._logger.debug(f'Opened room {room.ID} on worker {worker.ID}')
+        return self._waiting_room
+
+    async def _log_load(self) -> None:
+        """
+        Logs the last load report of every worker
+        """
+
+        while True:
+            await asyncio.sleep(Config.LOAD_REPORT_INTERVAL)
+            for worker in self._workers.values():
+                if worker.link:
+                    self._logger.info(
+                        f'Worker {worker.ID} load: {worker.load}'
+                    )
+                else:
+                    self._logger.info(f'Worker {worker.ID} is down')
@@ -0,0 +1,314 @@
+import numpy as np
+
+from enums import Direction
+from snake_config import Snake_Config as Config
+
+
+# directions are numbered in the order of the Direction enum, actions are
+# a direction's number + 1 and 0 keeps going straight
+DIRECTIONS = list(Direction)
+_DX = np.array([0, 0, -1, 1], dtype=np.int32)
+_DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+_OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+
+# random cells tried for an apple before looking for a free one
+_SPAWN_TRIES = 4
+
+# the channels of an observation
+OWN_BODY, OWN_HEAD, OTHER_BODIES, OTHER_HEADS, APPLES = range(5)
+
+
+class Batch_Snake_Env:
+    """
+    Many games played in lockstep with arrays, by the same rules as
+    Snake_Engine, for training and testing bots without a server
+    A snake's cells aren't kept in order, every cell on a snake's plane
+    holds the value of the snake's clock at which the tail leaves it,
+    the clock advances every step the snake doesn't grow, so moving a
+    snake only writes its new head
+    Apples are placed with numpy's random generator, so a game doesn't
+    play out like a Snake_Engine game with the same seed
+    """
+
+    def __init__(
+        self,
+        games: int,
+        width: int = Config.GAME_WIDTH,
+        height: int = Config.GAME_HEIGHT,
+        player_count: int = 2,
+        seed: int = None,
+        auto_reset: bool = True
+    ) -> None:
+        self.games = games
+        self.width = width
+        self.height = height
+        self.player_count = player_count
+        self.auto_reset = auto_reset
+        self._rng = np.random.default_rng(seed)
+        self._players_needed = 1 if player_count > 1 else 0
+
+        shape = (games, player_count)
+        self.leave_at = np.zeros(shape + (height, width), dtype=np.int32)
+        self.clock = np.zeros(shape, dtype=np.int32)
+        self.length = np.zeros(shape, dtype=np.int32)
+        self.growth = np.zeros(shape, dtype=np.int32)
+        self.heads = np.zeros(shape + (2,), dtype=np.int32)  # (x, y)
+        self.direction = np.zeros(shape, dtype=np.int8)
+        self.alive = np.zeros(shape, dtype=bool)
+        self.apples = np.zeros((games, height, width), dtype=bool)
+        self.tick = np.zeros(games, dtype=np.int32)
+        self.done = np.zeros(games, dtype=bool)
+        self.winner = np.full(games, -1, dtype=np.int32)
+
+        # the arrays are also indexed flat, which numpy does much faster
+        self._player_index = np.arange(player_count)
+        self._leave_at_flat = self.leave_at.reshape(-1)
+        self._apples_flat = self.apples.reshape(-1)
+        self._board_offsets = np.arange(games)[:, None] * height * width
+        self._plane_offsets = (
+            np.arange(games)[:, None] * player_count + self._player_index
+        ) * height * width
+        self._make_layout()
+        self.reset()
+
+    def _make_layout(self) -> None:
+        """
+        Places the snakes the way Snake_Engine._init_snakes does, once,
+        every reset copies it
+        """
+
+        self._layout = np.zeros(
+            (self.player_count, self.height, self.width), dtype=np.int32
+        )
+        self._layout_heads = np.zeros((self.player_count, 2), dtype=np.int32)
+        self._layout_direction = np.zeros(self.player_count, dtype=np.int8)
+        for ID in range(self.player_count):
+            count = ID + 1
+            y = self.height * count // (self.player_count + 1)
+            x = self.width // 2
+            if count % 2 == 0:
+                facing = DIRECTIONS.index(Direction.LEFT)
+            else:
+                facing = DIRECTIONS.index(Direction.RIGHT)
+            step = -_DX[facing]
+            for i in range(3):  # head, body and tail
+                self._layout[ID, y, x + step * i] = 3 - i
+            self._layout_heads[ID] = (x, y)
+            self._layout_direction[ID] = facing
+
+    def reset(self, games: np.ndarray = None) -> None:
+        """
+        Starts new games
+        ...
+        :param games: the indexes or a mask of the games to restart,\
+         None for all of them
+        """
+
+        if games is None:
+            games = np.arange(self.games)
+        games = np.asarray(games)
+        if games.dtype == bool:
+            games = np.flatnonzero(games)
+        if not len(games):
+            return
+
+        self.leave_at[games] = self._layout
+        self.clock[games] = 0
+        self.length[games] = 3
+        self.growth[games] = 0
+        self.heads[games] = self._layout_heads
+        self.direction[games] = self._layout_direction
+        self.alive[games] = True
+        self.apples[games] = False
+        self.tick[games] = 0
+        self.done[games] = False
+        self.winner[games] = -1
+        self._spawn_apples(
+            games, np.full(len(games), self.player_count)
+        )
+
+    def step(
+        self, actions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Steps every game that isn't done
+        ...
+        :param actions: an array of (games, players), 0 to keep going and\
+         a direction's number + 1 to turn, turning back is ignored
+        :return: the rewards of every player (1 for an apple, -1 for\
+         dying), which games ended and their winners (-1 for none), games\
+         that ended are restarted right away when auto_reset is on
+        """
+
+        actions = np.asarray(actions, dtype=np.int8)
+        moving = self.alive & ~self.done[:, None]
+        self.tick[~self.done] += 1
+
+        turn = actions - 1
+        valid = moving & (actions > 0) & \
+            (turn != _OPPOSITE[self.direction])
+        self.direction = np.where(valid, turn, self.direction)
+
+        new_x = self.heads[..., 0] + _DX[self.direction]
+        new_y = self.heads[..., 1] + _DY[self.direction]
+
+        # tails move out of the way before heads move in
+        growing = moving & (self.growth > 0)
+        self.growth -= growing
+        self.length += growing
+        self.clock += moving & ~growing
+
+        inside = (new_x >= 0) & (new_x < self.width) & \
+            (new_y >= 0) & (new_y < self.height)
+        x = np.clip(new_x, 0, self.width - 1)
+        y = np.clip(new_y, 0, self.height - 1)
+        cells = y * self.width + x
+
+        # what every new head lands on, on the plane of every snake
+        landing = self._leave_at_flat.take(
+            self._plane_offsets[:, None, :] + cells[:, :, None]
+        )
+        hit = (
+            (landing > self.clock[:, None, :]) & self.alive[:, None, :]
+        ).any(axis=2)
+
+        same_cell = (new_x[:, :, None] == new_x[:, None, :]) & \
+            (new_y[:, :, None] == new_y[:, None, :]) & \
+            moving[:, :, None] & moving[:, None, :]
+        same_cell[:, self._player_index, self._player_index] = False
+        head_on = same_cell.any(axis=2)
+
+        dead = moving & (~inside | hit | head_on)
+        moved = moving & ~dead
+
+        self._leave_at_flat[(self._plane_offsets + cells)[moved]] = \
+            self.clock[moved] + self.length[moved]
+        self.heads[..., 0] = np.where(moved, x, self.heads[..., 0])
+        self.heads[..., 1] = np.where(moved, y, self.heads[..., 1])
+
+        apple_cells = self._board_offsets + cells
+        ate = moved & self._apples_flat.take(apple_cells)
+        self._apples_flat[apple_cells[ate]] = False
+        self.growth += ate
+        self.alive &= ~dead
+
+        eaten = ate.sum(axis=1)
+        hungry = np.flatnonzero(eaten)
+        if len(hungry):
+            self._spawn_apples(hungry, eaten[hungry])
+
+        alive_count = self.alive.sum(axis=1)
+        ended = ~self.done & (alive_count <= self._players_needed)
+        self.done |= ended
+        self.winner = np.where(
+            ended & (alive_count > 0), self.alive.argmax(axis=1), self.winner
+        )
+        winners = np.where(ended, self.winner, -1)
+
+        rewards = ate.astype(np.float32) - dead
+        if self.auto_reset and ended.any():
+            self.reset(ended)
+        return rewards, ended, winners
+
+    def _occupied(self, games: np.ndarray) -> np.ndarray:
+        """
+        :param games: the indexes of the games
+        :return: a mask of (games, height, width) of the cells taken by\
+         a snake or an apple
+        """
+
+        bodies = (
+            self.leave_at[games] > self.clock[games][:, :, None, None]
+        ) & self.alive[games][:, :, None, None]
+        return bodies.any(axis=1) | self.apples[games]
+
+    def _cell_taken(
+        self, games: np.ndarray, x: np.ndarray, y: np.ndarray
+    ) -> np.ndarray:
+        """
+        :param games: the indexes of the games
+        :param x: a column in every game
+        :param y: a row in every game
+        :return: whether that cell is taken by a snake or an apple
+        """
+
+        bodies = (
+            self.leave_at[
+                games[:, None], self._player_index[None, :],
+                y[:, None], x[:, None]
+            ] > self.clock[games]
+        ) & self.alive[games]
+        return bodies.any(axis=1) | self.apples[games, y, x]
+
+    def _spawn_apples(self, games: np.ndarray, counts: np.ndarray) -> None:
+        """
+        Places apples on random free cells, like
+        Snake_Engine._generate_apples a full board gets no apple
+        ...
+        :param games: the indexes of the games
+        :param counts: how many apples every game gets
+        """
+
+        for placed_count in range(counts.max(initial=0)):
+            games = games[counts > placed_count]
+            counts = counts[counts > placed_count]
+
+            # a few random cells are tried first, one of them is almost
+            # always free, so the whole board is rarely looked at
+            waiting = games
+            for _ in range(_SPAWN_TRIES):
+                x = self._rng.integers(0, self.width, len(waiting))
+                y = self._rng.integers(0, self.height, len(waiting))
+                free = ~self._cell_taken(waiting, x, y)
+                self.apples[waiting[free], y[free], x[free]] = True
+                waiting = waiting[~free]
+                if not len(waiting):
+                    break
+            else:
+                self._spawn_apples_anywhere(waiting)
+
+    def _spawn_apples_anywhere(self, games: np.ndarray) -> None:
+        """
+        Places an apple on a random free cell by looking at every cell
+        ...
+        :param games: the indexes of the games
+        """
+
+        free = ~self._occupied(games).reshape(len(games), -1)
+        # a random key for every free cell, the highest one wins
+        keys = np.where(free, self._rng.random(free.shape), -1)
+        cells = keys.argmax(axis=1)
+        placed = keys[np.arange(len(games)), cells] >= 0
+        self.apples.reshape(self.games, -1)[
+            games[placed], cells[placed]
+        ] = True
+
+    def observe(self) -> np.ndarray:
+        """
+        :return: an array of (games, players, channels, height, width) of\
+         what every player sees, the channels are their own body and head,\
+         the other snakes' bodies and heads and the apples
+        """
+
+        bodies = (
+            self.leave_at > self.clock[:, :, None, None]
+        ) & self.alive[:, :, None, None]
+        heads = np.zeros_like(bodies)
+        games, players = np.nonzero(self.alive)
+        heads[
+            games, players,
+            self.heads[games, players, 1], self.heads[games, players, 0]
+        ] = True
+
+        observations = np.zeros(
+            (self.games, self.player_count, 5, self.height, self.width),
+            dtype=np.uint8
+        )
+        observations[:, :, OWN_BODY] = bodies
+        observations[:, :, OWN_HEAD] = heads
+        observations[:, :, OTHER_BODIES] = \
+            bodies.sum(axis=1, keepdims=True) - bodies
+        observations[:, :, OTHER_HEADS] = \
+            heads.sum(axis=1, keepdims=True) - heads
+        observations[:, :, APPLES] = self.apples[:, None]
+        return observations
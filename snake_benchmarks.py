@@ -0,0 +1,402 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+
+from enums import Game_Object, Player_Command, Direction
+from game_inputs import Input_Queue
+from game_logging import setup_logging
+from game_packet_API import Game_Packet, Game_Packet_Type
+from game_packet_protocol import encode_packet
+from game_snapshots import Client_Board, Snapshot_History
+from snake_engine import Snake_Engine, direction_between
+from snake_grid import Free_Cells
+
+try:
+    import pygame
+except ImportError:  # the client benchmarks are skipped
+    pygame = None
+
+
+def band_cycle(
+    width: int, top: int, height: int
+) -> list[tuple[int, int]]:
+    """
+    A closed path through every cell of a band of rows, a snake shorter
+    than it can follow it forever without hitting anything
+    ...
+    :param width: the width of the band
+    :param top: the first row of the band
+    :param height: the number of rows, must be even
+    :return: the cells of the path in order
+    """
+
+    cycle = [(x, top) for x in range(width)]
+    for count, y in enumerate(range(top + 1, top + height)):
+        xs = range(width - 1, 0, -1) if count % 2 == 0 else range(1, width)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(top + height - 1, top, -1))
+    return cycle
+
+
+class Looping_Game:
+    """
+    A game where every snake follows a closed path in its own band of
+    rows, so it can be stepped for as long as a benchmark needs
+    Snakes don't grow from apples, so they keep the length asked for
+    """
+
+    def __init__(
+        self, board_size: int, player_count: int, snake_length: int
+    ) -> None:
+        self.engine = Snake_Engine(
+            board_size, board_size, list(range(player_count)), seed=0
+        )
+        band_height = board_size // player_count // 2 * 2
+        if band_height < 2:
+            raise ValueError('The board is too small for that many players')
+
+        # the snakes are moved off their starting cells onto their paths
+        for apple in self.engine.apples:
+            self.engine._free_cells.add(apple)
+        self.engine.apples.clear()
+        self._next_directions = {}
+        self.snake_length = min(
+            snake_length, board_size * band_height // 2
+        )
+        for ID, snake in self.engine.snakes.items():
+            for cell in snake.cells:
+                self.engine._free(cell)
+            cycle = band_cycle(board_size, ID * band_height, band_height)
+            snake.cells.clear()
+            for cell in reversed(cycle[:self.snake_length]):
+                snake.cells.append(cell)
+                self.engine._occupy(cell, ID)
+            snake.direction = direction_between(
+                cycle[self.snake_length - 1], cycle[self.snake_length]
+            )
+            for index, cell in enumerate(cycle):
+                self._next_directions[cell] = direction_between(
+                    cell, cycle[(index + 1) % len(cycle)]
+                )
+        self.engine._generate_apples(player_count)
+        self.engine.pop_events()
+
+    def step(self) -> list:
+        """
+        Turns every snake along its path and steps the game
+        ...
+        :return: the changes the step made, as a room would pop them
+        """
+
+        for ID, snake in self.engine.snakes.items():
+            snake.growth = 0
+            self.engine.set_direction(
+                ID, self._next_directions[snake.cells[0]]
+            )
+        self.engine.step()
+        return self.engine.pop_events()
+
+
+class Snake_Benchmarks:
+    """
+    Times the hot paths of the server and client over boards of different
+    sizes, player counts and snake lengths
+    Results can be saved as json and compared with an earlier run
+    """
+
+    def __init__(self) -> None:
+        self._parser = argparse.ArgumentParser(
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter
+        )
+        self._parser.add_argument(
+            '--log_level', action='store', type=int, default=20,
+            help='Log level (50=Critical, 40=Error, 30=Warning ,20=Info ,10=Debug, 0=None)'  # noqa
+        )
+        self._parser.add_argument(
+            '--board_sizes', action='store', type=int, nargs='+',
+            default=[15, 30, 60],
+            help='widths (and heights) of the boards to run on'
+        )
+        self._parser.add_argument(
+            '--player_counts', action='store', type=int, nargs='+',
+            default=[2, 4],
+            help='numbers of players to run with'
+        )
+        self._parser.add_argument(
+            '--snake_lengths', action='store', type=int, nargs='+',
+            default=[3, 20, 100],
+            help='lengths of the snakes, cut to what fits on the board'
+        )
+        self._parser.add_argument(
+            '--repeat', action='store', type=int, default=5,
+            help='times to run every benchmark, the fastest run counts'
+        )
+        self._parser.add_argument(
+            '--only', action='store', type=str, default=None,
+            help='run only the benchmarks with this in their name'
+        )
+        self._parser.add_argument(
+            '--output', action='store', type=str, default=None,
+            help='json file to save the results to'
+        )
+        self._parser.add_argument(
+            '--compare', action='store', type=str, default=None,
+            help='json file of an earlier run to compare the results with'
+        )
+        self._parser.add_argument(
+            '--threshold', action='store', type=float, default=0.1,
+            help='how much slower than the compared run counts as a regression'  # noqa
+        )
+        self._args = self._parser.parse_args()
+
+        setup_logging(self._args.log_level)
+
+        self._logger = logging.getLogger()
+
+        self.results = {}  # benchmark name: result
+
+    def run(self) -> int:
+        """
+        Runs the benchmarks, saves and compares the results
+        ...
+        :return: the exit code, 1 if anything regressed
+        """
+
+        boards = list(itertools.product(
+            self._args.board_sizes,
+            self._args.player_counts,
+            self._args.snake_lengths
+        ))
+        for board_size, player_count, snake_length in boards:
+            try:
+                game = Looping_Game(board_size, player_count, snake_length)
+            except ValueError:
+                continue
+            params = {
+                'board size': board_size,
+                'players': player_count,
+                'snake length': game.snake_length
+            }
+            self._bench('engine step', params, game.step)
+            self._bench('snapshot', params, game.engine.snapshot)
+            self._bench_encoding(game, params)
+            if pygame:
+                self._bench_render(game, params)
+
+        for board_size in self._args.board_sizes:
+            self._bench_apples(board_size)
+        self._bench_inputs()
+        if pygame:
+            self._bench_images()
+
+        if self._args.output:
+            with open(self._args.output, 'w') as file:
+                json.dump(
+                    {'machine': machine_info(), 'results': self.results},
+                    file, indent=4
+                )
+            self._logger.info(f'Saved the results to {self._args.output}')
+        if self._args.compare:
+            return self._compare()
+        return 0
+
+    def _bench(self, name: str, params: dict, function) -> None:
+        """
+        Times a function and keeps the result
+        ...
+        :param name: the name of the benchmark
+        :param params: what the benchmark ran with
+        :param function: the function to time, called with no arguments
+        """
+
+        key = name + ''.join(
+            f' [{param}={value}]' for param, value in params.items()
+        )
+        if self._args.only and self._args.only not in name:
+            return
+
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(self._args.repeat, number)) / number
+        self.results[key] = {
+            'name': name,
+            'params': params,
+            'microseconds': round(best * 1e6, 3)
+        }
+        self._logger.info(f'{key}: {best * 1e6:.2f} us')
+
+    def _bench_encoding(self, game: Looping_Game, params: dict) -> None:
+        """
+        Times turning the board into packets, a whole board and the
+        changes of a few ticks
+        ...
+        :param game: the game to encode
+        :param params: what the game was made with
+        """
+
+        keyframe = Game_Packet(
+            Game_Packet_Type.GAME_STATUS, game.engine.snapshot()
+        )
+        self._bench('keyframe encoding', params, lambda: encode_packet(
+            keyframe
+        ))
+
+        history = Snapshot_History(8)
+        base_tick = game.engine.tick
+        for _ in range(8):
+            history.record(game.engine.tick, game.step())
+        delta = Game_Packet(Game_Packet_Type.GAME_DELTA, {
+            'base tick': base_tick,
+            'tick': game.engine.tick,
+            'game state': game.engine.state,
+            'ticks': history.delta(base_tick, game.engine.tick)
+        })
+        self._bench('delta encoding (8 ticks)', params, lambda: encode_packet(
+            delta
+        ))
+
+    def _bench_apples(self, board_size: int) -> None:
+        """
+        Times placing an apple on a board with 1% of its cells free
+        ...
+        :param board_size: the width and height of the board
+        """
+
+        free_cells = Free_Cells(board_size, board_size)
+        cells = [
+            (x, y) for x in range(board_size) for y in range(board_size)
+        ]
+        rng = random.Random(0)
+        rng.shuffle(cells)
+        for cell in cells[:len(cells) * 99 // 100]:
+            free_cells.remove(cell)
+
+        def place_apple() -> None:
+            apple = free_cells.random(rng)
+            free_cells.remove(apple)
+            free_cells.add(apple)
+
+        self._bench(
+            'apple on nearly full board', {'board size': board_size},
+            place_apple
+        )
+
+    def _bench_inputs(self) -> None:
+        """
+        Times queueing an input and turning a snake by it
+        """
+
+        queue = Input_Queue()
+        seqs = itertools.count(1)
+        commands = itertools.cycle(
+            [Player_Command.MOVE_UP, Player_Command.MOVE_RIGHT]
+        )
+        directions = itertools.cycle([Direction.RIGHT, Direction.UP])
+
+        def take_input() -> None:
+            queue.push(next(seqs), next(commands))
+            queue.next_direction(next(directions))
+
+        self._bench('input queue', {}, take_input)
+
+    def _bench_images(self) -> None:
+        """
+        Times getting a sprite from Loaded_Images, once cached
+        """
+
+        from loaded_images import Loaded_Images
+
+        try:
+            images = Loaded_Images()
+        except (FileNotFoundError, pygame.error):
+            self._logger.info('Skipping the image benchmarks, no assets')
+            return
+        self._bench('get image', {}, lambda: images.get_image(
+            Game_Object.SNAKE_BODY, (0, 255, 0), Direction.LEFT
+        ))
+
+    def _bench_render(self, game: Looping_Game, params: dict) -> None:
+        """
+        Times drawing the board after a tick on a hidden screen
+        ...
+        :param game: the game to draw
+        :param params: what the game was made with
+        """
+
+        from loaded_images import Loaded_Images
+        from snake_renderer import Snake_Renderer
+
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.display.init()
+        screen = pygame.display.set_mode((600, 600))
+        try:
+            tile_size = max(1, 600 // params['board size'])
+            images = Loaded_Images(tile_size, tile_size)
+        except (FileNotFoundError, pygame.error):
+            return
+        renderer = Snake_Renderer(screen, images, tile_size, tile_size)
+        board = Client_Board()
+
+        def render_tick() -> None:
+            game.step()
+            board.load_keyframe(game.engine.snapshot())
+            renderer.render(board)
+
+        self._bench('step and render', params, render_tick)
+
+    def _compare(self) -> int:
+        """
+        Logs how the results changed since the compared run
+        ...
+        :return: 1 if anything got slower than the threshold, 0 otherwise
+        """
+
+        with open(self._args.compare) as file:
+            old_results = json.load(file)['results']
+
+        regressions = 0
+        for key, result in self.results.items():
+            if key not in old_results:
+                continue
+            ratio = result['microseconds'] / \
+                old_results[key]['microseconds']
+            line = f'{key}: {ratio:.2f}x the time of {self._args.compare}'
+            if ratio > 1 + self._args.threshold:
+                regressions += 1
+                self._logger.warning(f'{line}, regression')
+            else:
+                self._logger.info(line)
+
+        self._logger.info(f'{regressions} benchmarks regressed')
+        return 1 if regressions else 0
+
+
+def machine_info() -> dict:
+    """
+    :return: where the benchmarks ran, results from different machines\
+     shouldn't be compared
+    """
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def main():
+    benchmarks = Snake_Benchmarks()
+    sys.exit(benchmarks.run())
+
+
+if __name__ == "__main__":
+    main()
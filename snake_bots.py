@@ -0,0 +1,364 @@
+import asyncio
+import argparse
+import logging
+import random
+import socket
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from enums import Direction, Game_State, Player_Command
+from game_connection import Connection
+from game_logging import setup_logging
+from game_packet_API import Game_Packet, Game_Packet_Type
+from game_snapshots import Client_Board
+from snake_engine import direction_between, DIRECTION_OFFSETS, \
+    OPPOSITE_DIRECTIONS
+
+DIRECTION_COMMANDS = {
+    Direction.UP: Player_Command.MOVE_UP,
+    Direction.DOWN: Player_Command.MOVE_DOWN,
+    Direction.LEFT: Player_Command.MOVE_LEFT,
+    Direction.RIGHT: Player_Command.MOVE_RIGHT
+}
+
+
+def random_policy(
+    board: Client_Board, player_ID: int, rng: random.Random
+) -> Player_Command:
+    """
+    Turns to a random direction every few ticks
+    ...
+    :param board: the board the bot knows
+    :param player_ID: the ID of the bot's snake
+    :param rng: the bot's random generator
+    :return: the input to send, None to send nothing
+    """
+
+    if rng.random() < 0.2:
+        return DIRECTION_COMMANDS[rng.choice(list(Direction))]
+    return None
+
+
+def apple_policy(
+    board: Client_Board, player_ID: int, rng: random.Random
+) -> Player_Command:
+    """
+    Heads for the closest apple, without looking out for anything
+    ...
+    :param board: the board the bot knows
+    :param player_ID: the ID of the bot's snake
+    :param rng: the bot's random generator
+    :return: the input to send, None to send nothing
+    """
+
+    cells = board.snakes.get(player_ID)
+    if not cells or len(cells) < 2 or not board.apples:
+        return None
+    head = cells[0]
+    direction = direction_between(cells[1], head)
+    apple = min(
+        board.apples,
+        key=lambda apple: abs(apple[0] - head[0]) + abs(apple[1] - head[1])
+    )
+
+    def distance(new_direction: Direction) -> int:
+        dx, dy = DIRECTION_OFFSETS[new_direction]
+        return abs(apple[0] - head[0] - dx) + abs(apple[1] - head[1] - dy)
+
+    best = min(
+        (
+            new_direction for new_direction in Direction
+            if new_direction != OPPOSITE_DIRECTIONS[direction]
+        ),
+        key=distance
+    )
+    if best == direction:
+        return None
+    return DIRECTION_COMMANDS[best]
+
+
+POLICIES = {
+    'random': random_policy,
+    'apples': apple_policy
+}
+
+
+@dataclass
+class Bot_Stats:
+    """
+    What all the bots measured, in milliseconds and bytes
+    """
+
+    games: int = 0
+    failed: int = 0
+    input_latencies: list = field(default_factory=list)
+    update_intervals: list = field(default_factory=list)
+    bytes_sent: int = 0
+    bytes_recieved: int = 0
+
+
+class Bot_Client:
+    """
+    A player without a window, plays games on the server with a policy
+    and measures how the server responds
+    """
+
+    def __init__(
+        self,
+        server_ip: str, port: int,
+        username: str,
+        policy,
+        rng: random.Random,
+        stats: Bot_Stats,
+        timeout: float
+    ) -> None:
+        self._logger = logging.getLogger()
+
+        self._server_ip = server_ip
+        self._port = port
+        self._username = username
+        self._policy = policy
+        self._rng = rng
+        self._stats = stats
+        self._timeout = timeout
+
+    async def play(self) -> None:
+        """
+        Joins a room and plays a single game
+        A game that takes longer than the timeout, like one in a room that
+        never fills or on a server that stopped answering, is given up on
+        and counted as failed
+        """
+
+        try:
+            reader, writer = await asyncio.open_connection(
+                self._server_ip, self._port
+            )
+        except OSError:
+            self._logger.debug(f'{self._username} could not connect')
+            self._stats.failed += 1
+            return
+
+        connection = Connection(reader, writer)
+        try:
+            await asyncio.wait_for(self._play_game(connection), self._timeout)
+        except asyncio.TimeoutError:
+            self._logger.debug(f'{self._username} timed out')
+            self._stats.failed += 1
+        except (OSError, ValueError, TypeError, KeyError):
+            self._logger.debug(f'{self._username} was disconnected')
+        finally:
+            connection.abort()
+            self._stats.bytes_sent += connection.bytes_sent
+            self._stats.bytes_recieved += connection.bytes_recieved
+
+    async def _play_game(self, connection: Connection) -> None:
+        """
+        Does what a client does, from sending the username until the game
+        is done
+        ...
+        :param connection: the connection with the server
+        """
+
+        connection.send(
+            Game_Packet(
+                type=Game_Packet_Type.STANDARD_DATA,
+                data={'username': self._username}
+            )
+        )
+        player_ID = (await connection.recieve_packet()).data['player ID']
+        connection.send(Game_Packet(type=Game_Packet_Type.PLAYER_READY))
+
+        board = Client_Board()
+        input_seq = 0
+        sent_inputs = {}  # input seq: when it was sent
+        last_update = None
+        while board.game_state != Game_State.DONE:
+            packet = await connection.recieve_packet()
+            if packet.type == Game_Packet_Type.PLAYER_STATUS:
+                board.set_player_status(packet.data)
+                continue
+            elif packet.type == Game_Packet_Type.GAME_STATUS:
+                board.load_keyframe(packet.data)
+            elif packet.type == Game_Packet_Type.GAME_DELTA:
+                if not board.apply_delta(packet.data):
+                    continue
+            else:
+                continue
+
+            now = time.perf_counter()
+            if last_update is not None:
+                self._stats.update_intervals.append(
+                    (now - last_update) * 1000
+                )
+            last_update = now
+            for seq in [seq for seq in sent_inputs if seq <= board.input_seq]:
+                self._stats.input_latencies.append(
+                    (now - sent_inputs.pop(seq)) * 1000
+                )
+
+            connection.send(
+                Game_Packet(
+                    type=Game_Packet_Type.SNAPSHOT_ACK,
+                    data={'tick': board.tick}
+                )
+            )
+            command = self._policy(board, player_ID, self._rng)
+            if command is not None and player_ID in board.snakes:
+                input_seq += 1
+                sent_inputs[input_seq] = now
+                connection.send(
+                    Game_Packet(
+                        type=Game_Packet_Type.PLAYER_INPUTS,
+                        data={
+                            'seq': input_seq,
+                            'change dir': command,
+                            'status': None
+                        }
+                    )
+                )
+
+        self._stats.games += 1
+        connection.close()
+        await connection.wait_closed()
+
+
+class Snake_Bots:
+    """
+    Runs many bots at once against a server and reports what they
+    measured, used to check how much load a server can take
+    """
+
+    def __init__(self) -> None:
+        self._parser = argparse.ArgumentParser(
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter
+        )
+        self._parser.add_argument(
+            '--log_level', action='store', type=int, default=20,
+            help='Log level (50=Critical, 40=Error, 30=Warning ,20=Info ,10=Debug, 0=None)'  # noqa
+        )
+        self._parser.add_argument(
+            '--server_ip', action='store', type=str,
+            default=socket.gethostbyname(socket.gethostname()),
+            help='server IP, enter the desired server\'s IP address'
+        )
+        self._parser.add_argument(
+            '--port', action='store', type=int, default=3333,
+            help='port of the server'
+        )
+        self._parser.add_argument(
+            '--bots', action='store', type=int, default=10,
+            help='number of bots playing at the same time'
+        )
+        self._parser.add_argument(
+            '--room_size', action='store', type=int, default=2,
+            help='number of players in every room, the server\'s --player_count'  # noqa
+        )
+        self._parser.add_argument(
+            '--games', action='store', type=int, default=1,
+            help='number of games every bot plays one after the other'
+        )
+        self._parser.add_argument(
+            '--policy', action='store', type=str, default='random',
+            choices=list(POLICIES),
+            help='how the bots play'
+        )
+        self._parser.add_argument(
+            '--connect_rate', action='store', type=float, default=100,
+            help='bots connecting per second, so the server isn\'t flooded at once'  # noqa
+        )
+        self._parser.add_argument(
+            '--game_timeout', action='store', type=float, default=120,
+            help='seconds a bot waits for its room to fill and its game to end'  # noqa
+        )
+        self._parser.add_argument(
+            '--seed', action='store', type=int, default=None,
+            help='seed of the bots\' random choices'
+        )
+        self._args = self._parser.parse_args()
+
+        setup_logging(self._args.log_level)
+
+        self._logger = logging.getLogger()
+
+        self.stats = Bot_Stats()
+
+    async def run(self) -> None:
+        """
+        Runs all the bots until they played all their games and logs
+        the report
+        """
+
+        if self._args.bots % self._args.room_size:
+            self._logger.warning(
+                f'{self._args.bots} bots don\'t fill rooms of '
+                f'{self._args.room_size}, the last room will time out'
+            )
+
+        rng = random.Random(self._args.seed)
+        start = time.perf_counter()
+        tasks = []
+        for count in range(self._args.bots):
+            bot = Bot_Client(
+                self._args.server_ip, self._args.port,
+                f'bot{count}',
+                POLICIES[self._args.policy],
+                random.Random(rng.getrandbits(32)),
+                self.stats,
+                self._args.game_timeout
+            )
+            tasks.append(asyncio.create_task(self._run_bot(bot)))
+            await asyncio.sleep(1 / self._args.connect_rate)
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - start
+
+        for line in report(self.stats, self._args.bots, duration):
+            self._logger.info(line)
+
+    async def _run_bot(self, bot: Bot_Client) -> None:
+        for _ in range(self._args.games):
+            await bot.play()
+
+
+def percentiles(values: list) -> str:
+    """
+    :param values: the measured values
+    :return: the values' percentiles, for the report
+    """
+
+    if len(values) < 2:
+        return 'not enough samples'
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return (
+        f'p50 {cuts[49]:.1f}, p90 {cuts[89]:.1f}, p99 {cuts[98]:.1f}, '
+        f'max {max(values):.1f} ({len(values)} samples)'
+    )
+
+
+def report(stats: Bot_Stats, bots: int, duration: float) -> list[str]:
+    """
+    :param stats: what the bots measured
+    :param bots: how many bots ran
+    :param duration: how long they ran in seconds
+    :return: the lines of the report
+    """
+
+    per_bot = 1 / (bots * duration) / 1024
+    return [
+        f'{bots} bots played {stats.games} games in {duration:.1f} '
+        f'seconds, {stats.failed} could not connect or timed out',
+        f'Input latency ms: {percentiles(stats.input_latencies)}',
+        f'Time between updates ms: {percentiles(stats.update_intervals)}',
+        f'KiB/s per bot: {stats.bytes_recieved * per_bot:.2f} down, '
+        f'{stats.bytes_sent * per_bot:.2f} up'
+    ]
+
+
+def main():
+    bots = Snake_Bots()
+    asyncio.run(bots.run())
+
+
+if __name__ == "__main__":
+    main()
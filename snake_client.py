@@ -1,16 +1,23 @@
 import socket
-import json
+import select
+from collections import deque
 from turtle import Screen
 import pygame
 import logging
 import argparse
+import time
 
-from enums import Direction, Game_Object, Player_Command, Color, \
-    Player_State, Game_State
+from enums import Player_Command, Color, Player_State, Game_State
 from game_packet_API import Game_Packet, Game_Packet_Type
+from game_packet_protocol import encode_packet, Frame_Decoder, \
+    encode_datagram, decode_datagram
+from game_logging import setup_logging, set_log_context
 from snake_config import Snake_Config as Config
 from loaded_images import Loaded_Images
+from snake_renderer import Snake_Renderer
 from on_screen_text import On_Screen_Input
+from game_snapshots import Client_Board
+from snake_prediction import Snake_Predictor
 
 
 class Snake_Client:
@@ -27,22 +34,26 @@ class Snake_Client:
             default=socket.gethostbyname(socket.gethostname()),
             help='server IP, enter the desired server\'s IP address'
         )
-        self._args = self._parser.parse_args()
-
-        logging.basicConfig(
-            level=self._args.log_level,
-            format='[%(asctime)s.%(msecs)03d] [%(levelname)s] [%(module)s] [%(funcName)s]: %(message)s',  # noqa
-            datefmt='%d-%m-%Y %H:%M:%S',
-            filename='game_logs.log'
+        self._parser.add_argument(
+            '--spectate', action='store', type=int, nargs='?',
+            const=-1, default=None,
+            help='watch a game instead of playing, the ID of the room to watch can be given, the newest game is watched when it isn\'t'  # noqa
         )
+        self._parser.add_argument(
+            '--udp', action='store_true',
+            help='get the game over UDP if the server allows it, a lost board doesn\'t hold back the ones after it'  # noqa
+        )
+        self._args = self._parser.parse_args()
 
-        logging.getLogger().addHandler(logging.StreamHandler())
+        setup_logging(self._args.log_level)
 
         self._logger = logging.getLogger()
 
         #  -------------------
         self.client_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.client_sock.connect((self._args.server_ip, server_port))
+        self._decoder = Frame_Decoder()
+        self._packets = deque()
         self._logger.debug('Connected to server')
         #  -------------------
 
@@ -57,9 +68,13 @@ class Snake_Client:
         self.game_keyboard = On_Screen_Input(self._screen)
 
         self._running = True
+        self._connected = True
+        self._board = Client_Board()  # the board as the server sent it
+        self._input_seq = 0  # the number of the last input sent
         self._game_is_done = False
         self._game_started = False
         self._player_won = False
+        self._spectating = self._args.spectate is not None
 
         self._username = self.game_keyboard.get_input(
             length=10,
@@ -71,21 +86,68 @@ class Snake_Client:
         )
         self._logger.debug(f'Username: {self._username}')
 
+        data = {'username': self._username}
+        if self._args.udp and not self._spectating:
+            data['udp'] = True
+        if self._spectating:
+            data['spectate'] = True
+            if self._args.spectate >= 0:
+                data['room'] = self._args.spectate
         self._send_data(
             Game_Packet(
                 type=Game_Packet_Type.STANDARD_DATA,
-                data={'username': self._username}
+                data=data
             )
         )
 
         player_info = self._recieve_packet()
         self._client_ID = player_info.data['player ID']
+        set_log_context(player=self._client_ID)
         self._snake_color = player_info.data['player color']
         self._logger.debug(f'My ID is {self._client_ID}')
         self._logger.debug(f'My color is {self._snake_color}')
-
-        self.image_loader = Loaded_Images()
+        board_width, board_height = player_info.data['board size']
+
+        self._udp_sock = None
+        self._udp_token = None
+        self._sent_datagram_seq = 0
+        self._recieved_datagram_seq = 0
+        # the inputs sent over UDP the server didn't confirm yet
+        self._unconfirmed_inputs = deque(maxlen=Config.REDUNDANT_INPUTS)
+        if player_info.data.get('udp token') is not None:
+            self._udp_token = bytes.fromhex(player_info.data['udp token'])
+            self._udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp_sock.connect(
+                (self._args.server_ip, player_info.data['udp port'])
+            )
+            self._udp_sock.setblocking(False)
+            # lets the server know where to send the game to
+            self._send_datagram([])
+            self._logger.debug('Getting the game over UDP')
+        # with a view radius only the square the server sends is drawn,
+        # so the tiles are sized for it and not the whole board
+        self._board_width = board_width
+        self._board_height = board_height
+        self._columns, self._rows = board_width, board_height
+        view_radius = player_info.data.get('view radius')
+        if view_radius is not None and not self._spectating:
+            self._columns = min(board_width, 2 * view_radius + 1)
+            self._rows = min(board_height, 2 * view_radius + 1)
+        self._camera_center = None
+        self._tile_width = max(1, Config.SCREEN_WIDTH // self._columns)
+        self._tile_height = max(1, Config.SCREEN_HEIGHT // self._rows)
+
+        self.image_loader = Loaded_Images(self._tile_width, self._tile_height)
+        self.image_loader.prebake(Config.SNAKE_COLORS)
+        self._renderer = Snake_Renderer(
+            self._screen, self.image_loader,
+            self._tile_width, self._tile_height
+        )
         self._all_sprites = self.image_loader._all
+        self._predictor = Snake_Predictor(
+            self._client_ID, board_width, board_height,
+            player_info.data['tick rate']
+        )
         self._logger.debug('Ready')
         self._send_data(
             Game_Packet(
@@ -93,32 +155,20 @@ class Snake_Client:
             )
         )
 
-    def _drawGrid(self) -> None:
-        """
-        Draws the background grid
-        """
-
-        blockSize = Config.TILE_HEIGHT  # Set the size of the grid block
-        for x in range(0, Config.SCREEN_WIDTH, blockSize):
-            for y in range(0, Config.SCREEN_HEIGHT, blockSize):
-                rect = pygame.Rect(x, y, blockSize, blockSize)
-                pygame.draw.rect(self._screen, Color.WHITE.value, rect, 1)
-
     def mainloop(self):
         """
         The mainloop of the program, call to start it
         """
 
-        # creating custom events names
-        RENDER_GAME = pygame.USEREVENT + 1
-        # setting event times
-        pygame.time.set_timer(RENDER_GAME, Config.TIME_BETWEEN_SNAKE_UPDATES)
         while self._running:
             inputs = {  # all command types
                 'change dir': None,
                 'status': None
             }
-            self._clock.tick(20)  # setting game FPS
+            self._clock.tick(Config.FPS)  # setting game FPS
+
+            if self._connected and not self._game_is_done:
+                self._handle_server_packets()
 
             for event in pygame.event.get():
                 # checks for the window being closed
@@ -127,61 +177,6 @@ class Snake_Client:
                     pygame.quit()
                     self._running = False
 
-                elif event.type == RENDER_GAME:
-                    if not self._game_started:
-                        # before the game starts
-                        # fill the screen with the player's color
-                        self._screen.fill(self._snake_color)
-
-                    elif self._game_is_done:
-                        # if the game is done show if the player won
-                        if self._player_won:
-                            self.game_keyboard.render_text(
-                                'you won!', Color.WHITE,
-                                Config.SCREEN_HEIGHT / 2,
-                                Config.SCREEN_WIDTH / 2
-                            )
-                        else:
-                            self.game_keyboard.render_text(
-                                'you lost!', Color.WHITE,
-                                Config.SCREEN_HEIGHT / 2,
-                                Config.SCREEN_WIDTH / 2
-                            )
-
-                    else:
-                        game_state_pack = self._get_game_state()
-                        # unpack the game state
-                        sprites_to_load = game_state_pack.data['sprites']
-                        player_state = game_state_pack.data['player state']
-                        game_state = game_state_pack.data['game state']
-
-                        self._screen.fill(Config.BGCOLOR)
-                        if game_state == Game_State.DONE:
-                            # since we render the game done text after the
-                            # connection closed, we need to get that
-                            # information in a game packet
-                            self._game_is_done = True
-                            if player_state == Player_State.WON:
-                                self._player_won = True
-                                self.game_keyboard.render_text(
-                                    'you won!', Color.WHITE,
-                                    Config.SCREEN_HEIGHT / 2,
-                                    Config.SCREEN_WIDTH / 2
-                                )
-                                self._logger.debug('Player lost')
-                            elif player_state == Player_State.LOST:
-                                self.game_keyboard.render_text(
-                                    'you lost!', Color.WHITE,
-                                    Config.SCREEN_HEIGHT / 2,
-                                    Config.SCREEN_WIDTH / 2
-                                )
-                                self._logger.debug('Player won')
-                        else:
-                            self._drawGrid()
-                            self._render_sprites(sprites_to_load)
-
-                    pygame.display.flip()
-
                 elif event.type == pygame.KEYDOWN:  # key-press events
                     match event.key:
                         case pygame.K_a | pygame.K_LEFT:
@@ -195,25 +190,139 @@ class Snake_Client:
                         case pygame.K_ESCAPE:
                             inputs['status'] = Player_Command.QUIT
 
+            if self._running:
+                self._render_frame()
+
             if self._game_started and not self._game_is_done:
                 # if player quits, stop game
                 if inputs['status'] == Player_Command.QUIT:
                     self._running = False
+                if self._spectating:
+                    # spectators can only leave
+                    inputs['change dir'] = None
                 if not all(value is None for value in inputs.values()):
-                    self._send_data(
-                        Game_Packet(
-                            type=Game_Packet_Type.PLAYER_INPUTS,
-                            data=inputs
+                    self._input_seq += 1
+                    inputs['seq'] = self._input_seq
+                    if self._udp_sock and inputs['status'] is None:
+                        self._unconfirmed_inputs.append(inputs)
+                        self._send_datagram([])
+                    else:
+                        self._send_data(
+                            Game_Packet(
+                                type=Game_Packet_Type.PLAYER_INPUTS,
+                                data=inputs
+                            )
                         )
+                    if inputs['change dir'] is not None:
+                        self._predictor.input_sent(
+                            self._input_seq, inputs['change dir'],
+                            time.perf_counter()
+                        )
+
+    def _render_frame(self) -> None:
+        """
+        Draws the screen once, the client draws a frame every loop
+        """
+
+        dirty_rects = None  # None redraws the whole screen
+        if not self._game_started:
+            # before the game starts
+            # fill the screen with the player's color
+            self._screen.fill(self._snake_color)
+
+        elif self._game_is_done:
+            # if the game is done show if the player won
+            if self._player_won:
+                self.game_keyboard.render_text(
+                    'you won!', Color.WHITE,
+                    Config.SCREEN_HEIGHT / 2,
+                    Config.SCREEN_WIDTH / 2
+                )
+            elif self._spectating:
+                self.game_keyboard.render_text(
+                    'game over', Color.WHITE,
+                    Config.SCREEN_HEIGHT / 2,
+                    Config.SCREEN_WIDTH / 2
+                )
+            else:
+                self.game_keyboard.render_text(
+                    'you lost!', Color.WHITE,
+                    Config.SCREEN_HEIGHT / 2,
+                    Config.SCREEN_WIDTH / 2
+                )
+
+        elif self._board.tick is None:
+            # the first game state didn't arrive yet
+            self._screen.fill(Config.BGCOLOR)
+
+        else:
+            # unpack the game state
+            board = self._board
+            player_state = board.player_state
+            game_state = board.game_state
+
+            if game_state == Game_State.DONE:
+                self._screen.fill(Config.BGCOLOR)
+                # since we render the game done text after the
+                # connection closed, we need to get that
+                # information in a game packet
+                self._game_is_done = True
+                if player_state == Player_State.WON:
+                    self._player_won = True
+                    self.game_keyboard.render_text(
+                        'you won!', Color.WHITE,
+                        Config.SCREEN_HEIGHT / 2,
+                        Config.SCREEN_WIDTH / 2
                     )
-            if not self._game_started:
-                self.client_sock.settimeout(0.01)
-                try:
-                    if self._recieve_packet().type == Game_Packet_Type.START_GAME:
-                        self._game_started = True
-                except socket.timeout:
-                    pass
-                self.client_sock.settimeout(None)
+                    self._logger.debug('Player lost')
+                elif player_state == Player_State.LOST:
+                    self.game_keyboard.render_text(
+                        'you lost!', Color.WHITE,
+                        Config.SCREEN_HEIGHT / 2,
+                        Config.SCREEN_WIDTH / 2
+                    )
+                    self._logger.debug('Player won')
+                elif self._spectating:
+                    self.game_keyboard.render_text(
+                        'game over', Color.WHITE,
+                        Config.SCREEN_HEIGHT / 2,
+                        Config.SCREEN_WIDTH / 2
+                    )
+            else:
+                # the player's own snake is drawn where it is about to be
+                predicted = self._predictor.predict(board)
+                dirty_rects = self._renderer.render(
+                    predicted, self._camera_origin(predicted)
+                )
+
+        if dirty_rects is None:
+            self._renderer.invalidate()
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects)
+
+    def _camera_origin(self, board: Client_Board) -> tuple[int, int]:
+        """
+        :param board: the board about to be drawn
+        :return: the cell to draw in the top left of the screen, the\
+         player's snake is kept in the middle without showing past the\
+         edges of the board, and the camera stays where it died
+        """
+
+        cells = board.snakes.get(self._client_ID)
+        if cells:
+            self._camera_center = cells[0]
+        elif self._camera_center is None:
+            self._camera_center = (
+                self._board_width // 2, self._board_height // 2
+            )
+        x, y = self._camera_center
+        return (
+            min(max(x - self._columns // 2, 0),
+                self._board_width - self._columns),
+            min(max(y - self._rows // 2, 0),
+                self._board_height - self._rows)
+        )
 
     def _send_data(self, data: Game_Packet) -> None:
         """
@@ -223,84 +332,138 @@ class Snake_Client:
         :param data: the data to send
         """
 
-        ser_data = json.dumps(vars(data))
-        self.client_sock.send(ser_data.encode())
+        try:
+            self.client_sock.sendall(encode_packet(data))
+        except OSError:
+            # the server closes the connection once the game is done
+            self._logger.debug('Server closed the connection')
+            self._connected = False
 
-    def _render_sprites(self, sprites: list[dict]) -> None:
+    def _send_datagram(self, packets: list[Game_Packet]) -> None:
         """
-        Renders all sprites in the given list
-        The list is a list of sprite wrappers
+        Sends packets to the server over UDP, together with the inputs
+        the server didn't confirm yet, so a lost datagram costs nothing as
+        long as a later one arrives
         ...
-        :param sprites: a list of all the sprites to draw on the screen\
-         and their coords
+        :param packets: the packets to send
         """
 
-        for sprite in sprites:
-            if sprite['color']:
-                sprite['color'] = tuple(sprite['color'])
-            self._draw_object(
-                sprite['object'],
-                sprite['color'],
-                sprite['coords'],
-                sprite['direction']
+        while self._unconfirmed_inputs and \
+                self._unconfirmed_inputs[0]['seq'] <= self._board.input_seq:
+            self._unconfirmed_inputs.popleft()
+        packets = [
+            Game_Packet(type=Game_Packet_Type.PLAYER_INPUTS, data=inputs)
+            for inputs in self._unconfirmed_inputs
+        ] + packets
+
+        self._sent_datagram_seq += 1
+        try:
+            self._udp_sock.send(encode_datagram(
+                self._udp_token, self._sent_datagram_seq,
+                [encode_packet(packet) for packet in packets]
+            ))
+        except OSError:
+            # just like a lost datagram
+            pass
+
+    def _handle_server_packets(self) -> None:
+        """
+        Handles everything the server pushed since the last frame
+        The server sends the whole board once and then only the changes,
+        the newest tick applied is confirmed back to the server
+        """
+
+        last_tick = self._board.tick
+        for packet in self._recieve_available_packets():
+            if packet.type == Game_Packet_Type.START_GAME:
+                self._game_started = True
+            elif packet.type == Game_Packet_Type.PLAYER_STATUS:
+                self._board.set_player_status(packet.data)
+            elif packet.type == Game_Packet_Type.GAME_STATUS:
+                # with UDP a board sent over TCP can arrive after newer ones
+                if self._board.tick is None or \
+                   packet.data['tick'] >= self._board.tick:
+                    self._board.load_keyframe(packet.data)
+            elif packet.type == Game_Packet_Type.GAME_DELTA:
+                if not self._board.apply_delta(packet.data):
+                    self._logger.debug(
+                        f'Skipped changes from tick {packet.data["base tick"]}'
+                    )
+        self._predictor.board_updated(self._board, time.perf_counter())
+
+        if self._connected and self._board.tick != last_tick:
+            ack = Game_Packet(
+                type=Game_Packet_Type.SNAPSHOT_ACK,
+                data={'tick': self._board.tick}
             )
+            if self._udp_sock:
+                self._send_datagram([ack])
+            else:
+                self._send_data(ack)
 
-    def _draw_object(
-        self,
-        object: Game_Object,
-        color: tuple[int, int, int],
-        coords: tuple[int, int],
-        direction: Direction
-    ) -> None:
+    def _recieve_available_packets(self) -> list[Game_Packet]:
         """
-        Draws the object at the given coords
+        Reads all the packets that already arrived without waiting
         ...
-        :param object: the object to load
-        :param color: the color of the object, None for the default color
-        :param coords: the coords to draw it at
-        :param direction: the direction of the object
+        :return: the packets recieved
         """
 
-        self._screen.blit(
-            self.image_loader.get_image(object, color, direction),
-            coords
-        )
-
-    def _get_game_state(self) -> Game_Packet:
+        packets = list(self._packets)
+        self._packets.clear()
+        while select.select([self.client_sock], [], [], 0)[0]:
+            try:
+                data = self.client_sock.recv(65536)
+            except OSError:
+                data = b''
+            if not data:
+                self._logger.debug('Server closed the connection')
+                self._connected = False
+                break
+            packets.extend(self._decoder.feed(data))
+        if self._udp_sock:
+            packets.extend(self._recieve_datagrams())
+        return packets
+
+    def _recieve_datagrams(self) -> list[Game_Packet]:
         """
-        Sends the server a request for it to send the sprites to render
-        and returns the game state packet
+        Reads all the datagrams that already arrived without waiting
+        A datagram that arrives after a newer one is dropped, the board in
+        it is already old
         ...
-        :returns: the current game state packet
+        :return: the packets recieved
         """
 
-        self._send_data(
-            Game_Packet(
-                type=Game_Packet_Type.GAME_STATUS_REQUEST
-            )
-        )
-        return self._recieve_packet()
+        packets = []
+        while True:
+            try:
+                data = self._udp_sock.recv(65536)
+            except OSError:
+                # nothing more to read, or the server's port went away
+                break
+            try:
+                token, seq, datagram_packets = decode_datagram(data)
+            except ValueError:
+                continue
+            if token != self._udp_token or seq <= self._recieved_datagram_seq:
+                continue
+            self._recieved_datagram_seq = seq
+            packets.extend(datagram_packets)
+        return packets
 
     def _recieve_packet(self) -> Game_Packet:
         """
         Recieves a packet and returns it
+        Packets that arrived together with it are kept for the next calls
         ...
         :return: the packet recieved
         """
 
-        full_data = self.client_sock.recv(1024).decode()
-        self.client_sock.settimeout(0.01)
-        try:
-            while True:
-                full_data += self.client_sock.recv(1024).decode()
-        except socket.timeout:  # no more data to recieve
-            pass
-        self.client_sock.settimeout(None)
-        return Game_Packet(
-            **json.loads(
-                full_data
-            )
-        )
+        while not self._packets:
+            data = self.client_sock.recv(4096)
+            if not data:
+                raise ConnectionResetError('Server closed the connection')
+            self._packets.extend(self._decoder.feed(data))
+        return self._packets.popleft()
 
 
 def main():
@@ -13,7 +13,25 @@ class Snake_Config:
     BGCOLOR = Color.BLACK.value
     GAME_NAME = "Snake"
     GAME_SPEED = 150  # milliseconds,time it takes for the snake to move a tile
-    TIME_BETWEEN_SNAKE_UPDATES = int(GAME_SPEED / 10)
+    TICK_RATE = 1000 / GAME_SPEED  # game ticks per second on the server
+    MAX_CATCH_UP_TICKS = 3  # late ticks run at once before skipping
+    SNAPSHOT_HISTORY_TICKS = 64  # how far back deltas can be sent from
+    VIEW_BUCKET_SIZE = 8  # tiles on a side of a bucket of the view index
+    VIEW_MARGIN = 2  # tiles past the view before something leaves it
+    CLOSE_TIMEOUT = 5  # seconds to wait for players to leave after a game
+    SPECTATOR_QUEUE_FRAMES = 64  # frames a spectator may have queued
+    MAX_DATAGRAM_SIZE = 1200  # bytes, bigger boards are sent over TCP
+    REDUNDANT_INPUTS = 4  # unconfirmed inputs repeated in every datagram
+    LOAD_REPORT_INTERVAL = 5  # seconds between worker load reports
+    METRICS_LOG_INTERVAL = 30  # seconds between metrics summaries in the log
+    LOG_FILE = 'game_logs.log'
+    LOG_FILE_SIZE = 5 * 1024 * 1024  # bytes before the log file is rotated
+    LOG_FILE_BACKUPS = 3  # rotated log files kept
+    LOG_RATE_LIMIT = 20  # records a second a line of code can log
+    INPUT_QUEUE_SIZE = 4  # turns a player can have waiting for next ticks
+    MAX_INPUTS_PER_TICK = 8  # more inputs than this in a tick are dropped
+    MAX_PREDICTED_TICKS = 3  # how far ahead the client moves its snake
+    IMAGE_CACHE_SIZE = 256  # tinted and rotated images kept by the client
     SNAKE_PARTS_DIRECTORY = 'assets\\images\\snake parts\\'
     APPLE_IMAGE_PATH = 'assets\\images\\apple.png'
     DEFAULT_SNAKE_COLOR = (48, 216, 238)
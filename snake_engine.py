@@ -0,0 +1,391 @@
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass
+
+from enums import Direction, Game_Object, Game_State, Player_State, \
+    Player_Command, Game_Event
+from snake_grid import Occupancy_Grid, Free_Cells, Snake_Cells, \
+    Spatial_Buckets, EMPTY, WALL
+from game_metrics import NULL_METRICS
+
+
+DIRECTION_OFFSETS = {
+    Direction.UP: (0, -1),
+    Direction.DOWN: (0, 1),
+    Direction.LEFT: (-1, 0),
+    Direction.RIGHT: (1, 0)
+}
+
+COMMAND_DIRECTIONS = {
+    Player_Command.MOVE_UP: Direction.UP,
+    Player_Command.MOVE_DOWN: Direction.DOWN,
+    Player_Command.MOVE_LEFT: Direction.LEFT,
+    Player_Command.MOVE_RIGHT: Direction.RIGHT
+}
+
+OPPOSITE_DIRECTIONS = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT
+}
+
+
+@dataclass
+class Snake:
+    ID: int
+    direction: Direction
+    cells: Snake_Cells  # head first
+    growth: int = 0
+
+
+def direction_between(
+    from_cell: tuple[int, int],
+    to_cell: tuple[int, int]
+) -> Direction:
+    """
+    :param from_cell: the cell to start from
+    :param to_cell: a cell next to from_cell
+    :return: the direction from from_cell to to_cell
+    """
+
+    if to_cell[0] < from_cell[0]:
+        return Direction.LEFT
+    if to_cell[0] > from_cell[0]:
+        return Direction.RIGHT
+    if to_cell[1] < from_cell[1]:
+        return Direction.UP
+    return Direction.DOWN
+
+
+def snake_parts(
+    cells: list[tuple[int, int]]
+) -> list[tuple[Game_Object, tuple[int, int], Direction]]:
+    """
+    Turns the cells of a snake into the parts needed to draw it
+    Every part points towards the part in front of it, the head points
+    the way the snake is going
+    ...
+    :param cells: the cells of the snake, head first
+    :return: a list of (object, cell, direction) for every part
+    """
+
+    if not cells:
+        return []
+    if len(cells) == 1:
+        return [(Game_Object.SNAKE_HEAD, tuple(cells[0]), Direction.UP)]
+
+    parts = [(
+        Game_Object.SNAKE_HEAD,
+        tuple(cells[0]),
+        direction_between(cells[1], cells[0])
+    )]
+    for i in range(1, len(cells)):
+        if i == len(cells) - 1:
+            part = Game_Object.SNAKE_TAIL
+        else:
+            part = Game_Object.SNAKE_BODY
+        parts.append(
+            (part, tuple(cells[i]), direction_between(cells[i], cells[i - 1]))
+        )
+    return parts
+
+
+class Snake_Engine:
+    """
+    The game simulation, works on whole grid cells and knows nothing about
+    pygame, sockets or the screen
+    """
+
+    def __init__(
+        self,
+        width: int, height: int,
+        player_IDs: list[int],
+        seed: int = None,
+        bucket_size: int = None
+    ) -> None:
+        self._logger = logging.getLogger()
+
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self._random = random.Random(seed)
+
+        self._player_count = len(player_IDs)
+        self.snakes = {}
+        self.apples = set()
+        self.players_lost = []
+        self.winner = None
+        self.state = Game_State.ONGOING
+        self.tick = 0
+        self.metrics = NULL_METRICS  # set by the room to time the steps
+
+        self._new_directions = {}
+        self._events = []  # (event, snake ID, cell) since the last pop
+        self._grid = Occupancy_Grid(width, height)
+        self._free_cells = Free_Cells(width, height)
+        # where the snake parts and apples are, for finding what is near a
+        # player, only kept when a bucket size is given
+        self.part_buckets = None
+        self.apple_buckets = None
+        if bucket_size:
+            self.part_buckets = Spatial_Buckets(width, height, bucket_size)
+            self.apple_buckets = Spatial_Buckets(width, height, bucket_size)
+
+        self._init_snakes(player_IDs)
+        self._generate_apples(len(player_IDs))
+        self._events.clear()  # the starting board is sent whole
+
+    def _init_snakes(self, player_IDs: list[int]) -> None:
+        """
+        Places the snakes in rows, alternating between facing right
+        and facing left
+        ...
+        :param player_IDs: the IDs of the players in the game
+        """
+
+        for count, ID in enumerate(player_IDs, start=1):
+            y = self.height * count // (len(player_IDs) + 1)
+            x = self.width // 2
+            if count % 2 == 0:
+                facing = Direction.LEFT
+            else:
+                facing = Direction.RIGHT
+            step = -DIRECTION_OFFSETS[facing][0]
+
+            snake = Snake(
+                ID=ID, direction=facing, cells=Snake_Cells(self.width)
+            )
+            for i in range(3):  # head, body and tail
+                snake.cells.append((x + step * i, y))
+                self._occupy((x + step * i, y), ID)
+            self.snakes[ID] = snake
+
+    def _generate_apples(self, num_of_apples: int) -> list[tuple[int, int]]:
+        """
+        Places new apples on cells that are not taken by a snake
+        or another apple
+        ...
+        :param num_of_apples: how many apples to place
+        :return: the cells of the new apples
+        """
+
+        new_apples = []
+        for _ in range(num_of_apples):
+            apple = self._free_cells.random(self._random)
+            if apple is None:
+                self._logger.debug('Board is full, no room for an apple')
+                break
+            self._free_cells.remove(apple)
+            self.apples.add(apple)
+            if self.apple_buckets:
+                self.apple_buckets.add(apple)
+            new_apples.append(apple)
+            self._events.append((Game_Event.APPLE_SPAWNED, None, apple))
+        return new_apples
+
+    def _occupy(self, cell: tuple[int, int], snake_ID: int) -> None:
+        """
+        Puts a part of a snake on the cell
+        ...
+        :param cell: the cell to take
+        :param snake_ID: the ID of the snake
+        """
+
+        self._grid.occupy(cell, snake_ID)
+        self._free_cells.remove(cell)
+        if self.part_buckets:
+            self.part_buckets.add(cell)
+
+    def _free(self, cell: tuple[int, int]) -> None:
+        """
+        Takes a part of a snake off the cell
+        ...
+        :param cell: the cell to free
+        """
+
+        self._grid.free(cell)
+        self._free_cells.add(cell)
+        if self.part_buckets:
+            self.part_buckets.remove(cell)
+
+    def snake_at(self, cell: tuple[int, int]) -> int:
+        """
+        :param cell: a cell on the board
+        :return: the ID of the snake on the cell, None if there is none
+        """
+
+        snake_ID = self._grid.get(cell)
+        return None if snake_ID < 0 else snake_ID
+
+    def set_direction(self, snake_ID: int, direction: Direction) -> None:
+        """
+        Sets the direction the snake will turn to on the next step
+        A snake can't turn back into itself, so those are ignored
+        ...
+        :param snake_ID: the ID of the snake to turn
+        :param direction: the direction to turn to
+        """
+
+        snake = self.snakes.get(snake_ID)
+        if snake and direction != OPPOSITE_DIRECTIONS[snake.direction]:
+            self._new_directions[snake_ID] = direction
+
+    def step(self, moving_IDs: set[int] = None) -> list[int]:
+        """
+        Moves every snake one cell and handles apples, collisions and
+        the end of the game
+        ...
+        :param moving_IDs: the IDs of the snakes to move, None for all
+        :return: the IDs of the snakes that died this step
+        """
+
+        if self.state != Game_State.ONGOING:
+            return []
+        self.tick += 1
+        metrics = self.metrics
+        start = metrics.clock()
+
+        new_heads = {}
+        for ID, snake in self.snakes.items():
+            if moving_IDs is not None and ID not in moving_IDs:
+                continue
+            snake.direction = self._new_directions.pop(ID, snake.direction)
+            x, y = snake.cells[0]
+            dx, dy = DIRECTION_OFFSETS[snake.direction]
+            new_heads[ID] = (x + dx, y + dy)
+
+        # tails move out of the way before heads move in
+        for ID in new_heads:
+            snake = self.snakes[ID]
+            if snake.growth:
+                snake.growth -= 1
+            else:
+                self._free(snake.cells.pop())
+                self._events.append((Game_Event.TAIL_REMOVED, ID, None))
+        start = metrics.phase('movement', start)
+
+        head_counts = Counter(new_heads.values())
+        dead = []
+        for ID, head in new_heads.items():
+            hit = self._grid.get(head)
+            if hit == WALL:
+                self._logger.debug(f'snake {ID} hit the edge of the board')
+                dead.append(ID)
+            elif head_counts[head] > 1:
+                self._logger.debug(f'snake {ID} collided head on')
+                dead.append(ID)
+            elif hit == ID:
+                self._logger.debug(f'snake {ID} has collided with itself')
+                dead.append(ID)
+            elif hit != EMPTY:
+                self._logger.debug(
+                    f'snake {ID} has collided with snake {hit}'
+                )
+                dead.append(ID)
+        start = metrics.phase('collisions', start)
+
+        eaten = 0
+        for ID, head in new_heads.items():
+            if ID in dead:
+                continue
+            snake = self.snakes[ID]
+            snake.cells.appendleft(head)
+            self._occupy(head, ID)
+            self._events.append((Game_Event.HEAD_ADDED, ID, head))
+            if head in self.apples:
+                self.apples.remove(head)
+                if self.apple_buckets:
+                    self.apple_buckets.remove(head)
+                self._events.append((Game_Event.APPLE_EATEN, None, head))
+                snake.growth += 1
+                eaten += 1
+
+        for ID in dead:
+            self._remove_snake(ID)
+            self.players_lost.append(ID)
+        start = metrics.phase('eating', start)
+
+        if eaten:
+            self._generate_apples(eaten)
+            metrics.phase('apple spawning', start)
+
+        self._check_game_over()
+        return dead
+
+    def remove_player(self, snake_ID: int) -> None:
+        """
+        Removes a player that left the game
+        ...
+        :param snake_ID: the ID of the player's snake
+        """
+
+        if snake_ID in self.snakes:
+            self._remove_snake(snake_ID)
+        self._check_game_over()
+
+    def _remove_snake(self, snake_ID: int) -> None:
+        """
+        Takes a snake off the board
+        ...
+        :param snake_ID: the ID of the snake to remove
+        """
+
+        snake = self.snakes.pop(snake_ID)
+        for cell in snake.cells:
+            self._free(cell)
+        self._new_directions.pop(snake_ID, None)
+        self._events.append((Game_Event.SNAKE_DIED, snake_ID, None))
+
+    def _check_game_over(self) -> None:
+        """
+        Ends the game once only one snake is left
+        (or none, if it was a one player game)
+        """
+
+        if self.state != Game_State.ONGOING:
+            return
+        players_needed = 1 if self._player_count > 1 else 0
+        if len(self.snakes) <= players_needed:
+            self.state = Game_State.DONE
+            if self.snakes:
+                self.winner = next(iter(self.snakes))
+            self._logger.debug(f'Game done, winner is {self.winner}')
+
+    def pop_events(self) -> list[tuple[Game_Event, int, tuple[int, int]]]:
+        """
+        :return: everything that changed on the board since the last call,\
+         in the order it happened
+        """
+
+        events = self._events
+        self._events = []
+        return events
+
+    def player_state(self, player_ID: int) -> Player_State:
+        """
+        :param player_ID: the ID of the player
+        :return: the state of the player in the game
+        """
+
+        if self.winner == player_ID:
+            return Player_State.WON
+        if player_ID in self.players_lost:
+            return Player_State.LOST
+        return Player_State.INGAME
+
+    def snapshot(self) -> dict:
+        """
+        :return: the whole state of the board
+        """
+
+        return {
+            'tick': self.tick,
+            'game state': self.state,
+            'snakes': [
+                {'ID': ID, 'cells': [list(cell) for cell in snake.cells]}
+                for ID, snake in self.snakes.items()
+            ],
+            'apples': [list(apple) for apple in self.apples]
+        }
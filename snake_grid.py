@@ -0,0 +1,266 @@
+from array import array
+
+
+EMPTY = -1
+WALL = -2
+
+
+class Occupancy_Grid:
+    """
+    Keeps track of what is on every cell of the board
+    The board is padded with a ring of wall cells so a single lookup
+    answers both wall hits and snake hits
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self._stride = width + 2
+
+        self._cells = [WALL] * (self._stride * (height + 2))
+        for y in range(height):
+            start = self._index((0, y))
+            self._cells[start:start + width] = [EMPTY] * width
+
+    def _index(self, cell: tuple[int, int]) -> int:
+        """
+        :param cell: a cell on the board or right next to it
+        :return: the index of the cell in the padded list
+        """
+
+        return (cell[1] + 1) * self._stride + cell[0] + 1
+
+    def get(self, cell: tuple[int, int]) -> int:
+        """
+        Only cells on the board or one step off of it can be looked up,
+        which is as far as a head can get in one step
+        ...
+        :param cell: the cell to check
+        :return: the ID of the snake on the cell, EMPTY or WALL
+        """
+
+        return self._cells[self._index(cell)]
+
+    def occupy(self, cell: tuple[int, int], snake_ID: int) -> None:
+        """
+        Marks the cell as taken by a snake
+        ...
+        :param cell: the cell to mark
+        :param snake_ID: the ID of the snake on the cell
+        """
+
+        self._cells[self._index(cell)] = snake_ID
+
+    def free(self, cell: tuple[int, int]) -> None:
+        """
+        Marks the cell as empty
+        ...
+        :param cell: the cell to free
+        """
+
+        self._cells[self._index(cell)] = EMPTY
+
+
+class Free_Cells:
+    """
+    The set of empty cells on the board, kept in a list so a random one
+    can be picked in constant time
+    Removing swaps the last cell into the removed cell's place, and the
+    position of every cell in the list is kept so that is constant time too
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self._cells = list(range(width * height))
+        self._positions = list(range(width * height))
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        return self._positions[cell[1] * self.width + cell[0]] != EMPTY
+
+    def add(self, cell: tuple[int, int]) -> None:
+        """
+        Marks the cell as free, does nothing if it already is
+        ...
+        :param cell: the cell to add
+        """
+
+        index = cell[1] * self.width + cell[0]
+        if self._positions[index] == EMPTY:
+            self._positions[index] = len(self._cells)
+            self._cells.append(index)
+
+    def remove(self, cell: tuple[int, int]) -> None:
+        """
+        Marks the cell as taken, does nothing if it already is
+        ...
+        :param cell: the cell to remove
+        """
+
+        index = cell[1] * self.width + cell[0]
+        position = self._positions[index]
+        if position == EMPTY:
+            return
+        last = self._cells.pop()
+        if last != index:
+            self._cells[position] = last
+            self._positions[last] = position
+        self._positions[index] = EMPTY
+
+    def random(self, rng) -> tuple[int, int]:
+        """
+        :param rng: the random.Random to pick with
+        :return: a uniformly random free cell, None if the board is full
+        """
+
+        if not self._cells:
+            return None
+        index = self._cells[rng.randrange(len(self._cells))]
+        return (index % self.width, index // self.width)
+
+
+class Snake_Cells:
+    """
+    The cells of a snake, head first, packed into a ring buffer of cell
+    indexes
+    Moving pushes a head and pops the tail, both in constant time and
+    without making an object for every part, the buffer doubles when a
+    growing snake fills it
+    """
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self._indexes = array('I', bytes(4 * 8))
+        self._mask = 7  # the capacity is a power of two
+        self._start = 0  # the slot of the head
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position: int) -> tuple[int, int]:
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError('snake cell out of range')
+        index = self._indexes[(self._start + position) & self._mask]
+        return (index % self.width, index // self.width)
+
+    def __iter__(self):
+        width = self.width
+        indexes = self._indexes
+        mask = self._mask
+        for position in range(self._start, self._start + self._length):
+            index = indexes[position & mask]
+            yield (index % width, index // width)
+
+    def appendleft(self, cell: tuple[int, int]) -> None:
+        """
+        Adds a new head
+        ...
+        :param cell: the cell of the head
+        """
+
+        if self._length > self._mask:
+            self._grow()
+        self._start = (self._start - 1) & self._mask
+        self._indexes[self._start] = cell[1] * self.width + cell[0]
+        self._length += 1
+
+    def append(self, cell: tuple[int, int]) -> None:
+        """
+        Adds a new tail
+        ...
+        :param cell: the cell of the tail
+        """
+
+        if self._length > self._mask:
+            self._grow()
+        self._indexes[(self._start + self._length) & self._mask] = \
+            cell[1] * self.width + cell[0]
+        self._length += 1
+
+    def pop(self) -> tuple[int, int]:
+        """
+        Removes the tail
+        ...
+        :return: the cell of the tail
+        """
+
+        if not self._length:
+            raise IndexError('pop from an empty snake')
+        self._length -= 1
+        index = self._indexes[(self._start + self._length) & self._mask]
+        return (index % self.width, index // self.width)
+
+    def clear(self) -> None:
+        self._start = 0
+        self._length = 0
+
+    def _grow(self) -> None:
+        """
+        Doubles the buffer, the cells are moved to its start in order
+        """
+
+        capacity = self._mask + 1
+        end = self._start + self._length
+        indexes = self._indexes[self._start:min(end, capacity)] + \
+            self._indexes[:max(end - capacity, 0)]
+        self._indexes = indexes + array('I', bytes(4 * capacity))
+        self._mask = capacity * 2 - 1
+        self._start = 0
+
+
+class Spatial_Buckets:
+    """
+    Cells sorted into square buckets of the board, so the cells in an
+    area can be found by looking only at the buckets it covers, however
+    big the board is
+    """
+
+    def __init__(self, width: int, height: int, bucket_size: int) -> None:
+        self._size = bucket_size
+        self._columns = -(-width // bucket_size)
+        self._rows = -(-height // bucket_size)
+        self._buckets = [set() for _ in range(self._columns * self._rows)]
+
+    def _bucket(self, cell: tuple[int, int]) -> set:
+        return self._buckets[
+            cell[1] // self._size * self._columns + cell[0] // self._size
+        ]
+
+    def add(self, cell: tuple[int, int]) -> None:
+        self._bucket(cell).add(cell)
+
+    def remove(self, cell: tuple[int, int]) -> None:
+        self._bucket(cell).discard(cell)
+
+    def cells_in(
+        self, left: int, top: int, right: int, bottom: int
+    ) -> list[tuple[int, int]]:
+        """
+        :param left: the first column of the area
+        :param top: the first row of the area
+        :param right: the last column of the area
+        :param bottom: the last row of the area
+        :return: the cells in the area, the area can go off the board
+        """
+
+        first_column = max(left // self._size, 0)
+        last_column = min(right // self._size, self._columns - 1)
+        first_row = max(top // self._size, 0)
+        last_row = min(bottom // self._size, self._rows - 1)
+
+        cells = []
+        for row in range(first_row, last_row + 1):
+            start = row * self._columns
+            for bucket in self._buckets[
+                start + first_column:start + last_column + 1
+            ]:
+                cells.extend(
+                    cell for cell in bucket
+                    if left <= cell[0] <= right and top <= cell[1] <= bottom
+                )
+        return cells
@@ -0,0 +1,132 @@
+from collections import deque
+
+from enums import Game_State, Player_Command
+from game_snapshots import Client_Board
+from snake_config import Snake_Config as Config
+from snake_engine import COMMAND_DIRECTIONS, DIRECTION_OFFSETS, \
+    OPPOSITE_DIRECTIONS, direction_between
+
+
+class Snake_Predictor:
+    """
+    Shows the player's own snake where it will be once the server got
+    their inputs, instead of where the server last said it was
+    The snake is moved ahead of the server's board by about the time an
+    input takes to reach the server and come back, with the inputs the
+    server didn't confirm yet, every board the server sends starts the
+    prediction over so mistakes don't last
+    """
+
+    def __init__(
+        self,
+        player_ID: int,
+        board_width: int, board_height: int,
+        tick_rate: float
+    ) -> None:
+        self._player_ID = player_ID
+        self._board_width = board_width
+        self._board_height = board_height
+        self._tick_rate = tick_rate
+        self._pending = []  # (input seq, command, when it was sent)
+        self.round_trip = None  # seconds, averaged
+
+    def input_sent(
+        self, seq: int, command: Player_Command, now: float
+    ) -> None:
+        """
+        Remembers an input until the server confirms it
+        ...
+        :param seq: the sequence number of the input
+        :param command: the input
+        :param now: when it was sent, in seconds
+        """
+
+        self._pending.append((seq, command, now))
+
+    def board_updated(self, board: Client_Board, now: float) -> None:
+        """
+        Forgets the inputs the server confirmed and measures how long they
+        took to be confirmed
+        ...
+        :param board: the board as the server sent it
+        :param now: when it arrived, in seconds
+        """
+
+        while self._pending and self._pending[0][0] <= board.input_seq:
+            sample = now - self._pending.pop(0)[2]
+            if self.round_trip is None:
+                self.round_trip = sample
+            else:
+                self.round_trip += (sample - self.round_trip) / 8
+
+    def predict(self, board: Client_Board) -> Client_Board:
+        """
+        :param board: the board as the server sent it
+        :return: the board with the player's snake moved ahead, the\
+         server's board itself isn't changed
+        """
+
+        cells = board.snakes.get(self._player_ID)
+        if board.game_state != Game_State.ONGOING or not cells or \
+           len(cells) < 2:
+            return board
+
+        ticks = round((self.round_trip or 0) * self._tick_rate)
+        if self._pending:
+            ticks = max(ticks, 1)  # always show a turn right away
+        ticks = min(ticks, Config.MAX_PREDICTED_TICKS)
+        if not ticks:
+            return board
+
+        predicted = Client_Board()
+        predicted.tick = board.tick
+        predicted.game_state = board.game_state
+        predicted.player_state = board.player_state
+        predicted.input_seq = board.input_seq
+        predicted.apples = board.apples
+        predicted.snakes = dict(board.snakes)
+        predicted.snakes[self._player_ID] = self._move_ahead(board, ticks)
+        return predicted
+
+    def _move_ahead(self, board: Client_Board, ticks: int) -> deque:
+        """
+        Moves the player's snake the way the server would, turning once a
+        tick by the unconfirmed inputs
+        The prediction stops before the snake would die, the server has
+        the final say on that
+        ...
+        :param board: the board as the server sent it
+        :param ticks: how many ticks to move
+        :return: the predicted cells of the snake, head first
+        """
+
+        cells = board.snakes[self._player_ID].copy()
+        direction = direction_between(cells[1], cells[0])
+        commands = [command for _, command, _ in self._pending]
+        others = {
+            cell for ID, snake in board.snakes.items()
+            if ID != self._player_ID for cell in snake
+        }
+
+        for _ in range(ticks):
+            while commands:
+                new_direction = COMMAND_DIRECTIONS.get(commands.pop(0))
+                if new_direction not in (
+                    None, direction, OPPOSITE_DIRECTIONS[direction]
+                ):
+                    direction = new_direction
+                    break
+
+            dx, dy = DIRECTION_OFFSETS[direction]
+            head = (cells[0][0] + dx, cells[0][1] + dy)
+            if not (0 <= head[0] < self._board_width and
+                    0 <= head[1] < self._board_height):
+                break
+            if head in others or (head in cells and head != cells[-1]):
+                break
+            if head in board.apples:
+                cells.appendleft(head)
+            else:
+                cells.pop()
+                cells.appendleft(head)
+        return cells
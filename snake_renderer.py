@@ -0,0 +1,139 @@
+import pygame
+
+from enums import Color, Game_Object
+from game_snapshots import Client_Board
+from loaded_images import Loaded_Images
+from snake_config import Snake_Config as Config
+from snake_engine import snake_parts
+
+
+class Snake_Renderer:
+    """
+    Draws the board on the screen, only redrawing the cells that changed
+    since the last frame
+    The grid is drawn once on a background surface, a changed cell is
+    cleared by copying its part of the background back
+    The screen can show just a part of the board, starting at an origin
+    cell, moving the origin redraws the whole screen
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        image_loader: Loaded_Images,
+        tile_width: int, tile_height: int
+    ) -> None:
+        self._screen = screen
+        self._image_loader = image_loader
+        self._tile_width = tile_width
+        self._tile_height = tile_height
+        self._columns = screen.get_width() // tile_width
+        self._rows = screen.get_height() // tile_height
+        self._origin = (0, 0)  # the cell in the top left of the screen
+
+        self._background = self._make_background()
+        self._drawn = {}  # cell: (object, color, direction) on screen
+        self._full_redraw = True
+
+    def _make_background(self) -> pygame.Surface:
+        """
+        :return: a surface of the screen's size with the grid drawn on it
+        """
+
+        background = pygame.Surface(self._screen.get_size())
+        background.fill(Config.BGCOLOR)
+        for x in range(0, background.get_width(), self._tile_width):
+            for y in range(0, background.get_height(), self._tile_height):
+                rect = pygame.Rect(x, y, self._tile_width, self._tile_height)
+                pygame.draw.rect(background, Color.WHITE.value, rect, 1)
+        if pygame.display.get_surface():
+            background = background.convert()
+        return background
+
+    def invalidate(self) -> None:
+        """
+        Makes the next frame redraw the whole screen, call after something
+        else was drawn on it
+        """
+
+        self._full_redraw = True
+
+    def render(
+        self, board: Client_Board, origin: tuple[int, int] = (0, 0)
+    ) -> list[pygame.Rect]:
+        """
+        Draws the board
+        ...
+        :param board: the board to draw
+        :param origin: the cell to draw in the top left of the screen
+        :return: the parts of the screen that changed, to be passed to\
+         pygame.display.update
+        """
+
+        if origin != self._origin:
+            self._origin = origin
+            self._full_redraw = True
+        sprites = self._board_sprites(board)
+        if self._full_redraw:
+            self._screen.blit(self._background, (0, 0))
+            changed = sprites.keys()
+        else:
+            changed = {
+                cell for cell in sprites.keys() | self._drawn.keys()
+                if sprites.get(cell) != self._drawn.get(cell)
+            }
+
+        rects = []
+        clears = []
+        draws = []
+        for cell in changed:
+            rect = self._cell_rect(cell)
+            rects.append(rect)
+            if not self._full_redraw:
+                clears.append((self._background, rect, rect))
+            if cell in sprites:
+                draws.append(
+                    (self._image_loader.get_image(*sprites[cell]), rect)
+                )
+        self._screen.blits(clears, doreturn=False)
+        self._screen.blits(draws, doreturn=False)
+
+        if self._full_redraw:
+            rects = [self._screen.get_rect()]
+            self._full_redraw = False
+        self._drawn = sprites
+        return rects
+
+    def _board_sprites(self, board: Client_Board) -> dict:
+        """
+        :param board: the board to draw
+        :return: a dict of cell: (object, color, direction) for every\
+         sprite on the screen
+        """
+
+        left, top = self._origin
+        right = left + self._columns
+        bottom = top + self._rows
+
+        sprites = {
+            apple: (Game_Object.APPLE, None, None) for apple in board.apples
+            if left <= apple[0] < right and top <= apple[1] < bottom
+        }
+        for ID, cells in board.snakes.items():
+            color = Config.SNAKE_COLORS[ID]
+            for part, cell, direction in snake_parts(cells):
+                if left <= cell[0] < right and top <= cell[1] < bottom:
+                    sprites[cell] = (part, color, direction)
+        return sprites
+
+    def _cell_rect(self, cell: tuple[int, int]) -> pygame.Rect:
+        """
+        :param cell: a cell on the board
+        :return: the rect the cell takes on screen
+        """
+
+        return pygame.Rect(
+            (cell[0] - self._origin[0]) * self._tile_width,
+            (cell[1] - self._origin[1]) * self._tile_height,
+            self._tile_width, self._tile_height
+        )
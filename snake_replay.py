@@ -0,0 +1,239 @@
+import asyncio
+import argparse
+import hashlib
+import json
+import logging
+import time
+
+from enums import Player_State
+from game_connection import Connection
+from game_logging import setup_logging
+from game_packet_API import Game_Packet, Game_Packet_Type
+from game_replay import load_replay, Replay_Game
+from game_snapshots import Snapshot_History
+from snake_config import Snake_Config as Config
+from tick_scheduler import Tick_Scheduler
+
+
+class Snake_Replay:
+    """
+    Plays a saved replay again, as fast as possible to check the result
+    or at the game's pace to a client that connects to watch it
+    """
+
+    def __init__(self) -> None:
+        self._parser = argparse.ArgumentParser(
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter
+        )
+        self._parser.add_argument(
+            'replay', action='store', type=str,
+            help='path of the replay file'
+        )
+        self._parser.add_argument(
+            '--log_level', action='store', type=int, default=20,
+            help='Log level (50=Critical, 40=Error, 30=Warning ,20=Info ,10=Debug, 0=None)'  # noqa
+        )
+        self._parser.add_argument(
+            '--port', action='store', type=int, default=None,
+            help='port a client can connect to to watch the replay, the replay is played without a client when not given'  # noqa
+        )
+        self._parser.add_argument(
+            '--speed', action='store', type=float, default=1,
+            help='how many times faster than the game was played to show the replay'  # noqa
+        )
+        self._parser.add_argument(
+            '--player', action='store', type=int, default=None,
+            help='ID of the player the client watches as, the first player when not given'  # noqa
+        )
+        self._args = self._parser.parse_args()
+
+        setup_logging(self._args.log_level)
+
+        self._logger = logging.getLogger()
+
+        self._replay = load_replay(self._args.replay)
+
+    def run(self) -> None:
+        """
+        Plays the replay, to a client if a port was given
+        """
+
+        if self._args.port is None:
+            self.play()
+        else:
+            asyncio.run(self.serve())
+
+    def play(self) -> None:
+        """
+        Plays the whole replay without a client and logs the result
+        """
+
+        game = Replay_Game(self._replay)
+        start = time.perf_counter()
+        while game.play_tick():
+            pass
+        duration = time.perf_counter() - start
+
+        engine = game.engine
+        self._logger.info(
+            f'Played {engine.tick} ticks in {duration:.3f} seconds '
+            f'({engine.tick / max(duration, 1e-9):.0f} ticks per second)'
+        )
+        self._logger.info(
+            f'Game state: {engine.state.value}, winner: {engine.winner}'
+        )
+        self._logger.info(f'Board digest: {board_digest(game)}')
+
+    async def serve(self) -> None:
+        """
+        Waits for a client and shows it the replay
+        """
+
+        done = asyncio.Event()
+
+        async def handle_client(
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+            try:
+                await self._stream(Connection(reader, writer))
+            finally:
+                done.set()
+
+        server = await asyncio.start_server(
+            handle_client, port=self._args.port
+        )
+        self._logger.info(
+            f'Waiting for a client to watch on port {self._args.port}'
+        )
+        async with server:
+            await done.wait()
+
+    async def _stream(self, connection: Connection) -> None:
+        """
+        Streams the replay to a client the way a room streams a game
+        ...
+        :param connection: the connection with the client
+        """
+
+        player_ID = self._args.player
+        if player_ID is None:
+            player_ID = self._replay.player_IDs[0]
+
+        try:
+            await connection.recieve_packet()  # the username
+            connection.send(
+                Game_Packet(
+                    type=Game_Packet_Type.PLAYER_INFO,
+                    data={
+                        'player ID': player_ID,
+                        'player color': Config.SNAKE_COLORS[player_ID],
+                        'board size': [
+                            self._replay.width, self._replay.height
+                        ],
+                        'tick rate': self._replay.tick_rate * self._args.speed
+                    }
+                )
+            )
+            while (await connection.recieve_packet()).type != \
+                    Game_Packet_Type.PLAYER_READY:
+                pass
+        except (OSError, ValueError, TypeError, KeyError):
+            self._logger.info('The client left before the replay started')
+            connection.abort()
+            return
+
+        # whatever the client sends while watching is ignored
+        reader_task = asyncio.create_task(self._ignore_packets(connection))
+
+        game = Replay_Game(self._replay)
+        history = Snapshot_History(Config.SNAPSHOT_HISTORY_TICKS)
+        connection.send(Game_Packet(type=Game_Packet_Type.START_GAME))
+        self._send_player_status(
+            connection, game.engine.tick, Player_State.INGAME
+        )
+        connection.send(Game_Packet(
+            type=Game_Packet_Type.GAME_STATUS, data=game.engine.snapshot()
+        ))
+
+        scheduler = Tick_Scheduler(self._replay.tick_rate * self._args.speed)
+        sent_tick = game.engine.tick
+        while not game.is_done and not reader_task.done():
+            for _ in range(await scheduler.next_ticks()):
+                if not game.play_tick():
+                    break
+                history.record(game.engine.tick, game.engine.pop_events())
+
+            self._send_player_status(
+                connection, game.engine.tick,
+                game.engine.player_state(player_ID)
+            )
+            connection.send(
+                Game_Packet(
+                    type=Game_Packet_Type.GAME_DELTA,
+                    data={
+                        'base tick': sent_tick,
+                        'tick': game.engine.tick,
+                        'game state': game.engine.state,
+                        'ticks': history.delta(sent_tick, game.engine.tick)
+                    }
+                )
+            )
+            sent_tick = game.engine.tick
+
+        self._logger.info(f'Replay done after {game.engine.tick} ticks')
+        connection.close()
+        await connection.wait_closed()
+        reader_task.cancel()
+        connection.abort()
+
+    def _send_player_status(
+        self, connection: Connection, tick: int, player_state: Player_State
+    ) -> None:
+        """
+        Sends the status the client shows for the player it watches as
+        ...
+        :param connection: the connection with the client
+        :param tick: the tick of the board sent after it
+        :param player_state: the state of the player
+        """
+
+        connection.send(Game_Packet(
+            type=Game_Packet_Type.PLAYER_STATUS,
+            data={'tick': tick, 'player state': player_state, 'input seq': 0}
+        ))
+
+    async def _ignore_packets(self, connection: Connection) -> None:
+        """
+        Reads everything the client sends until it leaves
+        ...
+        :param connection: the connection with the client
+        """
+
+        try:
+            while True:
+                await connection.recieve_packet()
+        except (OSError, ValueError, TypeError, KeyError):
+            self._logger.info('The client left')
+
+
+def board_digest(game: Replay_Game) -> str:
+    """
+    :param game: a replay that was played
+    :return: a short hash of the board, the same board gives the same hash
+    """
+
+    snapshot = game.engine.snapshot()
+    snapshot['apples'] = sorted(snapshot['apples'])
+    return hashlib.sha256(
+        json.dumps(snapshot, sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+
+def main():
+    replay = Snake_Replay()
+    replay.run()
+
+
+if __name__ == "__main__":
+    main()
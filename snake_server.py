@@ -1,35 +1,23 @@
-import json
+import asyncio
 import socket
-import threading
-import pygame
-from dataclasses import dataclass
-from time import sleep
 import logging
 import argparse
-import random
 
-from enums import Direction, Player_Command, Snake_Part, \
-    Player_State, Game_State
-from sprites import Snake_Body, Apple
-from game_packet_API import Game_Packet, Game_Packet_Type
+from game_connection import Connection
+from game_logging import setup_logging, set_log_context
+from game_metrics import Metrics, NULL_METRICS, serve_metrics, log_metrics
+from game_room import Game_Room, room_seed, watched_room
+from game_datagrams import open_datagram_endpoint
+from room_worker import Worker_Pool
 from snake_config import Snake_Config as Config
-from loaded_images import Loaded_Images
-
-
-@dataclass
-class Player:
-    username: str
-    ID: int
-    sock: socket.socket
-
-
-@dataclass
-class Request:
-    type: Player_Command
-    player_ID: int
 
 
 class Snake_Server:
+    """
+    The lobby, players that connect are put in the room that is waiting
+    for players and every room runs its own match
+    """
+
     def __init__(self, port) -> None:
         self._parser = argparse.ArgumentParser(
             formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -42,7 +30,7 @@ class Snake_Server:
         self._parser.add_argument(
             '--player_count', action='store', type=int,
             default=2, choices=range(2, 5),
-            help='number of players that will play, up to 4'
+            help='number of players in every room, up to 4'
         )
 
         self._parser.add_argument(
@@ -51,534 +39,241 @@ class Snake_Server:
             help='makes only the last player who joined move during the game, helps when debugging'  # noqa
         )
 
-        self._args = self._parser.parse_args()
-
-        logging.basicConfig(
-            level=self._args.log_level,
-            format='[%(asctime)s.%(msecs)03d] [%(levelname)s] [%(module)s] [%(funcName)s]: %(message)s',  # noqa
-            datefmt='%d-%m-%Y %H:%M:%S',
-            filename='game_logs.log'
+        self._parser.add_argument(
+            '--board_width', action='store', type=int,
+            default=Config.GAME_WIDTH,
+            help='width of the board in tiles'
         )
 
-        logging.getLogger().addHandler(logging.StreamHandler())
-
-        self._logger = logging.getLogger()
-
-        self._num_of_players = self._args.player_count
-        self._game_debug = self._args.debug
+        self._parser.add_argument(
+            '--board_height', action='store', type=int,
+            default=Config.GAME_HEIGHT,
+            help='height of the board in tiles'
+        )
 
-        self.server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_sock.bind(
-            (socket.gethostbyname(socket.gethostname()), port)
+        self._parser.add_argument(
+            '--tick_rate', action='store', type=float,
+            default=Config.TICK_RATE,
+            help='game ticks per second, the snakes move a tile every tick'
         )
-        self._logger.debug('Server is up and running')
-        self._logger.info(
-            f'Server IP is {socket.gethostbyname(socket.gethostname())}'
+        self._parser.add_argument(
+            '--seed', action='store', type=int, default=None,
+            help='seed of the games, the same seed and inputs play the same game'  # noqa
         )
-
-        self._players = {}
-        self._players_lost = []
-        self._player_won = 0
-        self._threads = []
-        self._requests = []
-        self.stop_handling_clients = False
-
-        self._get_clients()
-        self._logger.debug('Got all clients')
-
-        pygame.init()
-
-        # need a screen for things like sprites
-        self._server_screen = pygame.display.set_mode(
-            (40, 40)
+        self._parser.add_argument(
+            '--replay_directory', action='store', type=str, default=None,
+            help='directory to save a replay of every game to, no replays are saved when not given'  # noqa
+        )
+        self._parser.add_argument(
+            '--view_radius', action='store', type=int, default=None,
+            help='tiles players see around their snake\'s head, only that part of the board is sent to them, they see the whole board when not given'  # noqa
+        )
+        self._parser.add_argument(
+            '--workers', action='store', type=int, default=0,
+            help='number of worker processes to run the rooms on, 0 runs them in this process'  # noqa
+        )
+        self._parser.add_argument(
+            '--metrics_port', action='store', type=int, default=None,
+            help='local port to serve metrics on for Prometheus, every worker serves its own on the ports after it, no metrics are kept when not given'  # noqa
+        )
+        self._parser.add_argument(
+            '--udp', action='store_true',
+            help='lets clients that ask for it get the game over UDP, on the server\'s port or on a port of their worker, joining still goes over TCP'  # noqa
         )
 
-        self._clock = pygame.time.Clock()
+        self._args = self._parser.parse_args()
 
-        # setting the snakes dictionary
-        self._snakes = {}
-        for ID in self._players:
-            self._snakes[ID] = []
-        self._snake_sprite_group = pygame.sprite.Group()
+        setup_logging(self._args.log_level)
 
-        self._sprites_to_send = []
+        self._logger = logging.getLogger()
 
-        # need to load the images not during gametime
-        # to not take up time
-        self.image_loader = Loaded_Images()
-        self.all_images = self.image_loader._all
+        self._port = port
 
-        # initializing sprites
-        self._init_snakes()
-        self._apples = self._generate_apples(len(self._players))
-        self._apple_sprite_group = pygame.sprite.Group()
-        self._apple_sprite_group.add(self._apples)
+        self._rooms = {}
+        self._waiting_room = None
+        self._next_room_ID = 0
+        self._worker_pool = None
+        self._datagrams = None
+        self._tasks = set()
+        if self._args.metrics_port is None:
+            self._metrics = NULL_METRICS
+        else:
+            self._metrics = Metrics()
 
         self._logger.debug('Done initializing')
 
-    def _get_clients(self) -> None:
+    async def run(self) -> None:
         """
-        Listens to connections and adds them to the players dict
-        Creates a thread to handle them and adds it to the threads list
+        Accepts players until the server is stopped
         """
-        currentID = 0
-        while True:
-            self._logger.debug('Listening for clients')
-            self.server_sock.listen()
-            client, client_address = self.server_sock.accept()
-            username = self._recieve_packet(client).data['username']
-            self._logger.debug(f'Client {username} connected')
-
-            new_player = Player(
-                username=username,
-                ID=currentID,
-                sock=client
-            )
 
-            self._players[currentID] = new_player
-
-            self._threads.append(
-                threading.Thread(
-                    target=self._handle_player,
-                    args=(new_player,)
-                )
+        if self._args.workers:
+            self._worker_pool = Worker_Pool(
+                self._args.workers,
+                {
+                    'log_level': self._args.log_level,
+                    'player_count': self._args.player_count,
+                    'board_width': self._args.board_width,
+                    'board_height': self._args.board_height,
+                    'debug': self._args.debug,
+                    'tick_rate': self._args.tick_rate,
+                    'seed': self._args.seed,
+                    'replay_directory': self._args.replay_directory,
+                    'metrics_port': self._args.metrics_port,
+                    'view_radius': self._args.view_radius,
+                    'udp': self._args.udp
+                }
             )
+            await self._worker_pool.start()
+        elif self._args.udp:
+            self._datagrams = await open_datagram_endpoint(self._port)
 
-            self._send_data(
-                client=client,
-                data=Game_Packet(
-                    type=Game_Packet_Type.PLAYER_INFO,
-                    data={
-                        'player ID': currentID,
-                        'player color': Config.SNAKE_COLORS[currentID]
-                    }
-                )
+        if self._metrics.enabled:
+            self._start_task(
+                serve_metrics(self._metrics, self._args.metrics_port)
+            )
+            self._start_task(
+                log_metrics(self._metrics, Config.METRICS_LOG_INTERVAL)
             )
 
-            currentID += 1
-            if len(self._players) == self._num_of_players:
-                break
+        host = socket.gethostbyname(socket.gethostname())
+        server = await asyncio.start_server(
+            self._handle_client, host, self._port
+        )
+        self._logger.debug('Server is up and running')
+        self._logger.info(f'Server IP is {host}')
 
-    def _handle_player(self, player: Player):
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_client(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
         """
-        Handles the player and recieves all data sent by them
-        Puts the data in the requests list
+        Gets the username of a new client and hands them to a room, as a
+        player or as a spectator if that is what they asked for
         ...
-        :param player: the player to handle
+        :param reader: the connection's reader
+        :param writer: the connection's writer
         """
 
+        connection = Connection(reader, writer)
         try:
-            while True:
-                packet = self._recieve_packet(player.sock)
-                if packet:
-                    if packet.type == Game_Packet_Type.PLAYER_READY:
-                        self._logger.debug(f'Player {player.ID} is ready')
-                        self._players_ready += 1
-                    elif packet.type == Game_Packet_Type.PLAYER_INPUTS:
-                        if packet.data['status'] == Player_Command.QUIT:
-                            player.sock.close()
-                            self._remove_snake(player.ID)
-                            self._snakes.pop(player.ID)
-                            self._players.pop(player.ID)
-
-                            self._logger.debug(
-                                f'Player {player.username} has disconnected'
-                            )
-                            break
-
-                        for key, val in packet.data.items():
-                            if val is not None:
-                                self._requests.append(
-                                    Request(val, player.ID)
-                                )
-                                print(val)
-
-                    elif packet.type == Game_Packet_Type.GAME_STATUS_REQUEST:
-                        data = {
-                            'sprites': [],
-                            'game state': None,
-                            'player state': None
-                        }
-                        for sprite in self._sprites_to_send:
-                            data['sprites'].append(sprite.to_dict())
-                        if len(self._players) == len(self._players_lost) + 1:
-                            data['game state'] = Game_State.DONE
-                        else:
-                            data['game state'] = Game_State.ONGOING
-
-                        if self._player_won == player.ID:
-                            data['player state'] = Player_State.WON
-                        elif player.ID in self._players_lost:
-                            data['player state'] = Player_State.LOST
-
-                        self._send_data(
-                            player.sock,
-                            Game_Packet(
-                                type=Game_Packet_Type.GAME_STATUS,
-                                data=data
-                            )
-                        )
-                    if self.stop_handling_clients:
-                        player.sock.close()
-                        self._players.pop(player.ID)
-                        self._logger.debug(
-                            f'Closed connection with {player.username}'
-                        )
-                        break
-
-        except ConnectionResetError or json.decoder.JSONDecodeError:
-            self._logger.debug(
-                f'Player {player.username} has disconnected unexpectedly'
+            data = (await connection.recieve_packet()).data
+            username = data['username']
+        except (OSError, ValueError, TypeError, KeyError):
+            self._logger.debug(f'Client {connection.address} left')
+            connection.abort()
+            return
+        set_log_context(username=username)
+        self._logger.debug(f'Client {username} connected')
+
+        if data.get('spectate'):
+            await self._handle_spectator(
+                username, connection, data.get('room')
             )
-            self._snakes.pop(player.ID)
-            self._remove_snake(player.ID)
-            self._players.pop(player.ID)
-
-    def _init_snakes(self) -> None:
-        """
-        Initializes the snakes according to the number of players
-        """
-
-        count = 1
-        row_space = Config.SCREEN_HEIGHT / (len(self._players) + 1)
-        for ID, player in self._players.items():
-            part_x = 7.5
-            if count % 2 == 0:
-                facing = Direction.LEFT
-            else:
-                facing = Direction.RIGHT
-            self._snakes[ID].append(
-                Snake_Body(
-                    part_x * Config.TILE_WIDTH,
-                    row_space * count,
-                    Snake_Part.HEAD,
-                    facing,
-                    Config.SNAKE_COLORS[ID],
-                    self.all_images
-                )
-            )
-            # alternating between facing left and facing right
-            if count % 2 == 0:
-                part_x += 1
-            else:
-                part_x -= 1
-            self._snakes[ID].append(
-                Snake_Body(
-                    part_x * Config.TILE_WIDTH,
-                    row_space * count,
-                    Snake_Part.BODY,
-                    facing,
-                    Config.SNAKE_COLORS[ID],
-                    self.all_images
-                )
+        elif self._worker_pool:
+            await self._worker_pool.handle_player(
+                username, connection, data.get('udp', False)
             )
-            if count % 2 == 0:
-                part_x += 1
-            else:
-                part_x -= 1
-            self._snakes[ID].append(
-                Snake_Body(
-                    part_x * Config.TILE_WIDTH,
-                    row_space * count,
-                    Snake_Part.TAIL,
-                    facing,
-                    Config.SNAKE_COLORS[ID],
-                    self.all_images
-                )
+        else:
+            await self._get_waiting_room().handle_player(
+                username, connection, data.get('udp', False)
             )
-            self._sprites_to_send.extend(self._snakes[ID])
-            self._snake_sprite_group.add(self._snakes[ID])
-            count += 1
 
-    def _generate_apples(self, num_of_apples: int) -> Apple:
+    async def _handle_spectator(
+        self,
+        username: str,
+        connection: Connection,
+        room_ID: int = None
+    ) -> None:
         """
-        Generates a list of apples
-
+        Lets a client watch a room, a slow spectator gets their frames
+        dropped instead of piling them up
         ...
-        :return: a list of apples that dont intersect\
-         with the snakes and aren't off screen
+        :param username: the spectator's username
+        :param connection: the connection with the spectator
+        :param room_ID: the room to watch, None for the newest game
         """
 
-        apples = []
-        apple_coords_list = []
-
-        for _ in range(num_of_apples):
-            apple_coords = (
-                random.randrange(0, Config.GAME_WIDTH) * Config.TILE_WIDTH
-                + Config.TILE_WIDTH / 2,
-                random.randrange(0, Config.GAME_HEIGHT) * Config.TILE_HEIGHT
-                + Config.TILE_WIDTH / 2,
+        connection.max_queued = Config.SPECTATOR_QUEUE_FRAMES
+        if self._worker_pool:
+            await self._worker_pool.handle_spectator(
+                username, connection, room_ID
             )
-
-            again = True
-            while again:
-                again = False
-                for snake in self._snakes.values():
-                    for part in snake:
-                        if part.collide_point(apple_coords):
-                            apple_coords = (
-                                random.randrange(
-                                    0, Config.GAME_WIDTH + 1
-                                ) * Config.TILE_WIDTH
-                                + Config.TILE_WIDTH / 2,  # offset
-                                random.randrange(
-                                    0, Config.GAME_HEIGHT + 1
-                                ) * Config.TILE_HEIGHT
-                                + Config.TILE_WIDTH / 2,
-                            )
-                            again = True
-                            break
-                # checks if the apple is in the same coords as another one
-                if apple_coords in apple_coords_list:
-                    again = True
-
-            apple_coords_list.append(apple_coords)
-            apples.append(Apple(
-                apple_coords[0], apple_coords[1], self.all_images
-            ))
-        self._sprites_to_send.extend(apples)
-        return apples
-
-    def _snake_hit_apple(self, snake_ID: int) -> Apple:
-        """
-        Checks if the snake given hit an apple and returns the apple it hit
-        if th snake didng hit an apple returns None
-        ...
-        :param snake: the snake to check
-        :return: the apple it hit
-        """
-
-        for apple in self._apples:
-            if apple.rect.collidelist(self._snakes[snake_ID]) != -1:
-                return apple
-        return None
-
-    def _grow_snake(self, snake_ID) -> None:
-        """
-        Makes the snake grow, adds body to the snake list and sprite group
-        ...
-        :param snake_ID: the ID of the snake to grow
-        """
-
-        self._snakes[snake_ID][-1].change_costume(Snake_Part.BODY)
-        new_part = Snake_Body(
-            self._snakes[snake_ID][-1].get_x() + Config.TILE_WIDTH / 2,
-            self._snakes[snake_ID][-1].get_y() + Config.TILE_HEIGHT / 2,
-            Snake_Part.TAIL,
-            None,
-            Config.SNAKE_COLORS[snake_ID],
-            self.all_images
-        )
-
-        self._sprites_to_send.append(new_part)
-        self._snakes[snake_ID].append(new_part)
-        self._snake_sprite_group.add(new_part)
-
-    def _snake_hit_self(self, snake_ID: int) -> bool:
-        """
-        :param snake_ID: the id of the snake to check
-        :return: if the snake hits itself
+            return
+
+        room = watched_room(self._rooms, room_ID)
+        if room is None and room_ID is None:
+            room = self._get_waiting_room()
+        if room is None:
+            self._logger.debug(f'No room for {username} to watch')
+            connection.abort()
+            return
+        await room.handle_spectator(username, connection)
+
+    def _get_waiting_room(self) -> Game_Room:
         """
-
-        if len(self._snakes[snake_ID]) > 4:
-            if self._snakes[snake_ID][0].rect.collidelist(self._snakes[snake_ID][4:]) != -1:  # noqa
-                self._logger.debug(
-                    f'snake {snake_ID} has collided with itself'
-                )
-                return True
-        for ID, snake in self._snakes.items():
-            if ID != snake_ID:
-                if self._snakes[snake_ID][0].rect.collidelist(snake) >= 0:
-                    self._logger.debug(
-                        f'snake {snake_ID} has collided with snake {ID}'
-                    )
-                    return True
-        return False
-
-    def _snake_hit_screen_edge(self, snake_ID: int) -> bool:
+        :return: the room new players join, a new room is opened\
+         when the last one filled up
         """
-        :return: if the snake hit the edge of the screen
-        """
-
-        return not 0 <= self._snakes[snake_ID][0].get_y() < Config.SCREEN_HEIGHT or \
-            not 0 <= self._snakes[snake_ID][0].get_x() < Config.SCREEN_WIDTH
 
-    def _remove_snake(self, snake_ID: int) -> None:
+        if self._waiting_room is None or self._waiting_room.is_full:
+            room = Game_Room(
+                self._next_room_ID,
+                self._args.player_count,
+                self._args.board_width, self._args.board_height,
+                self._args.debug, self._args.tick_rate,
+                room_seed(self._args.seed, self._next_room_ID),
+                self._args.replay_directory, self._metrics,
+                self._args.view_radius, self._datagrams
+            )
+            self._next_room_ID += 1
+            self._rooms[room.ID] = room
+            self._waiting_room = room
+            self._start_task(self._run_room(room))
+            self._logger.debug(f'Opened room {room.ID}')
+        return self._waiting_room
+
+    def _start_task(self, coroutine) -> asyncio.Task:
         """
-        Removes a snake from the game
+        Runs a coroutine in the background, the event loop keeps only weak
+        references to tasks, so they are kept here until they are done
         ...
-        :param snake_ID: the ID of the snake to kill
+        :param coroutine: the coroutine to run
+        :return: the task running it
         """
 
-        for part in self._snakes[snake_ID]:
-            part.kill()
-            self._sprites_to_send.remove(part)
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
 
-    def _send_data(self, client: socket.socket, data: Game_Packet) -> None:
+    async def _run_room(self, room: Game_Room) -> None:
         """
-        Sends data to the client
-        The data is a dictionary of all sprites and their location
+        Runs a room's match and forgets the room once it is done
         ...
-        :param client: the client to send to
-        :param data: the data to send
+        :param room: the room to run
         """
 
-        ser_data = json.dumps(vars(data))
-        client.send(ser_data.encode())
-
-    def _recieve_packet(self, client: socket.socket) -> Game_Packet:
-        """
-        Recieves the packet the client sent
-        ...
-        :param client: the client to recieve from
-        :return: the game packet
-        """
         try:
-            return Game_Packet(
-                **json.loads(
-                    client.recv(1024).decode()
-                )
-            )
-        except json.decoder.JSONDecodeError:
-            return None
-
-    def run_game(self) -> None:
-        """
-        The mainloop of the program, call to run it
-        """
-
-        self._logger.debug('Running game')
-        self._players_ready = 0
-
-        for t in self._threads:  # starting all threads
-            t.start()
-
-        # waiting for all players to be ready:
-        while self._players_ready != len(self._players):
-            pass
-        self._logger.debug('Everyone is ready')
-
-        #  telling the players that the game started
-        for ID, player in self._players.items():
-            self._send_data(
-                player.sock,
-                Game_Packet(
-                    type=Game_Packet_Type.START_GAME
-                )
+            await room.run_game()
+        except Exception:
+            self._logger.exception(f'Room {room.ID} crashed')
+        finally:
+            self._rooms.pop(room.ID)
+            if self._waiting_room is room:
+                self._waiting_room = None
+            self._logger.debug(
+                f'Closed room {room.ID}, {len(self._rooms)} rooms open'
             )
-        self._logger.debug('Sent start game packets')
-
-        # creating custom events names
-        CHANGE_DIRECTION = pygame.USEREVENT + 1
-        UPDATE_SNAKE = pygame.USEREVENT + 2
-        # setting event times
-        pygame.time.set_timer(CHANGE_DIRECTION, Config.GAME_SPEED)
-        pygame.time.set_timer(UPDATE_SNAKE, Config.TIME_BETWEEN_SNAKE_UPDATES)
-
-        new_directions = {}
-        for ID in self._players:
-            new_directions[ID] = self._snakes[ID][0].direction
-
-        while True:
-            if len(self._players) == 0:  # all players quit\game is done
-                break
-            self._clock.tick(20)
-
-            if self._requests:  # has player requests
-                for request in self._requests:
-                    player_ID = request.player_ID
-                    try:
-                        snake_head = self._snakes[player_ID][0]
-                        match request.type:
-                            case Player_Command.MOVE_UP:
-                                if snake_head.direction != Direction.DOWN:
-                                    new_directions[player_ID] = Direction.UP
-                            case Player_Command.MOVE_DOWN:
-                                if snake_head.direction != Direction.UP:
-                                    new_directions[player_ID] = Direction.DOWN
-                            case Player_Command.MOVE_LEFT:
-                                if snake_head.direction != Direction.RIGHT:
-                                    new_directions[player_ID] = Direction.LEFT
-                            case Player_Command.MOVE_RIGHT:
-                                if snake_head.direction != Direction.LEFT:
-                                    new_directions[player_ID] = Direction.RIGHT
-                    except KeyError:
-                        # someone quit unexpectidly while iterating
-                        pass
-
-                # clear events list after iterating through them
-                self._requests.clear()
-
-            for event in pygame.event.get():
-                if event.type == CHANGE_DIRECTION:
-                    for snake_ID, snake in self._snakes.items():
-                        snake[0].set_direction(new_directions[snake_ID])
-
-                        for part in snake:
-                            part.snap()  # snap to the nearest tile
-                            # since pygame is not accurate enough
-                            # we need to snap every part to place
-
-                        # setting part directions
-                        for i in range(len(snake) - 1, 0, -1):
-                            current_part = snake[i]
-                            next_part = snake[i - 1]
-                            if current_part.get_x() > next_part.get_x():
-                                current_part.set_direction(Direction.LEFT)
-                            elif current_part.get_x() < next_part.get_x():
-                                current_part.set_direction(Direction.RIGHT)
-                            elif current_part.get_y() > next_part.get_y():
-                                current_part.set_direction(Direction.UP)
-                            elif current_part.get_y() < next_part.get_y():
-                                current_part.set_direction(Direction.DOWN)
-
-                # updating snakes
-                if event.type == UPDATE_SNAKE:
-                    if self._game_debug:
-                        for ID, snake in self._snakes.items():
-                            if ID == 1:
-                                for part in snake:
-                                    part.update()
-                    else:
-                        self._snake_sprite_group.update()
-
-            IDs_to_remove = []
-            for snake_ID in self._snakes:
-                apple_hit = self._snake_hit_apple(snake_ID)
-                if apple_hit:
-                    self._grow_snake(snake_ID)
-                    self._apples.remove(apple_hit)
-                    self._sprites_to_send.remove(apple_hit)
-                    apple_hit.kill()
-                    new_apple = self._generate_apples(1)
-                    self._apples.extend(new_apple)
-                    self._apple_sprite_group.add(new_apple)
-
-                if self._snake_hit_self(snake_ID) or \
-                   self._snake_hit_screen_edge(snake_ID):
-
-                    # only one player left
-                    if len(self._players) - len(self._players_lost) == 1:
-                        self._player_won = set(
-                            self._players) - set(self._players_lost)
-
-                        # make sure every player got a game
-                        # update before stopping the game
-                        sleep(0.5)
-                        self.stop_handling_clients = True
-
-                    self._players_lost.append(snake_ID)
-                    self._remove_snake(snake_ID)
-                    IDs_to_remove.append(snake_ID)
-            for ID in IDs_to_remove:
-                self._snakes.pop(ID)
-
-        self._logger.debug('Game done')
 
 
 def main():
     server = Snake_Server(3333)
-    server.run_game()
+    asyncio.run(server.run())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,54 @@
+import unittest
+
+from enums import Direction, Player_Command
+from game_inputs import Input_Queue
+
+
+class Test_Input_Queue(unittest.TestCase):
+
+    def test_duplicates_are_ignored(self) -> None:
+        queue = Input_Queue(max_size=4, max_per_tick=8)
+        self.assertTrue(queue.push(1, Player_Command.MOVE_UP))
+        self.assertFalse(queue.push(1, Player_Command.MOVE_UP))
+        self.assertFalse(queue.push(0, Player_Command.MOVE_LEFT))
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.last_seq, 1)
+        self.assertEqual(queue.dropped, 0)
+
+    def test_inputs_past_the_tick_limit_are_not_confirmed(self) -> None:
+        queue = Input_Queue(max_size=8, max_per_tick=2)
+        self.assertTrue(queue.push(1, Player_Command.MOVE_UP))
+        self.assertTrue(queue.push(2, Player_Command.MOVE_LEFT))
+        self.assertFalse(queue.push(3, Player_Command.MOVE_DOWN))
+        self.assertEqual(queue.last_seq, 2)
+        self.assertEqual(queue.dropped, 1)
+
+        # sent again on the next tick, it is taken
+        queue.next_direction(Direction.RIGHT)
+        self.assertTrue(queue.push(3, Player_Command.MOVE_DOWN))
+        self.assertEqual(queue.last_seq, 3)
+
+    def test_inputs_past_a_full_queue_are_not_confirmed(self) -> None:
+        queue = Input_Queue(max_size=2, max_per_tick=8)
+        self.assertTrue(queue.push(1, Player_Command.MOVE_UP))
+        self.assertTrue(queue.push(2, Player_Command.MOVE_LEFT))
+        self.assertFalse(queue.push(3, Player_Command.MOVE_DOWN))
+        self.assertEqual(queue.last_seq, 2)
+        self.assertEqual(queue.dropped, 1)
+
+        self.assertEqual(queue.next_direction(Direction.RIGHT), Direction.UP)
+        self.assertTrue(queue.push(3, Player_Command.MOVE_DOWN))
+        self.assertEqual(queue.last_seq, 3)
+        self.assertEqual(len(queue), 2)
+
+    def test_inputs_that_dont_turn_are_skipped(self) -> None:
+        queue = Input_Queue()
+        queue.push(1, Player_Command.MOVE_RIGHT)
+        queue.push(2, Player_Command.MOVE_LEFT)
+        queue.push(3, Player_Command.MOVE_UP)
+        self.assertEqual(queue.next_direction(Direction.RIGHT), Direction.UP)
+        self.assertIsNone(queue.next_direction(Direction.UP))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from game_metrics import Metrics, NULL_METRICS, format_labels
+
+
+class Test_Metrics(unittest.TestCase):
+
+    def test_observe(self) -> None:
+        metrics = Metrics()
+        metrics.observe('send', 0.002)
+        metrics.observe('send', 0.004)
+        lines = metrics.exposition().splitlines()
+        name = 'snake_tick_phase_seconds'
+        self.assertIn(f'{name}_count{{phase="send"}} 2', lines)
+        self.assertIn(f'{name}_sum{{phase="send"}} 0.006', lines)
+        NULL_METRICS.observe('send', 0.002)
+
+    def test_counters_and_gauges(self) -> None:
+        metrics = Metrics()
+        metrics.add_collector(lambda: [
+            ('spectator_frames_dropped_total', {'room': 1}, 3),
+            ('room_spectators', {'room': 1}, 2)
+        ])
+        lines = metrics.exposition().splitlines()
+        name = 'snake_spectator_frames_dropped_total'
+        self.assertIn(f'# TYPE {name} counter', lines)
+        self.assertIn(f'{name}{{room="1"}} 3', lines)
+        self.assertIn('# TYPE snake_room_spectators gauge', lines)
+
+    def test_label_values_are_escaped(self) -> None:
+        self.assertEqual(
+            format_labels((('name', 'a"b\\c\nd'),)),
+            '{name="a\\"b\\\\c\\nd"}'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import struct
+import unittest
+
+from enums import Game_Event, Game_State, Player_Command, Player_State
+from game_packet_API import Game_Packet, Game_Packet_Type
+from game_packet_protocol import encode_packet, decode_payload, \
+    encode_datagram, decode_datagram, Frame_Decoder, FRAME_HEADER, \
+    MAX_FRAME_SIZE, PACKET_TYPE_CODES
+
+# a packet of every type with a binary encoding, as it decodes
+BINARY_PACKETS = [
+    Game_Packet(
+        type=Game_Packet_Type.PLAYER_INPUTS,
+        data={
+            'seq': 12,
+            'change dir': Player_Command.MOVE_LEFT,
+            'status': None
+        }
+    ),
+    Game_Packet(
+        type=Game_Packet_Type.PLAYER_INPUTS,
+        data={'seq': 13, 'change dir': None, 'status': Player_Command.QUIT}
+    ),
+    Game_Packet(
+        type=Game_Packet_Type.GAME_STATUS,
+        data={
+            'tick': 40,
+            'game state': Game_State.ONGOING,
+            'snakes': [
+                {'ID': 0, 'cells': [(3, 4), (2, 4), (1, 4)]},
+                {'ID': 3, 'cells': [(199, 0), (199, 1)]}
+            ],
+            'apples': [(7, 7), (0, 199)]
+        }
+    ),
+    Game_Packet(
+        type=Game_Packet_Type.GAME_DELTA,
+        data={
+            'base tick': 38,
+            'tick': 40,
+            'game state': Game_State.DONE,
+            'ticks': [
+                (39, [
+                    (Game_Event.HEAD_ADDED, 0, (4, 4)),
+                    (Game_Event.TAIL_REMOVED, 0, None),
+                    (Game_Event.APPLE_EATEN, None, (4, 4)),
+                    (Game_Event.APPLE_SPAWNED, None, (9, 1))
+                ]),
+                (40, [
+                    (Game_Event.SNAKE_DIED, 3, None),
+                    (Game_Event.SNAKE_ENTERED, 2, (5, 6)),
+                    (Game_Event.SNAKE_LEFT, 1, None),
+                    (Game_Event.APPLE_ENTERED, None, (1, 2)),
+                    (Game_Event.APPLE_LEFT, None, (2, 1))
+                ])
+            ]
+        }
+    ),
+    Game_Packet(
+        type=Game_Packet_Type.SNAPSHOT_ACK, data={'tick': 2 ** 32 - 1}
+    ),
+    Game_Packet(
+        type=Game_Packet_Type.PLAYER_STATUS,
+        data={'tick': 5, 'player state': Player_State.WON, 'input seq': 9}
+    ),
+    Game_Packet(
+        type=Game_Packet_Type.PLAYER_STATUS,
+        data={'tick': 0, 'player state': None, 'input seq': 0}
+    )
+]
+
+
+def decode_frame(frame: bytes) -> Game_Packet:
+    """
+    :param frame: a whole frame
+    :return: the packet in it
+    """
+
+    _, type_code = FRAME_HEADER.unpack_from(frame)
+    return decode_payload(type_code, frame[FRAME_HEADER.size:])
+
+
+class Test_Encoding(unittest.TestCase):
+
+    def test_binary_packets_round_trip(self) -> None:
+        for packet in BINARY_PACKETS:
+            with self.subTest(packet.type):
+                self.assertEqual(decode_frame(encode_packet(packet)), packet)
+
+    def test_json_and_empty_packets_round_trip(self) -> None:
+        packets = [
+            Game_Packet(type=Game_Packet_Type.PLAYER_READY),
+            Game_Packet(
+                type=Game_Packet_Type.STANDARD_DATA,
+                data={'username': 'snek', 'spectate': True}
+            )
+        ]
+        for packet in packets:
+            self.assertEqual(decode_frame(encode_packet(packet)), packet)
+
+    def test_every_type_has_a_code(self) -> None:
+        self.assertEqual(set(PACKET_TYPE_CODES), set(Game_Packet_Type))
+
+
+class Test_Frame_Decoder(unittest.TestCase):
+
+    def test_frames_split_across_reads(self) -> None:
+        data = b''.join(encode_packet(packet) for packet in BINARY_PACKETS)
+        for size in (1, 2, 5, 7, 64):
+            decoder = Frame_Decoder()
+            packets = []
+            for start in range(0, len(data), size):
+                packets.extend(decoder.feed(data[start:start + size]))
+            self.assertEqual(packets, BINARY_PACKETS)
+            self.assertEqual(decoder.take_buffer(), b'')
+
+    def test_many_frames_in_one_read(self) -> None:
+        frames = [encode_packet(packet) for packet in BINARY_PACKETS]
+        decoder = Frame_Decoder()
+        self.assertEqual(
+            decoder.feed(b''.join(frames) + frames[0][:3]), BINARY_PACKETS
+        )
+        self.assertEqual(decoder.take_buffer(), frames[0][:3])
+
+    def test_too_big_frame(self) -> None:
+        with self.assertRaises(ValueError):
+            Frame_Decoder().feed(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1, 3))
+
+
+class Test_Broken_Frames(unittest.TestCase):
+
+    def test_truncated_payloads(self) -> None:
+        for packet in BINARY_PACKETS:
+            frame = encode_packet(packet)
+            type_code = frame[FRAME_HEADER.size - 1]
+            payload = frame[FRAME_HEADER.size:]
+            for end in range(1, len(payload)):
+                with self.subTest(packet.type, end=end):
+                    with self.assertRaises(ValueError):
+                        decode_payload(type_code, payload[:end])
+
+    def test_enum_values_out_of_range(self) -> None:
+        inputs = PACKET_TYPE_CODES[Game_Packet_Type.PLAYER_INPUTS]
+        status = PACKET_TYPE_CODES[Game_Packet_Type.PLAYER_STATUS]
+        snapshot = PACKET_TYPE_CODES[Game_Packet_Type.GAME_STATUS]
+        delta = PACKET_TYPE_CODES[Game_Packet_Type.GAME_DELTA]
+        broken = [
+            (inputs, struct.pack('!IBB', 1, 200, 0)),
+            (inputs, struct.pack('!IBB', 1, 0, 200)),
+            (status, struct.pack('!IBI', 1, 9, 0)),
+            (snapshot, struct.pack('!IBHH', 1, 9, 0, 0)),
+            (delta, struct.pack('!IIBH', 1, 2, 9, 0)),
+            (delta, struct.pack('!IIBH', 1, 2, 1, 1) +
+             struct.pack('!IH', 2, 1) + struct.pack('!BBHH', 99, 0, 0, 0))
+        ]
+        for type_code, payload in broken:
+            with self.subTest(type_code=type_code):
+                with self.assertRaises(ValueError):
+                    decode_payload(type_code, payload)
+
+    def test_unknown_type_and_bad_json(self) -> None:
+        with self.assertRaises(ValueError):
+            decode_payload(200, b'{}')
+        with self.assertRaises(ValueError):
+            decode_payload(
+                PACKET_TYPE_CODES[Game_Packet_Type.STANDARD_DATA], b'{"a'
+            )
+        with self.assertRaises(ValueError):
+            Frame_Decoder().feed(FRAME_HEADER.pack(1, 200) + b'x')
+
+
+class Test_Datagrams(unittest.TestCase):
+
+    def test_round_trip(self) -> None:
+        token = bytes(range(16))
+        frames = [encode_packet(packet) for packet in BINARY_PACKETS[:2]]
+        self.assertEqual(
+            decode_datagram(encode_datagram(token, 7, frames)),
+            (token, 7, BINARY_PACKETS[:2])
+        )
+
+    def test_broken_datagrams(self) -> None:
+        datagram = encode_datagram(
+            bytes(16), 1, [encode_packet(BINARY_PACKETS[0])]
+        )
+        for end in (3, len(datagram) - 1):
+            with self.assertRaises(ValueError):
+                decode_datagram(datagram[:end])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import random
+import tempfile
+import unittest
+
+from enums import Direction, Game_State
+from game_replay import Replay_Recorder, Replay_Game, encode_replay, \
+    decode_replay, load_replay, LEAVE
+from game_room import room_seed
+from snake_engine import Snake_Engine
+
+
+def play_game(seed: int, player_count: int, rng: random.Random) -> tuple:
+    """
+    Plays a game with random turns, the first player leaves on tick 10
+    ...
+    :param seed: the seed of the game
+    :param player_count: how many players are in the game
+    :param rng: what the turns are picked with
+    :return: the engine after the game and its recorder
+    """
+
+    engine = Snake_Engine(30, 30, list(range(player_count)), seed)
+    recorder = Replay_Recorder(engine, 6.5)
+    while engine.state == Game_State.ONGOING and engine.tick < 400:
+        for ID in list(engine.snakes):
+            if rng.random() < 0.1:
+                direction = rng.choice(list(Direction))
+                engine.set_direction(ID, direction)
+                recorder.turn(ID, direction)
+        if engine.tick == 10 and 0 in engine.snakes:
+            engine.remove_player(0)
+            recorder.leave(0)
+        engine.step()
+    return engine, recorder
+
+
+class Test_Replay(unittest.TestCase):
+
+    def test_encodes_and_decodes_to_the_same_replay(self) -> None:
+        seed = room_seed(2 ** 32 - 1, 3)  # past 32 bits before the mask
+        engine, recorder = play_game(seed, 3, random.Random(1))
+        recorder.replay.end_tick = engine.tick
+        replay = recorder.replay
+
+        decoded = decode_replay(encode_replay(replay))
+        self.assertEqual(decoded.seed, 2)
+        self.assertAlmostEqual(decoded.tick_rate, replay.tick_rate)
+        decoded.tick_rate = replay.tick_rate
+        self.assertEqual(decoded, replay)
+        self.assertIn((0, LEAVE), [
+            input for inputs in decoded.inputs.values() for input in inputs
+        ])
+
+    def test_replayed_game_ends_on_the_same_board(self) -> None:
+        seeds = [room_seed(-5, 0), room_seed(2 ** 40, 7), 12345]
+        for count, seed in enumerate(seeds):
+            with self.subTest(seed=seed):
+                engine, recorder = play_game(
+                    seed, 2 + count, random.Random(count)
+                )
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, 'game.replay')
+                    recorder.save(path)
+                    game = Replay_Game(load_replay(path))
+                while game.play_tick():
+                    pass
+                self.assertEqual(game.engine.snapshot(), engine.snapshot())
+                self.assertEqual(game.engine.winner, engine.winner)
+
+    def test_rejects_other_files(self) -> None:
+        with self.assertRaises(ValueError):
+            decode_replay(b'PNG!' + bytes(40))
+
+
+if __name__ == '__main__':
+    unittest.main()
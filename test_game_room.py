@@ -0,0 +1,170 @@
+import unittest
+
+from enums import Game_State
+from game_packet_API import Game_Packet_Type
+from game_packet_protocol import Frame_Decoder
+from game_interest import Player_View
+from game_room import Game_Room, Player
+from game_snapshots import Client_Board
+from snake_config import Snake_Config as Config
+from snake_engine import Snake_Engine
+
+
+class Fake_Connection:
+    """
+    Keeps the frames sent instead of sending them
+    """
+
+    def __init__(self) -> None:
+        self.frames = []
+
+    def send_frame(self, frame: bytes) -> None:
+        self.frames.append(frame)
+
+
+class Fake_Client:
+    """
+    Applies the frames a player was sent to a board, like the client does
+    """
+
+    def __init__(self) -> None:
+        self.board = Client_Board()
+        self.deltas = 0
+        self.keyframes = 0
+
+    def recieve(self, frames: list[bytes]) -> None:
+        for frame in frames:
+            for packet in Frame_Decoder().feed(frame):
+                if packet.type == Game_Packet_Type.PLAYER_STATUS:
+                    self.board.set_player_status(packet.data)
+                elif packet.type == Game_Packet_Type.GAME_STATUS:
+                    if self.board.tick is None or \
+                       packet.data['tick'] >= self.board.tick:
+                        self.board.load_keyframe(packet.data)
+                    self.keyframes += 1
+                elif self.board.apply_delta(packet.data):
+                    self.deltas += 1
+
+
+class Delayed_Channel:
+    """
+    A datagram channel whose datagrams arrive a few ticks late
+    """
+
+    def __init__(self, delay: int) -> None:
+        self.delay = delay
+        self.in_flight = []  # [ticks left, frames]
+
+    def send_frames(self, frames: list[bytes]) -> bool:
+        self.in_flight.append([self.delay, frames])
+        return True
+
+    def arrived(self) -> list[bytes]:
+        """
+        :return: the frames of the datagrams that arrived this tick
+        """
+
+        frames = []
+        for datagram in self.in_flight:
+            datagram[0] -= 1
+            if datagram[0] <= 0:
+                frames.extend(datagram[1])
+        self.in_flight = [
+            datagram for datagram in self.in_flight if datagram[0] > 0
+        ]
+        return frames
+
+
+def make_room(player_count: int, size: int, seed: int, **kwargs) -> Game_Room:
+    """
+    :param player_count: how many players are in the room
+    :param size: the width and height of the board
+    :param seed: the seed of the game
+    :param kwargs: more arguments for the room
+    :return: a room with a running game and fake connections
+    """
+
+    room = Game_Room(0, player_count, size, size, seed=seed, **kwargs)
+    for ID in range(player_count):
+        room._players[ID] = Player(
+            username=str(ID), ID=ID, connection=Fake_Connection()
+        )
+    room._engine = Snake_Engine(size, size, list(range(player_count)), seed)
+    return room
+
+
+def step(room: Game_Room) -> None:
+    room._engine.step()
+    room._history.record(room._engine.tick, room._engine.pop_events())
+
+
+class Test_Leaving(unittest.TestCase):
+
+    def test_board_after_a_leave_ends_the_game(self) -> None:
+        for seed in range(60):
+            room = make_room(2, 30, seed)
+            players = dict(room._players)
+            clients = {ID: Fake_Client() for ID in players}
+            room._broadcast_game_state()
+            for _ in range(3):
+                step(room)
+                room._broadcast_game_state()
+                for ID, player in players.items():
+                    clients[ID].recieve(player.connection.frames)
+                    player.connection.frames = []
+                    player.acked_tick = clients[ID].board.tick
+            if room._engine.state != Game_State.ONGOING:
+                continue
+
+            room._remove_player(players[1])
+            self.assertEqual(room._engine.state, Game_State.DONE)
+            step(room)
+            room._broadcast_game_state()
+            clients[0].recieve(players[0].connection.frames)
+
+            board = clients[0].board
+            self.assertEqual(board.game_state, Game_State.DONE)
+            self.assertEqual(set(board.snakes), set(room._engine.snakes))
+            for ID, cells in board.snakes.items():
+                self.assertEqual(
+                    list(cells), list(room._engine.snakes[ID].cells)
+                )
+
+
+class Test_Datagrams(unittest.TestCase):
+
+    def test_view_gets_changes_with_late_acks(self) -> None:
+        room = make_room(2, 100, 3, view_radius=10)
+        room._engine = Snake_Engine(
+            100, 100, [0, 1], 3, Config.VIEW_BUCKET_SIZE
+        )
+        player = room._players[0]
+        player.view = Player_View(0, 10)
+        player.channel = Delayed_Channel(delay=2)
+        client = Fake_Client()
+        acks = []  # the acks on their way, as [ticks left, tick]
+
+        room._broadcast_game_state()
+        for _ in range(30):
+            step(room)
+            room._broadcast_game_state()
+            if room._engine.state != Game_State.ONGOING:
+                break
+            client.recieve(player.connection.frames)
+            player.connection.frames = []
+            client.recieve(player.channel.arrived())
+
+            for ack in acks:
+                ack[0] -= 1
+                if ack[0] <= 0:
+                    player.acked_tick = max(player.acked_tick or 0, ack[1])
+            acks = [ack for ack in acks if ack[0] > 0]
+            if client.board.tick is not None:
+                acks.append([2, client.board.tick])
+
+        self.assertEqual(client.keyframes, 1)
+        self.assertGreater(client.deltas, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+from enums import Player_State
+from game_snapshots import Client_Board
+
+
+class Test_Client_Board(unittest.TestCase):
+
+    def test_old_player_status_is_ignored(self) -> None:
+        board = Client_Board()
+        board.set_player_status(
+            {'tick': 12, 'player state': Player_State.INGAME, 'input seq': 7}
+        )
+        # sent over TCP with an older board, arriving after a datagram
+        board.set_player_status(
+            {'tick': 10, 'player state': Player_State.INGAME, 'input seq': 5}
+        )
+        self.assertEqual(board.input_seq, 7)
+
+        board.set_player_status(
+            {'tick': 12, 'player state': Player_State.LOST, 'input seq': 7}
+        )
+        self.assertEqual(board.player_state, Player_State.LOST)
+
+
+if __name__ == '__main__':
+    unittest.main()
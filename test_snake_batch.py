@@ -0,0 +1,110 @@
+import random
+import unittest
+
+import numpy as np
+
+from enums import Direction, Game_State
+from snake_batch import Batch_Snake_Env, DIRECTIONS
+from snake_engine import Snake_Engine
+
+
+class Test_Batch_Snake_Env(unittest.TestCase):
+
+    def assert_same_game(
+        self,
+        seed: int,
+        players: int, width: int, height: int,
+        choose_actions
+    ) -> None:
+        """
+        Plays the same inputs in the batch and in the engine and checks
+        they agree after every step, the batch places its apples
+        differently so the engine's apples are copied into it
+        ...
+        :param seed: the seed of the game
+        :param players: how many players are in the game
+        :param width: the width of the board
+        :param height: the height of the board
+        :param choose_actions: called with the tick, returns the action of\
+         every player
+        """
+
+        engine = Snake_Engine(width, height, list(range(players)), seed)
+        batch = Batch_Snake_Env(
+            1, width, height, players, seed=seed, auto_reset=False
+        )
+
+        def copy_apples() -> None:
+            batch.apples[0] = False
+            for x, y in engine.apples:
+                batch.apples[0, y, x] = True
+
+        copy_apples()
+        while engine.state == Game_State.ONGOING:
+            actions = np.array(
+                [choose_actions(engine.tick)], dtype=np.int8
+            )
+            for ID, action in enumerate(actions[0]):
+                if action:
+                    engine.set_direction(ID, DIRECTIONS[action - 1])
+            engine.step()
+            _, ended, winners = batch.step(actions)
+            copy_apples()
+
+            with self.subTest(seed=seed, tick=engine.tick):
+                for ID in range(players):
+                    self.assertEqual(ID in engine.snakes, batch.alive[0, ID])
+                    if ID not in engine.snakes:
+                        continue
+                    ys, xs = np.nonzero(
+                        batch.leave_at[0, ID] > batch.clock[0, ID]
+                    )
+                    self.assertEqual(
+                        set(zip(xs.tolist(), ys.tolist())),
+                        set(engine.snakes[ID].cells)
+                    )
+                    self.assertEqual(
+                        tuple(batch.heads[0, ID].tolist()),
+                        engine.snakes[ID].cells[0]
+                    )
+                self.assertEqual(ended[0], engine.state == Game_State.DONE)
+                if ended[0]:
+                    winner = -1 if engine.winner is None else engine.winner
+                    self.assertEqual(winners[0], winner)
+
+    def test_same_rules_as_the_engine(self) -> None:
+        for seed in range(40):
+            rng = random.Random(seed)
+            players = rng.randint(1, 4)
+            width, height = rng.randint(6, 20), rng.randint(8, 20)
+
+            def choose_actions(tick: int) -> list[int]:
+                return [
+                    rng.randint(1, 4) if rng.random() < 0.3 else 0
+                    for _ in range(players)
+                ]
+
+            self.assert_same_game(seed, players, width, height, choose_actions)
+
+    def test_head_on(self) -> None:
+        # the snakes start on rows 3 and 7 of the same column and turn
+        # towards each other, both heads get to row 5 on the second tick
+        down = DIRECTIONS.index(Direction.DOWN) + 1
+        up = DIRECTIONS.index(Direction.UP) + 1
+        self.assert_same_game(
+            0, 2, 10, 11,
+            lambda tick: [down, up] if tick == 0 else [0, 0]
+        )
+
+    def test_auto_reset(self) -> None:
+        batch = Batch_Snake_Env(8, 10, 10, 2, seed=0)
+        actions = np.zeros((8, 2), dtype=np.int8)
+        for _ in range(20):
+            batch.step(actions)
+        # going straight hits a wall in under 10 ticks, then starts over
+        self.assertTrue((batch.tick < 10).all())
+        self.assertTrue(batch.alive.all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+
+from enums import Direction, Game_State, Player_State
+from snake_engine import Snake, Snake_Engine
+from snake_grid import Snake_Cells
+
+
+def make_engine(
+    snakes: dict, width: int = 10, height: int = 10
+) -> Snake_Engine:
+    """
+    :param snakes: {ID: (direction, cells head first)} of the snakes
+    :param width: the width of the board
+    :param height: the height of the board
+    :return: an engine with only the given snakes on the board and no\
+     apples
+    """
+
+    engine = Snake_Engine(width, height, list(snakes), seed=0)
+    for snake in engine.snakes.values():
+        for cell in snake.cells:
+            engine._free(cell)
+    for apple in engine.apples:
+        engine._free_cells.add(apple)
+    engine.apples.clear()
+    engine.snakes = {}
+
+    for ID, (direction, cells) in snakes.items():
+        snake = Snake(ID=ID, direction=direction, cells=Snake_Cells(width))
+        for cell in cells:
+            snake.cells.append(cell)
+            engine._occupy(cell, ID)
+        engine.snakes[ID] = snake
+    return engine
+
+
+class Test_Collisions(unittest.TestCase):
+
+    def test_head_on(self) -> None:
+        engine = make_engine({
+            0: (Direction.RIGHT, [(2, 5), (1, 5), (0, 5)]),
+            1: (Direction.LEFT, [(4, 5), (5, 5), (6, 5)]),
+            2: (Direction.DOWN, [(8, 2), (8, 1), (8, 0)])
+        })
+        self.assertEqual(sorted(engine.step()), [0, 1])
+        self.assertEqual(set(engine.snakes), {2})
+        self.assertIsNone(engine.snake_at((3, 5)))
+        self.assertEqual(engine.state, Game_State.DONE)
+        self.assertEqual(engine.player_state(2), Player_State.WON)
+
+    def test_moving_into_a_tail_leaving_the_same_tick(self) -> None:
+        engine = make_engine({
+            0: (Direction.RIGHT, [(2, 2), (1, 2), (0, 2)]),
+            1: (Direction.RIGHT, [(5, 2), (4, 2), (3, 2)])
+        })
+        self.assertEqual(engine.step(), [])
+        self.assertEqual(engine.snake_at((3, 2)), 0)
+        self.assertEqual(
+            list(engine.snakes[1].cells), [(6, 2), (5, 2), (4, 2)]
+        )
+
+    def test_moving_into_a_growing_tail(self) -> None:
+        engine = make_engine({
+            0: (Direction.RIGHT, [(2, 2), (1, 2), (0, 2)]),
+            1: (Direction.RIGHT, [(5, 2), (4, 2), (3, 2)]),
+            2: (Direction.DOWN, [(8, 6), (8, 5), (8, 4)])
+        })
+        engine.snakes[1].growth = 1
+        self.assertEqual(engine.step(), [0])
+        self.assertEqual(engine.snake_at((3, 2)), 1)
+
+    def test_moving_into_its_own_tail(self) -> None:
+        engine = make_engine({
+            0: (Direction.UP, [(1, 1), (1, 2), (2, 2), (2, 1)]),
+            1: (Direction.DOWN, [(8, 6), (8, 5), (8, 4)])
+        })
+        engine.set_direction(0, Direction.RIGHT)
+        self.assertEqual(engine.step(), [])
+        self.assertEqual(
+            list(engine.snakes[0].cells), [(2, 1), (1, 1), (1, 2), (2, 2)]
+        )
+
+    def test_wall(self) -> None:
+        engine = make_engine({
+            0: (Direction.RIGHT, [(9, 3), (8, 3), (7, 3)]),
+            1: (Direction.UP, [(4, 0), (4, 1), (4, 2)]),
+            2: (Direction.DOWN, [(0, 7), (0, 6), (0, 5)])
+        })
+        self.assertEqual(sorted(engine.step()), [0, 1])
+        self.assertEqual(engine.player_state(0), Player_State.LOST)
+        self.assertEqual(engine.player_state(2), Player_State.WON)
+        for cell in [(9, 3), (8, 3), (7, 3), (4, 1), (4, 2)]:
+            self.assertIsNone(engine.snake_at(cell))
+
+    def test_itself(self) -> None:
+        engine = make_engine({
+            0: (Direction.UP, [(2, 2), (2, 3), (3, 3), (3, 2), (3, 1)]),
+            1: (Direction.DOWN, [(8, 6), (8, 5), (8, 4)])
+        })
+        engine.set_direction(0, Direction.RIGHT)
+        self.assertEqual(engine.step(), [0])
+        self.assertEqual(engine.winner, 1)
+
+    def test_turning_back_is_ignored(self) -> None:
+        engine = make_engine({
+            0: (Direction.RIGHT, [(2, 2), (1, 2), (0, 2)]),
+            1: (Direction.DOWN, [(8, 6), (8, 5), (8, 4)])
+        })
+        engine.set_direction(0, Direction.LEFT)
+        self.assertEqual(engine.step(), [])
+        self.assertEqual(engine.snakes[0].cells[0], (3, 2))
+
+
+class Test_Apples(unittest.TestCase):
+
+    def test_full_board_has_no_room_for_apples(self) -> None:
+        engine = make_engine({
+            0: (Direction.RIGHT, [(1, 0), (0, 0)]),
+            1: (Direction.LEFT, [(3, 1), (4, 1)])
+        }, width=5, height=2)
+        engine.apples = {(2, 0), (3, 0), (4, 0), (0, 1), (1, 1), (2, 1)}
+        for apple in engine.apples:
+            engine._free_cells.remove(apple)
+
+        self.assertEqual(engine.step(), [])
+        self.assertEqual(len(engine.apples), 6)
+        self.assertEqual(len(engine._free_cells), 0)
+        self.assertEqual(engine._generate_apples(1), [])
+        self.assertEqual(len(engine._free_cells), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
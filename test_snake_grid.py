@@ -0,0 +1,113 @@
+import random
+import unittest
+from collections import deque
+
+from snake_grid import Occupancy_Grid, Free_Cells, Snake_Cells, EMPTY, WALL
+
+
+class Test_Occupancy_Grid(unittest.TestCase):
+
+    def test_cells_around_the_board_are_walls(self) -> None:
+        grid = Occupancy_Grid(4, 3)
+        for cell in [(-1, 0), (4, 0), (0, -1), (0, 3), (-1, -1), (4, 3)]:
+            self.assertEqual(grid.get(cell), WALL)
+        self.assertEqual(grid.get((3, 2)), EMPTY)
+
+        grid.occupy((3, 2), 1)
+        self.assertEqual(grid.get((3, 2)), 1)
+        grid.free((3, 2))
+        self.assertEqual(grid.get((3, 2)), EMPTY)
+
+
+class Test_Free_Cells(unittest.TestCase):
+
+    def test_stays_consistent(self) -> None:
+        width, height = 7, 5
+        cells = [(x, y) for y in range(height) for x in range(width)]
+        free_cells = Free_Cells(width, height)
+        free = set(cells)
+        rng = random.Random(1)
+
+        for _ in range(2000):
+            cell = rng.choice(cells)
+            if rng.random() < 0.5:
+                free_cells.add(cell)
+                free.add(cell)
+            else:
+                free_cells.remove(cell)
+                free.discard(cell)
+
+            self.assertEqual(len(free_cells), len(free))
+            self.assertEqual(
+                {cell for cell in cells if cell in free_cells}, free
+            )
+            chosen = free_cells.random(rng)
+            if free:
+                self.assertIn(chosen, free)
+            else:
+                self.assertIsNone(chosen)
+
+    def test_full_board(self) -> None:
+        free_cells = Free_Cells(3, 2)
+        for y in range(2):
+            for x in range(3):
+                free_cells.remove((x, y))
+        self.assertEqual(len(free_cells), 0)
+        self.assertIsNone(free_cells.random(random.Random(0)))
+
+        free_cells.add((2, 1))
+        self.assertEqual(free_cells.random(random.Random(0)), (2, 1))
+
+
+class Test_Snake_Cells(unittest.TestCase):
+
+    def test_grows_after_wrapping_around(self) -> None:
+        cells = Snake_Cells(100)
+        expected = deque()
+        for x in range(3):
+            cells.append((x, 0))
+            expected.append((x, 0))
+        # moving walks the head back around the start of the buffer
+        for x in range(20):
+            cells.appendleft((x, 1))
+            expected.appendleft((x, 1))
+            self.assertEqual(cells.pop(), expected.pop())
+        # growing fills the wrapped buffer and doubles it a few times
+        for x in range(40):
+            cells.appendleft((x, 2))
+            expected.appendleft((x, 2))
+            self.assertEqual(list(cells), list(expected))
+
+        self.assertEqual(len(cells), len(expected))
+        self.assertEqual(cells[0], expected[0])
+        self.assertEqual(cells[-1], expected[-1])
+
+    def test_matches_a_deque(self) -> None:
+        cells = Snake_Cells(50)
+        expected = deque()
+        rng = random.Random(2)
+        for _ in range(3000):
+            cell = (rng.randrange(50), rng.randrange(50))
+            action = rng.random()
+            if action < 0.45:
+                cells.appendleft(cell)
+                expected.appendleft(cell)
+            elif action < 0.55:
+                cells.append(cell)
+                expected.append(cell)
+            elif expected:
+                self.assertEqual(cells.pop(), expected.pop())
+            self.assertEqual(len(cells), len(expected))
+        self.assertEqual(list(cells), list(expected))
+
+    def test_out_of_range(self) -> None:
+        cells = Snake_Cells(10)
+        with self.assertRaises(IndexError):
+            cells.pop()
+        cells.append((1, 1))
+        with self.assertRaises(IndexError):
+            cells[1]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from tick_scheduler import Duration_Histogram, Tick_Scheduler
+
+
+class Fake_Clock:
+    """
+    Time that only moves when the scheduler sleeps or the test works
+    """
+
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps = []
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class Test_Tick_Scheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.clock = Fake_Clock()
+        patches = [
+            mock.patch('tick_scheduler.time', self.clock),
+            mock.patch('tick_scheduler.asyncio.sleep', self.clock.sleep)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def run_ticks(self, scheduler: Tick_Scheduler, work: list) -> list:
+        """
+        :param scheduler: the scheduler to drive
+        :param work: the seconds every tick takes, one for every call
+        :return: what every call returned
+        """
+
+        async def loop() -> list:
+            returned = []
+            for seconds in work:
+                returned.append(await scheduler.next_ticks())
+                self.clock.now += seconds
+            return returned
+
+        return asyncio.run(loop())
+
+    def test_on_time(self) -> None:
+        scheduler = Tick_Scheduler(10)
+        self.assertEqual(self.run_ticks(scheduler, [0.02] * 4), [1] * 4)
+        self.assertEqual(self.clock.sleeps, [0.1, 0.08, 0.08, 0.08])
+        self.assertEqual(scheduler.skipped, 0)
+        self.assertEqual(scheduler.durations.total, 3)
+        self.assertAlmostEqual(scheduler.durations.max, 20)
+
+    def test_catches_up_late_ticks(self) -> None:
+        scheduler = Tick_Scheduler(10, max_catch_up=3)
+        # the second tick is 0.15 seconds late, the third is due too
+        self.assertEqual(
+            self.run_ticks(scheduler, [0.25, 0.01, 0]), [1, 2, 1]
+        )
+        self.assertEqual(self.clock.sleeps, [0.1, 0.04])
+        self.assertEqual(scheduler.skipped, 0)
+        self.assertAlmostEqual(scheduler.durations.max, 250)
+
+    def test_skips_ticks_past_the_catch_up_limit(self) -> None:
+        scheduler = Tick_Scheduler(10, max_catch_up=3)
+        # ten ticks are due after the long one, seven are skipped
+        self.assertEqual(self.run_ticks(scheduler, [1.05, 0, 0]), [1, 3, 1])
+        self.assertEqual(scheduler.skipped, 7)
+        # the ticks after it are back on the original schedule
+        self.assertEqual(self.clock.sleeps, [0.1, 0.05])
+
+
+class Test_Duration_Histogram(unittest.TestCase):
+
+    def test_percentiles(self) -> None:
+        histogram = Duration_Histogram()
+        for _ in range(98):
+            histogram.add(0.0008)
+        histogram.add(0.02)
+        histogram.add(0.7)
+        self.assertEqual(histogram.total, 100)
+        self.assertEqual(histogram.percentile(50), 1)
+        self.assertEqual(histogram.percentile(99), 25)
+        self.assertEqual(histogram.percentile(100), 700)
+        self.assertEqual(Duration_Histogram().percentile(50), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import bisect
+import time
+
+from snake_config import Snake_Config as Config
+
+
+class Duration_Histogram:
+    """
+    Counts durations in fixed buckets, cheap enough to record every tick
+    """
+
+    # the upper bound of every bucket in milliseconds, the last is open
+    BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum = 0  # milliseconds
+        self.max = 0
+
+    def add(self, seconds: float) -> None:
+        """
+        Counts a duration
+        ...
+        :param seconds: the duration
+        """
+
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, percent: float) -> float:
+        """
+        :param percent: the percentile, between 0 and 100
+        :return: the upper bound in milliseconds of the bucket the\
+         percentile falls in, the longest duration for the last bucket
+        """
+
+        if not self.total:
+            return 0
+        wanted = percent / 100 * self.total
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= wanted:
+                return round(min(bound, self.max), 2)
+        return round(self.max, 2)
+
+    def summary(self) -> str:
+        """
+        :return: a short description of the durations for the logs
+        """
+
+        return (
+            f'{self.total} ticks, p50 {self.percentile(50)}ms, '
+            f'p99 {self.percentile(99)}ms, max {round(self.max, 2)}ms'
+        )
+
+
+class Tick_Scheduler:
+    """
+    Paces a game loop at a fixed tick rate
+    Ticks are due at fixed times from the first one, so a slow tick
+    doesn't push the following ones back, the loop catches up by running
+    the late ticks right away, and skips them when it is too far behind
+    """
+
+    def __init__(
+        self,
+        tick_rate: float,
+        max_catch_up: int = Config.MAX_CATCH_UP_TICKS
+    ) -> None:
+        self._interval = 1 / tick_rate
+        self._max_catch_up = max_catch_up
+        self._next_tick = None
+        self._work_start = None
+
+        self.durations = Duration_Histogram()  # the time the ticks took
+        self.skipped = 0
+
+    async def next_ticks(self) -> int:
+        """
+        Waits until the next tick is due
+        The time since the last call returned is counted as the duration
+        of the ticks it returned
+        ...
+        :return: how many ticks to run now, more than one when catching up
+        """
+
+        now = time.perf_counter()
+        if self._work_start is not None:
+            self.durations.add(now - self._work_start)
+        if self._next_tick is None:
+            self._next_tick = now + self._interval
+
+        if self._next_tick > now:
+            await asyncio.sleep(self._next_tick - now)
+            now = time.perf_counter()
+
+        due = max(1, int((now - self._next_tick) / self._interval) + 1)
+        if due > self._max_catch_up:
+            self.skipped += due - self._max_catch_up
+            self._next_tick += (due - self._max_catch_up) * self._interval
+            due = self._max_catch_up
+        self._next_tick += due * self._interval
+
+        self._work_start = time.perf_counter()
+        return due